@@ -1,41 +1,251 @@
 import os
 import logging
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, session
+import functools
+from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, session, Response, stream_with_context, g, send_from_directory, abort
 from werkzeug.utils import secure_filename
-import tempfile
+from werkzeug.middleware.proxy_fix import ProxyFix
 import json
-from utils.resume_parser import extract_text_from_pdf, extract_text_from_docx
-from utils.gemini_api import analyze_resume_with_gemini, analyze_sentiment_with_gemini
+import time
+import shutil
+import tempfile
+import mimetypes
+from utils.resume_parser import extract_text_from_pdf, extract_text_from_docx, extract_text_from_bytes
+from utils.gemini_api import analyze_resume_with_gemini, analyze_sentiment_with_gemini, stream_resume_analysis, stream_sentiment_analysis, get_gemini_client
+from utils.result_cache import get_result_cache
+from utils.batch_screening import collect_resume_files, iter_batch_results, BATCH_CONCURRENCY
+from utils.jobs import get_job_queue
+from utils.near_duplicates import check_resume_upload, get_near_duplicate_index
+from utils.talent_pool import get_talent_pool, add_to_talent_pool
+from utils.deadline import deadline
+from utils.metrics import stage, start_trace, end_trace, observe_request, render_prometheus, format_server_timing
+from utils.local_sentiment import local_sentiment_result, agreement_report, get_lexicon
+from utils.skills import get_skill_matcher
+from utils.warmup import preload_modules, run_warmup, start_warmup, warmup_state
+from utils.admission import get_admission_controller, AdmissionRejected, BULK_COST
+from utils.bulk_sentiment import iter_feedback_items, iter_bulk_results, SentimentRollup, BULK_BATCH_SIZE, BULK_CONCURRENCY
+from utils.assets import get_asset_manifest, vendor_fallback_url
+from utils.sentiment_trends import get_sentiment_trends, MAX_WEEKS
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import DeclarativeBase
 from dotenv import load_dotenv
 load_dotenv()
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 
+class Base(DeclarativeBase):
+    pass
+
+db = SQLAlchemy(model_class=Base)
+
 # Create Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
 
+# Only proxies we run in front of the app may set the client address; the hop count must match them exactly
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", "0"))
+if TRUSTED_PROXY_HOPS > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS, x_proto=TRUSTED_PROXY_HOPS)
+
+# Configure the database; analysis results live here, the session only keeps row ids
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///tatviq.db")
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "pool_recycle": 300,
+    "pool_pre_ping": True,
+}
+db.init_app(app)
+
+import models  # noqa: E402  (models imports db from this module)
+from models import (  # noqa: E402
+    Resume, SentimentAnalysis, save_resume_analysis, save_resume_analyses,
+    save_sentiment_analysis, save_sentiment_analyses, load_analysis_result, list_page,
+    recent_sentiment_results
+)
+
+with app.app_context():
+    db.create_all()
+
 # Configure upload settings
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
-UPLOAD_FOLDER = tempfile.gettempdir()
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+BULK_FEEDBACK_EXTENSIONS = {'csv', 'jsonl', 'ndjson'}
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
+BATCH_MAX_CONTENT_LENGTH = int(os.environ.get("BATCH_MAX_CONTENT_LENGTH", 256 * 1024 * 1024))
+BATCH_INSERT_SIZE = 50
+AGREEMENT_SAMPLE_MAX = 5000
+
+# Job event streams end after this long; EventSource clients reconnect and pick up the current status
+JOB_EVENTS_MAX_SECONDS = float(os.environ.get("JOB_EVENTS_MAX_SECONDS", "55"))
+
+# Latency budgets per analysis; past them a provisional local result is returned
+RESUME_LATENCY_BUDGET = float(os.environ.get("RESUME_LATENCY_BUDGET", "25"))
+SENTIMENT_LATENCY_BUDGET = float(os.environ.get("SENTIMENT_LATENCY_BUDGET", "20"))
 
 # Set Gemini API key - this needs to be provided through environment variable
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-print(GEMINI_API_KEY)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    # Opt-in stage breakdown, returned in the Server-Timing response header
+    if request.headers.get('X-Trace'):
+        start_trace()
+
+@app.after_request
+def record_request_timing(response):
+    # For streamed responses this covers the time to the first byte only
+    elapsed = time.perf_counter() - g.pop('request_started', time.perf_counter())
+    observe_request(request.endpoint or 'unmatched', elapsed)
+    stages = end_trace()
+    if stages is not None:
+        response.headers['Server-Timing'] = format_server_timing(stages + [('total', elapsed)])
+    return response
+
+@app.template_global()
+def asset_url(endpoint, **values):
+    # Drop-in for url_for('static', filename=...): the fingerprinted build when there is one,
+    # the pinned CDN copy for a vendor file that could not be downloaded, else the plain static file
+    filename = values.get('filename')
+    if endpoint == 'static' and filename:
+        hashed = get_asset_manifest().hashed_path(filename)
+        if hashed is not None:
+            return url_for('built_asset', filename=hashed)
+        fallback = vendor_fallback_url(filename)
+        if fallback is not None:
+            return fallback
+    return url_for(endpoint, **values)
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def register_upload(filename, resume_text):
+    # Keep the text for talent pool searches and flag near-duplicates of earlier uploads
+    add_to_talent_pool(resume_text, filename)
+    return check_resume_upload(resume_text, filename)
+
+def warmup_steps():
+    # Per-process warmup, run by gunicorn after each worker forks (see gunicorn_config.py)
+    def database():
+        with app.app_context():
+            db.session.execute(db.text('SELECT 1'))
+            db.session.remove()
+    
+    return [
+        ('modules', preload_modules),
+        ('gemini_client', lambda: GEMINI_API_KEY and get_gemini_client(GEMINI_API_KEY)),
+        ('database', database),
+        ('result_cache', get_result_cache),
+        ('skill_matcher', get_skill_matcher),
+        ('sentiment_lexicon', get_lexicon),
+        ('job_queue', get_job_queue),
+        ('admission', get_admission_controller),
+        ('sentiment_trends', get_sentiment_trends),
+    ]
+
+def warm_up():
+    return run_warmup(warmup_steps())
+
+def run_resume_job(filename, data, job_description):
+    with deadline(RESUME_LATENCY_BUDGET):
+        resume_text = extract_text_from_bytes(filename, data)
+        near_duplicates = register_upload(filename, resume_text)
+        result = analyze_resume_with_gemini(resume_text, job_description, GEMINI_API_KEY)
+    result = {**result, 'near_duplicates': near_duplicates}
+    with app.app_context():
+        analysis_id = save_resume_analysis(filename, resume_text, job_description, result)
+    return {**result, 'analysis_id': analysis_id}
+
+def run_sentiment_job(feedback_text, team=None):
+    with deadline(SENTIMENT_LATENCY_BUDGET):
+        result = analyze_sentiment_with_gemini(feedback_text, GEMINI_API_KEY)
+    with app.app_context():
+        analysis_id = save_sentiment_analysis(feedback_text, result, team)
+    return {**result, 'analysis_id': analysis_id}
+
+def sse_analysis(events, save):
+    # Relay analysis provisional/field/result events as SSE, storing the final result via save()
+    def generate():
+        try:
+            for event in events:
+                if event['event'] in ('field', 'provisional'):
+                    yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+                else:
+                    analysis_id = save(event['result'])
+                    payload = {'success': True, 'result': event['result'], 'analysis_id': analysis_id}
+                    yield f"event: done\ndata: {json.dumps(payload)}\n\n"
+        except Exception as e:
+            app.logger.error(f"Error in streamed analysis: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'success': False, 'error': str(e)})}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
+def client_id():
+    # Keyed by the peer address; ProxyFix has already replaced it with the client's when behind trusted proxies.
+    # Client-supplied headers are never trusted here, they would let anyone pick a fresh bucket per request.
+    return request.remote_addr or 'unknown'
+
+def admitted(priority):
+    # Shed analysis requests past the rate limits or capacity before any work starts (see utils/admission.py).
+    # The in-flight slot is held until the response, its stream or the job it queued has finished.
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            controller = get_admission_controller()
+            if controller is None:
+                return view(*args, **kwargs)
+            lease = controller.admit(client_id(), priority, BULK_COST if priority == 'bulk' else 1)
+            g.admission_lease = lease
+            try:
+                response = app.make_response(view(*args, **kwargs))
+            except BaseException:
+                lease.release()
+                raise
+            if g.pop('admission_lease', None) is not None:
+                if response.is_streamed:
+                    response.call_on_close(lease.release)
+                else:
+                    lease.release()
+            return response
+        return wrapper
+    return decorator
+
+def submit_job(kind, func, *args):
+    # Queue a job that takes over the request's in-flight slot and frees it when done
+    lease = g.pop('admission_lease', None)
+    if lease is None:
+        return get_job_queue().submit(kind, func, *args)
+    
+    def run(*job_args):
+        try:
+            return func(*job_args)
+        finally:
+            lease.release()
+    
+    try:
+        return get_job_queue().submit(kind, run, *args)
+    except BaseException:
+        lease.release()
+        raise
+
+def job_accepted(job_id, **extra):
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': url_for('job_status', job_id=job_id),
+        'events_url': url_for('job_events', job_id=job_id),
+        **extra
+    }), 202
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/resume-screening')
 def resume_screening():
-    return render_template('resume_screening.html')
+    resume_analysis = load_analysis_result(Resume, session.get('resume_analysis_id'))
+    return render_template('resume_screening.html', resume_analysis=resume_analysis)
 
 @app.route('/analyze-resume', methods=['POST'])
+@admitted('interactive')
 def analyze_resume():
     try:
         # Check if job description is provided
@@ -56,26 +266,30 @@ def analyze_resume():
         
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
             
-            # Extract text based on file type
-            if filename.endswith('.pdf'):
-                resume_text = extract_text_from_pdf(filepath)
-            elif filename.endswith('.docx'):
-                resume_text = extract_text_from_docx(filepath)
-            else:
-                flash('Unsupported file format', 'error')
-                return redirect(url_for('resume_screening'))
-            
-            # Remove temporary file
-            os.remove(filepath)
+            # AJAX requests are queued so this worker is released right away
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                job_id = submit_job('resume', run_resume_job, filename, file.read(), job_description)
+                return job_accepted(job_id)
             
-            # Process with Gemini API
-            analysis_result = analyze_resume_with_gemini(resume_text, job_description, GEMINI_API_KEY)
+            with deadline(RESUME_LATENCY_BUDGET):
+                # Extract text straight from the upload stream, nothing touches the disk
+                if filename.endswith('.pdf'):
+                    resume_text = extract_text_from_pdf(file.stream)
+                elif filename.endswith('.docx'):
+                    resume_text = extract_text_from_docx(file.stream)
+                else:
+                    flash('Unsupported file format', 'error')
+                    return redirect(url_for('resume_screening'))
+                
+                near_duplicates = register_upload(filename, resume_text)
+                
+                # Process with Gemini API
+                analysis_result = analyze_resume_with_gemini(resume_text, job_description, GEMINI_API_KEY)
+                analysis_result = {**analysis_result, 'near_duplicates': near_duplicates}
             
-            # Store results in session for display
-            session['resume_analysis'] = analysis_result
+            # Store results server-side, the session only carries the row id
+            session['resume_analysis_id'] = save_resume_analysis(filename, resume_text, job_description, analysis_result)
             
             # Return JSON if AJAX request, otherwise redirect
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -92,14 +306,131 @@ def analyze_resume():
             flash(f'Error processing resume: {str(e)}', 'error')
             return redirect(url_for('resume_screening'))
 
+@app.route('/analyze-resume/stream', methods=['POST'])
+@admitted('interactive')
+def analyze_resume_stream():
+    job_description = request.form.get('job_description', '')
+    if not job_description:
+        return jsonify({'success': False, 'error': 'Please provide a job description'}), 400
+    
+    file = request.files.get('resume')
+    if not file or not file.filename or not allowed_file(file.filename):
+        return jsonify({'success': False, 'error': 'Please upload a PDF or DOCX resume'}), 400
+    
+    filename = secure_filename(file.filename)
+    try:
+        resume_text = extract_text_from_bytes(filename, file.read())
+    except Exception as e:
+        app.logger.error(f"Error extracting resume text: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 400
+    near_duplicates = register_upload(filename, resume_text)
+    
+    def save(result):
+        result['near_duplicates'] = near_duplicates
+        return save_resume_analysis(filename, resume_text, job_description, result)
+    
+    return sse_analysis(stream_resume_analysis(resume_text, job_description, GEMINI_API_KEY), save)
+
+@app.route('/analyze-resume-batch', methods=['POST'])
+@admitted('bulk')
+def analyze_resume_batch():
+    # Batches legitimately exceed the single-upload limit
+    request.max_content_length = BATCH_MAX_CONTENT_LENGTH
+    try:
+        job_description = request.form.get('job_description', '')
+        if not job_description:
+            return jsonify({'success': False, 'error': 'Please provide a job description'}), 400
+        
+        uploads = [
+            (secure_filename(f.filename), f.read())
+            for f in request.files.getlist('resumes') if f and f.filename
+        ]
+        resumes = collect_resume_files(uploads)
+        if not resumes:
+            return jsonify({'success': False, 'error': 'No PDF, DOCX or ZIP files were provided'}), 400
+        
+        concurrency = request.form.get('concurrency', type=int) or BATCH_CONCURRENCY
+        top_k = request.form.get('top_k', type=int) or None
+        min_score = request.form.get('min_score', type=float)
+    except Exception as e:
+        app.logger.error(f"Error starting resume batch: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    def generate():
+        yield json.dumps({'event': 'start', 'total': len(resumes)}) + '\n'
+        completed = 0
+        pending_rows = []
+        for record in iter_batch_results(resumes, job_description, GEMINI_API_KEY, concurrency, top_k, min_score):
+            completed += 1
+            resume_text = record.pop('resume_text', None)
+            if record['status'] == 'ok':
+                record['result'] = {**record['result'],
+                                    'near_duplicates': register_upload(record['filename'], resume_text)}
+                pending_rows.append({'filename': record['filename'], 'resume_text': resume_text,
+                                     'job_description': job_description, 'result': record['result']})
+            if len(pending_rows) >= BATCH_INSERT_SIZE:
+                save_resume_analyses(pending_rows)
+                pending_rows = []
+            yield json.dumps({'event': 'result', 'completed': completed, **record}) + '\n'
+        save_resume_analyses(pending_rows)
+        yield json.dumps({'event': 'done', 'total': len(resumes)}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
+@app.route('/talent-pool/search', methods=['POST'])
+def search_talent_pool():
+    data = request.get_json(silent=True) or request.form
+    job_description = data.get('job_description', '')
+    if not job_description:
+        return jsonify({'success': False, 'error': 'Please provide a job description'}), 400
+    pool = get_talent_pool()
+    if pool is None:
+        return jsonify({'success': False, 'error': 'The talent pool is disabled'}), 404
+    
+    try:
+        limit = int(data.get('limit', 20))
+        started = time.perf_counter()
+        with stage('talent_pool_search'):
+            candidates = pool.search(job_description, limit)
+        took_ms = round((time.perf_counter() - started) * 1000, 2)
+    except Exception as e:
+        app.logger.error(f"Error searching talent pool: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'candidates': candidates, 'took_ms': took_ms})
+
+@app.route('/talent-pool/<int:candidate_id>/analyze', methods=['POST'])
+@admitted('interactive')
+def analyze_talent_pool_candidate(candidate_id):
+    data = request.get_json(silent=True) or request.form
+    job_description = data.get('job_description', '')
+    if not job_description:
+        return jsonify({'success': False, 'error': 'Please provide a job description'}), 400
+    pool = get_talent_pool()
+    candidate = pool.get_candidate(candidate_id) if pool is not None else None
+    if candidate is None:
+        return jsonify({'success': False, 'error': 'Candidate not found'}), 404
+    
+    try:
+        with deadline(RESUME_LATENCY_BUDGET):
+            result = analyze_resume_with_gemini(candidate['resume_text'], job_description, GEMINI_API_KEY)
+        analysis_id = save_resume_analysis(candidate['filename'], candidate['resume_text'], job_description, result)
+    except Exception as e:
+        app.logger.error(f"Error analyzing talent pool candidate: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+    return jsonify({'success': True, 'candidate_id': candidate_id, 'result': result, 'analysis_id': analysis_id})
+
 @app.route('/sentiment-analysis')
 def sentiment_analysis():
-    return render_template('sentiment_analysis.html')
+    sentiment_analysis = load_analysis_result(SentimentAnalysis, session.get('sentiment_analysis_id'))
+    return render_template('sentiment_analysis.html', sentiment_analysis=sentiment_analysis)
 
 @app.route('/analyze-sentiment', methods=['POST'])
+@admitted('interactive')
 def analyze_sentiment():
     try:
         feedback_text = request.form.get('feedback_text', '')
+        team = request.form.get('team')
         if not feedback_text:
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return jsonify({'success': False, 'error': 'Please provide employee feedback text'})
@@ -107,11 +438,17 @@ def analyze_sentiment():
                 flash('Please provide employee feedback text', 'error')
                 return redirect(url_for('sentiment_analysis'))
         
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            job_id = submit_job('sentiment', run_sentiment_job, feedback_text, team)
+            # The local score is ready in well under a millisecond, so show it while the job runs
+            return job_accepted(job_id, provisional=local_sentiment_result(feedback_text))
+        
         # Process with Gemini API
-        sentiment_result = analyze_sentiment_with_gemini(feedback_text, GEMINI_API_KEY)
+        with deadline(SENTIMENT_LATENCY_BUDGET):
+            sentiment_result = analyze_sentiment_with_gemini(feedback_text, GEMINI_API_KEY)
         
-        # Store results in session for display
-        session['sentiment_analysis'] = sentiment_result
+        # Store results server-side, the session only carries the row id
+        session['sentiment_analysis_id'] = save_sentiment_analysis(feedback_text, sentiment_result, team)
         
         # Return JSON if AJAX request, otherwise redirect
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -128,10 +465,232 @@ def analyze_sentiment():
             flash(f'Error processing sentiment: {str(e)}', 'error')
             return redirect(url_for('sentiment_analysis'))
 
+@app.route('/analyze-sentiment/stream', methods=['POST'])
+@admitted('interactive')
+def analyze_sentiment_stream():
+    feedback_text = request.form.get('feedback_text', '')
+    team = request.form.get('team')
+    if not feedback_text:
+        return jsonify({'success': False, 'error': 'Please provide employee feedback text'}), 400
+    
+    def events():
+        yield {'event': 'provisional', 'result': local_sentiment_result(feedback_text)}
+        yield from stream_sentiment_analysis(feedback_text, GEMINI_API_KEY)
+    
+    return sse_analysis(events(), lambda result: save_sentiment_analysis(feedback_text, result, team))
+
+@app.route('/analyze-sentiment-bulk', methods=['POST'])
+@admitted('bulk')
+def analyze_sentiment_bulk():
+    # Survey exports legitimately exceed the single-upload limit
+    request.max_content_length = BATCH_MAX_CONTENT_LENGTH
+    file = request.files.get('feedback_file')
+    if not file or not file.filename:
+        return jsonify({'success': False, 'error': 'No file part'}), 400
+    filename = secure_filename(file.filename)
+    if '.' not in filename or filename.rsplit('.', 1)[1].lower() not in BULK_FEEDBACK_EXTENSIONS:
+        return jsonify({'success': False, 'error': 'File type not allowed. Please upload a CSV or JSONL export.'}), 400
+    
+    batch_size = request.form.get('batch_size', type=int) or BULK_BATCH_SIZE
+    concurrency = request.form.get('concurrency', type=int) or BULK_CONCURRENCY
+    # Rows without a team column are attributed to the team picked in the form
+    default_team = request.form.get('team')
+    # Uploaded files are closed once the view returns, so the stream reads a spooled copy
+    # that only moves to disk past 1MB, rather than the whole export read into memory
+    upload = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    shutil.copyfileobj(file.stream, upload)
+    upload.seek(0)
+    
+    def generate():
+        rollup = SentimentRollup()
+        pending_rows = []
+        yield json.dumps({'event': 'start'}) + '\n'
+        try:
+            items = iter_feedback_items(upload, filename)
+            for records in iter_bulk_results(items, GEMINI_API_KEY, concurrency, batch_size):
+                for record in records:
+                    text = record.pop('text', None)
+                    if record['status'] == 'ok':
+                        rollup.add(record['result'])
+                        pending_rows.append({'feedback_text': text, 'result': record['result'],
+                                             'team': record.get('team') or default_team})
+                    else:
+                        rollup.failed += 1
+                    yield json.dumps({'event': 'result', **record}) + '\n'
+                if len(pending_rows) >= BATCH_INSERT_SIZE:
+                    save_sentiment_analyses(pending_rows)
+                    pending_rows = []
+                yield json.dumps({'event': 'rollup', **rollup.to_dict()}) + '\n'
+        except Exception as e:
+            app.logger.error(f"Error in bulk sentiment analysis: {str(e)}")
+            yield json.dumps({'event': 'error', 'error': str(e)}) + '\n'
+        finally:
+            upload.close()
+        save_sentiment_analyses(pending_rows)
+        yield json.dumps({'event': 'done', **rollup.to_dict()}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
 @app.route('/about')
 def about():
     return render_template('about.html')
 
+@app.route('/assets/<path:filename>')
+def built_asset(filename):
+    # Fingerprinted files never change, so browsers may keep them for a year without revalidating
+    manifest = get_asset_manifest()
+    chosen = manifest.variant(filename, dict(request.accept_encodings))
+    if chosen is None:
+        abort(404)
+    path, encoding = chosen
+    response = send_from_directory(manifest.dist_dir, path, mimetype=mimetypes.guess_type(filename)[0],
+                                   max_age=31536000)
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown job'}), 404
+    
+    # Remember the stored result so the page shows it after a reload
+    if job['status'] == 'done':
+        session[f"{job['kind']}_analysis_id"] = job['result'].get('analysis_id')
+    return jsonify({'success': job['status'] != 'error', **job})
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    queue = get_job_queue()
+    if queue.get(job_id) is None:
+        return jsonify({'success': False, 'error': 'Unknown job'}), 404
+    
+    def generate():
+        # Woken when the job finishes instead of polling, and capped so a long job never pins a worker thread
+        until = time.monotonic() + JOB_EVENTS_MAX_SECONDS
+        status = None
+        yield "retry: 1000\n\n"
+        while True:
+            job = queue.wait(job_id, status, until - time.monotonic())
+            if job is None:
+                # Purged while the client was listening
+                yield f"event: error\ndata: {json.dumps({'job_id': job_id, 'status': 'error', 'error': 'Unknown job'})}\n\n"
+                return
+            if job['status'] != status:
+                status = job['status']
+                yield f"event: {status}\ndata: {json.dumps(job)}\n\n"
+            if status in ('done', 'error') or time.monotonic() >= until:
+                return
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
+@app.route('/jobs/stats')
+def job_stats():
+    return jsonify(get_job_queue().stats())
+
+@app.route('/api/resumes')
+def list_resumes():
+    try:
+        page = list_page(Resume, request.args.get('sort', 'created_at'), request.args.get('cursor'),
+                         request.args.get('limit', 50, type=int))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, **page})
+
+@app.route('/api/resumes/<int:resume_id>')
+def get_resume(resume_id):
+    row = db.get_or_404(Resume, resume_id)
+    return jsonify({'success': True, **row.to_summary(), 'result': row.analysis_result})
+
+@app.route('/api/sentiment-analyses')
+def list_sentiment_analyses():
+    try:
+        page = list_page(SentimentAnalysis, request.args.get('sort', 'created_at'), request.args.get('cursor'),
+                         request.args.get('limit', 50, type=int))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, **page})
+
+@app.route('/api/sentiment-analyses/<int:analysis_id>')
+def get_sentiment_analysis(analysis_id):
+    row = db.get_or_404(SentimentAnalysis, analysis_id)
+    return jsonify({'success': True, **row.to_summary(), 'result': row.analysis_result})
+
+@app.route('/api/sentiment-agreement')
+def sentiment_agreement():
+    # How closely the local pre-score tracks stored Gemini analyses
+    limit = min(max(request.args.get('limit', 500, type=int), 1), AGREEMENT_SAMPLE_MAX)
+    with stage('sentiment_agreement'):
+        rows = recent_sentiment_results(limit)
+        report = agreement_report([row['feedback_text'] for row in rows], [row['result'] for row in rows])
+    return jsonify({'success': True, **report})
+
+@app.route('/api/sentiment-trends')
+def sentiment_trends():
+    # Served from the week/month rollups, so the cost does not grow with the number of stored analyses
+    trends = get_sentiment_trends()
+    if trends is None:
+        return jsonify({'success': False, 'error': 'Sentiment trends are disabled'}), 404
+    weeks = min(max(1, request.args.get('weeks', 26, type=int)), MAX_WEEKS)
+    try:
+        with stage('sentiment_trends'):
+            series = trends.series(request.args.get('team'), weeks, request.args.get('granularity', 'auto'))
+            teams = trends.teams()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, **series, 'teams': teams})
+
+@app.route('/cache-stats')
+def cache_stats():
+    cache = get_result_cache()
+    if cache is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **cache.stats()})
+
+@app.route('/readyz')
+def readyz():
+    # Ready once this worker has warmed up; a process started without the gunicorn hooks warms up on the first probe
+    state = warmup_state()
+    if not state['started']:
+        start_warmup(warmup_steps())
+    return jsonify(state), 200 if state['ready'] else 503
+
+@app.route('/metrics')
+def metrics():
+    # Cache and job counters are exported as gauges next to the histograms
+    gauges = {'tatviq_ready': int(warmup_state()['ready'])}
+    cache = get_result_cache()
+    if cache is not None:
+        gauges.update({f'tatviq_cache_{name}': value for name, value in cache.stats().items()})
+    pool = get_talent_pool()
+    if pool is not None:
+        gauges.update({f'tatviq_talent_pool_{name}': value for name, value in pool.stats().items()})
+    index = get_near_duplicate_index()
+    if index is not None:
+        gauges.update({f'tatviq_near_duplicate_{name}': value for name, value in index.stats().items()})
+    controller = get_admission_controller()
+    if controller is not None:
+        gauges.update({f'tatviq_admission_{name}': value for name, value in controller.stats().items()})
+    trends = get_sentiment_trends()
+    if trends is not None:
+        gauges.update({f'tatviq_sentiment_trends_{name}': value for name, value in trends.stats().items()})
+    gauges.update({
+        f'tatviq_jobs_{name}': value for name, value in get_job_queue().stats().items()
+        if isinstance(value, (int, float))
+    })
+    return Response(render_prometheus(gauges), mimetype='text/plain; version=0.0.4')
+
+@app.errorhandler(AdmissionRejected)
+def admission_rejected(e):
+    return jsonify({'success': False, 'error': str(e), 'reason': e.reason, 'retry_after': e.retry_after_header}), \
+        e.status, {'Retry-After': e.retry_after_header}
+
 @app.errorhandler(404)
 def page_not_found(e):
     return render_template('404.html'), 404
@@ -0,0 +1,104 @@
+"""
+Start the app under gunicorn for end-to-end benchmarks
+
+Each server gets its own temporary database, cache, job and index files and
+talks to a fake Gemini server, so a run never touches real data or the API.
+Shared by the cold start and load benchmarks; not meant to be run directly.
+"""
+import os
+import time
+import shutil
+import socket
+import tempfile
+import subprocess
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_COMMAND = ["gunicorn", "--bind", "127.0.0.1:{port}", "main:app"]
+PROFILE_COMMAND = ["gunicorn", "--config", "gunicorn_config.py", "--bind", "127.0.0.1:{port}", "main:app"]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def isolated_env(workdir: str, gemini_url: str, overrides: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Environment for an app process whose state all lives under workdir
+
+    Args:
+        workdir (str): Scratch directory for the databases and indexes
+        gemini_url (str): Base URL of the fake Gemini server
+        overrides (Optional[Dict[str, str]]): Extra settings, e.g. GUNICORN_WORKERS
+
+    Returns:
+        Dict[str, str]: Environment variables
+    """
+    env = dict(os.environ)
+    env.update({
+        'GEMINI_API_KEY': 'benchmark',
+        'GEMINI_BASE_URL': gemini_url,
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'app.db')}",
+        'RESULT_CACHE_PATH': os.path.join(workdir, 'cache.sqlite3'),
+        'JOBS_DB_PATH': os.path.join(workdir, 'jobs.sqlite3'),
+        'NEAR_DUP_DB_PATH': os.path.join(workdir, 'near_dup.sqlite3'),
+        'TALENT_POOL_DIR': os.path.join(workdir, 'talent_pool'),
+        'ADMISSION_DB_PATH': os.path.join(workdir, 'admission.sqlite3'),
+        'SENTIMENT_TRENDS_DB_PATH': os.path.join(workdir, 'sentiment_trends.sqlite3'),
+    })
+    env.update(overrides or {})
+    return env
+
+class AppServer:
+    """
+    gunicorn serving the app on a free port, stopped on exit
+
+        with AppServer(PROFILE_COMMAND, fake.url) as server:
+            urllib.request.urlopen(server.url + '/')
+    """
+
+    def __init__(self, command: List[str], gemini_url: str, overrides: Optional[Dict[str, str]] = None,
+                 startup_timeout: float = 60):
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.command = [part.format(port=self.port) for part in command]
+        self.workdir = tempfile.mkdtemp(prefix='tatviq_bench_')
+        self.env = isolated_env(self.workdir, gemini_url, overrides)
+        self.startup_timeout = startup_timeout
+        self.started_at = None
+        self.first_200_seconds = None
+        self._process = None
+
+    def start(self) -> "AppServer":
+        self.started_at = time.perf_counter()
+        self._process = subprocess.Popen(self.command, cwd=ROOT, env=self.env,
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        while True:
+            try:
+                with urllib.request.urlopen(f"{self.url}/", timeout=1) as response:
+                    if response.status == 200:
+                        break
+            except (OSError, urllib.error.HTTPError):
+                pass
+            if self._process.poll() is not None:
+                raise RuntimeError(f"{' '.join(self.command)} exited with {self._process.returncode}")
+            if time.perf_counter() - self.started_at > self.startup_timeout:
+                self.stop()
+                raise RuntimeError(f"{' '.join(self.command)} did not start within {self.startup_timeout}s")
+            time.sleep(0.01)
+        self.first_200_seconds = time.perf_counter() - self.started_at
+        return self
+
+    def stop(self) -> None:
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            self._process.wait(timeout=30)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def __enter__(self) -> "AppServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,145 @@
+"""
+Compare cold starts of the old single sync worker with the gunicorn_config.py profile
+
+Reports how long `import app` takes with the SDK and parser modules imported
+eagerly (as app.py used to) and lazily, then starts each serving profile
+against the fake Gemini server and measures the time until the first 200, the
+first and a warm sentiment request, and wall time for a burst of concurrent
+requests that each wait on a slow Gemini call.
+
+Usage:
+    python -m benchmarks.cold_start [--delay 0.5] [--concurrent 16] [--json]
+"""
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+import urllib.parse
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.warmup import HEAVY_MODULES
+from benchmarks.fake_gemini import FakeGemini
+from benchmarks.app_server import AppServer, BASELINE_COMMAND, PROFILE_COMMAND, ROOT, isolated_env
+
+PROFILES = {"baseline": BASELINE_COMMAND, "profile": PROFILE_COMMAND}
+WORDS = "workload manager team growth supportive exhausting valued colleagues meetings process".split()
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 3)
+
+def import_seconds(env: dict, eager: bool) -> float:
+    preamble = ''.join(f"import {name}\n" for name in HEAVY_MODULES) if eager else ''
+    code = ("import time\nstarted = time.perf_counter()\n" + preamble +
+            "import app\nprint(time.perf_counter() - started)\n")
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+def request(url: str, data: dict = None, timeout: float = 60) -> int:
+    body = urllib.parse.urlencode(data).encode() if data else None
+    # Stop at the redirect, the page it points to is not what is being timed
+    opener = urllib.request.build_opener(NoRedirect)
+    try:
+        with opener.open(urllib.request.Request(url, data=body), timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+def feedback(rng: random.Random) -> dict:
+    # Distinct texts so no request is answered from the result cache or a near-duplicate
+    return {'feedback_text': ' '.join(rng.choice(WORDS) + str(rng.randint(0, 10 ** 6)) for _ in range(40))}
+
+def measure_profile(name: str, gemini_url: str, concurrent: int, rng: random.Random) -> dict:
+    # The burst comes from one client, admission control would shed most of it
+    with AppServer(PROFILES[name], gemini_url, {'ADMISSION_ENABLED': '0'}) as server:
+        base = server.url
+        started = server.started_at
+        first_200 = server.first_200_seconds
+
+        timings = []
+        for _ in range(2):
+            request_started = time.perf_counter()
+            status = request(f"{base}/analyze-sentiment", feedback(rng))
+            timings.append(time.perf_counter() - request_started)
+            if status >= 400:
+                raise RuntimeError(f"{name} answered {status}")
+
+        # Polled only after the timed requests, a probe would otherwise warm the baseline up
+        ready = None
+        while time.perf_counter() - started < 60:
+            if request(f"{base}/readyz") == 200:
+                ready = time.perf_counter() - started
+                break
+            time.sleep(0.01)
+
+        payloads = [feedback(rng) for _ in range(concurrent)]
+        latencies = []
+        def timed(payload):
+            request_started = time.perf_counter()
+            request(f"{base}/analyze-sentiment", payload)
+            latencies.append(time.perf_counter() - request_started)
+        burst_started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrent) as pool:
+            list(pool.map(timed, payloads))
+        burst = time.perf_counter() - burst_started
+
+    return {
+        "first_200_s": round(first_200, 3),
+        "ready_s": round(ready, 3) if ready is not None else None,
+        "first_request_s": round(timings[0], 3),
+        "warm_request_s": round(timings[1], 3),
+        "burst": {"requests": concurrent, "wall_s": round(burst, 3),
+                  "p50_s": percentile(latencies, 50), "p99_s": percentile(latencies, 99)},
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds the fake Gemini server waits per call")
+    parser.add_argument("--concurrent", type=int, default=16, help="simultaneous sentiment requests in the burst")
+    parser.add_argument("--imports", type=int, default=5, help="import timings per variant")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    results = {"imports": {}, "profiles": {}}
+    with FakeGemini(f"fixed:{args.delay}", seed=args.seed) as fake:
+        for eager in (True, False):
+            workdir = tempfile.mkdtemp(prefix='cold_start_')
+            try:
+                env = isolated_env(workdir, fake.url)
+                seconds = [import_seconds(env, eager) for _ in range(args.imports)]
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            results["imports"]["eager" if eager else "lazy"] = {"p50_s": percentile(seconds, 50),
+                                                                 "max_s": percentile(seconds, 100)}
+        for name in PROFILES:
+            results["profiles"][name] = measure_profile(name, fake.url, args.concurrent, rng)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    for variant, timing in results["imports"].items():
+        print(f"import app ({variant}): p50 {timing['p50_s']} s, max {timing['max_s']} s")
+    for name, profile in results["profiles"].items():
+        burst = profile["burst"]
+        print(f"{name}: first 200 after {profile['first_200_s']} s, ready after {profile['ready_s']} s, "
+              f"first request {profile['first_request_s']} s, warm request {profile['warm_request_s']} s, "
+              f"{burst['requests']} concurrent in {burst['wall_s']} s (p50 {burst['p50_s']} s, p99 {burst['p99_s']} s)")
+
+if __name__ == "__main__":
+    main()
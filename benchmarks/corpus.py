@@ -0,0 +1,197 @@
+"""
+Generate a synthetic resume corpus as PDF and DOCX files
+
+Each resume gets a unique name and randomized experience, project and skills
+sections, filled out to a requested page count, so analyses never hit the
+result cache or the near-duplicate index. PDFs are written directly (one
+Helvetica text stream per page) and DOCX files through python-docx.
+
+Usage:
+    python -m benchmarks.corpus --out /tmp/resumes [--count 40] [--pages 1,2,4,8] [--formats pdf,docx]
+"""
+import io
+import os
+import sys
+import json
+import random
+import argparse
+from typing import List, Dict, Any, Sequence
+
+import docx
+
+# Letter-size pages at 11pt Helvetica, roughly what a resume holds per page
+LINES_PER_PAGE = 48
+LINE_WIDTH = 92
+
+FIRST_NAMES = "Ada Grace Alan Linus Barbara Ken Margaret Dennis Frances Edsger Radia Guido Anita Tim Sophie".split()
+LAST_NAMES = "Lovelace Hopper Turing Torvalds Liskov Thompson Hamilton Ritchie Allen Dijkstra Perlman Rossum".split()
+SKILLS = (
+    "Python Java Go SQL PostgreSQL AWS GCP Docker Kubernetes Terraform React TypeScript Kafka Spark Airflow "
+    "Redis gRPC GraphQL Linux CI/CD Prometheus Flask Django FastAPI Pandas NumPy PyTorch Git Agile"
+).split()
+VERBS = "Led Designed Built Migrated Scaled Automated Reduced Improved Owned Shipped Mentored Optimized".split()
+OBJECTS = (
+    "the payments platform|a streaming ingestion pipeline|the customer analytics service|an internal developer portal|"
+    "the search ranking system|a multi-region deployment|the billing reconciliation jobs|an ML feature store"
+).split('|')
+OUTCOMES = (
+    "cutting p99 latency by {n}%|serving {n}k requests per second|saving ${n}k a year in cloud spend|"
+    "raising test coverage to {n}%|onboarding {n} teams|reducing incidents by {n}%"
+).split('|')
+COMPANIES = "Initech Globex Umbrella Hooli Stark Wayne Acme Cyberdyne Soylent Tyrell".split()
+
+def resume_lines(rng: random.Random, pages: int) -> List[str]:
+    """
+    Write the text of one resume, about LINES_PER_PAGE lines per page
+
+    Args:
+        rng (random.Random): Source of randomness
+        pages (int): Pages to fill
+
+    Returns:
+        List[str]: Lines; section headings are upper case
+    """
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    handle = name.lower().replace(' ', '.') + str(rng.randint(1, 99999))
+    lines = [name, f"{handle}@example.com | +1 555 {rng.randint(1000, 9999)} | github.com/{handle}", "",
+             "SUMMARY", f"Software engineer with {rng.randint(2, 18)} years building backend and data systems.", "",
+             "SKILLS", ', '.join(rng.sample(SKILLS, rng.randint(8, 16))), "", "EXPERIENCE"]
+    target = pages * LINES_PER_PAGE - 3
+    year = 2025
+    while len(lines) < target:
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(['Senior ', 'Staff ', ''])}Software Engineer, {rng.choice(COMPANIES)} ({start}-{year})")
+        for _ in range(rng.randint(3, 6)):
+            outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 95))
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using "
+                         f"{' and '.join(rng.sample(SKILLS, 2))}, {outcome}")
+        lines.append("")
+        year = start
+    # Wrap long bullets the way a word processor would, then trim to the page budget
+    wrapped = []
+    for line in lines:
+        while len(line) > LINE_WIDTH:
+            cut = line.rfind(' ', 0, LINE_WIDTH)
+            wrapped.append(line[:cut])
+            line = '  ' + line[cut + 1:]
+        wrapped.append(line)
+    return wrapped[:target] + ["", "EDUCATION", f"BS Computer Science, State University, {year - 4}"]
+
+def _pdf_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def build_pdf(lines: Sequence[str]) -> bytes:
+    """
+    Write lines into a minimal multi-page PDF that PyPDF2 can extract
+
+    Args:
+        lines (Sequence[str]): Text lines, LINES_PER_PAGE per page
+
+    Returns:
+        bytes: PDF file content
+    """
+    pages = [lines[start:start + LINES_PER_PAGE] for start in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and a content stream per page
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>",
+               3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"}
+    kids = []
+    for number, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * number, 5 + 2 * number
+        kids.append(f"{page_id} 0 R")
+        commands = ["BT", "/F1 11 Tf", "14 TL", "54 750 Td"]
+        for line in page_lines:
+            text = _pdf_escape(line.encode('latin-1', 'replace').decode('latin-1'))
+            commands.append(f"({text}) Tj T*")
+        commands.append("ET")
+        stream = '\n'.join(commands).encode('latin-1')
+        objects[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>").encode()
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = output.tell()
+        output.write(b"%d 0 obj\n%s\nendobj\n" % (object_id, objects[object_id]))
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for object_id in sorted(objects):
+        output.write(b"%010d 00000 n \n" % offsets[object_id])
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return output.getvalue()
+
+def build_docx(lines: Sequence[str]) -> bytes:
+    """
+    Write lines into a DOCX with headings for the upper-case section titles
+    and a skills table, like a typical word-processor resume
+
+    Args:
+        lines (Sequence[str]): Text lines from resume_lines()
+
+    Returns:
+        bytes: DOCX file content
+    """
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = f"{lines[0]} | {lines[1]}"
+    for number, line in enumerate(lines[2:], start=2):
+        if line.isupper():
+            document.add_heading(line.title(), level=1)
+        elif line and lines[number - 1] == 'SKILLS':
+            skills = [skill.strip() for skill in line.split(',')]
+            table = document.add_table(rows=(len(skills) + 3) // 4, cols=4)
+            for position, skill in enumerate(skills):
+                table.cell(position // 4, position % 4).text = skill
+        elif line:
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def generate_corpus(count: int, pages: Sequence[int] = (1, 2, 4, 8), formats: Sequence[str] = ('pdf', 'docx'),
+                    seed: int = 7) -> List[Dict[str, Any]]:
+    """
+    Build count resumes, cycling through the page counts and formats
+
+    Args:
+        count (int): Number of resumes
+        pages (Sequence[int]): Page counts to cycle through
+        formats (Sequence[str]): 'pdf' and/or 'docx'
+        seed (int): Random seed
+
+    Returns:
+        List[Dict[str, Any]]: {"filename", "format", "pages", "data"} per resume
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for number in range(count):
+        page_count = pages[number % len(pages)]
+        fmt = formats[(number // len(pages)) % len(formats)]
+        lines = resume_lines(rng, page_count)
+        data = build_pdf(lines) if fmt == 'pdf' else build_docx(lines)
+        corpus.append({'filename': f"resume_{number:04d}_{page_count}p.{fmt}", 'format': fmt,
+                       'pages': page_count, 'data': data})
+    return corpus
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="directory to write the resumes to")
+    parser.add_argument("--count", type=int, default=40)
+    parser.add_argument("--pages", default="1,2,4,8", help="comma-separated page counts to cycle through")
+    parser.add_argument("--formats", default="pdf,docx")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    corpus = generate_corpus(args.count, [int(value) for value in args.pages.split(',')],
+                             args.formats.split(','), args.seed)
+    os.makedirs(args.out, exist_ok=True)
+    for item in corpus:
+        with open(os.path.join(args.out, item['filename']), 'wb') as f:
+            f.write(item['data'])
+    json.dump({'written': len(corpus), 'bytes': sum(len(item['data']) for item in corpus), 'out': args.out},
+              sys.stdout)
+    print()
+
+if __name__ == "__main__":
+    main()
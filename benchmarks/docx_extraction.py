@@ -0,0 +1,104 @@
+"""
+Compare the streaming DOCX extractor with the python-docx object-model extractor
+
+Builds a synthetic corpus of resume-like DOCX files (headers, paragraphs and
+skills tables) in memory, then reports throughput and peak traced memory for
+both extractors.
+
+Usage:
+    python -m benchmarks.docx_extraction [--docs 200] [--paragraphs 60] [--json]
+"""
+import io
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+import docx
+
+from utils.resume_parser import extract_text_from_docx, _extract_docx_with_python_docx
+
+WORDS = (
+    "python java kubernetes docker aws react sql agile led designed built migrated "
+    "scalable services pipeline team customers latency reduced improved platform data "
+    "engineer senior backend frontend cloud microservices testing delivery ownership"
+).split()
+
+def build_docx(paragraphs: int, table_rows: int, rng: random.Random) -> bytes:
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = "Jane Doe | jane.doe@example.com | +1 555 0100"
+    document.add_heading("Experience", level=1)
+    for _ in range(paragraphs):
+        document.add_paragraph(' '.join(rng.choice(WORDS) for _ in range(rng.randint(12, 30))))
+    document.add_heading("Skills", level=1)
+    table = document.add_table(rows=table_rows, cols=3)
+    for row in table.rows:
+        for cell in row.cells:
+            cell.text = rng.choice(WORDS).title()
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def measure(extractor, corpus):
+    gc.collect()
+    start = time.perf_counter()
+    chars = 0
+    for data in corpus:
+        chars += len(extractor(io.BytesIO(data)))
+    elapsed = time.perf_counter() - start
+
+    # Peak memory is measured separately so tracing does not skew the timing
+    peaks = []
+    for data in corpus[:20]:
+        gc.collect()
+        tracemalloc.start()
+        extractor(io.BytesIO(data))
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    total_bytes = sum(len(data) for data in corpus)
+    return {
+        "docs_per_sec": round(len(corpus) / elapsed, 1),
+        "mb_per_sec": round(total_bytes / elapsed / 1e6, 2),
+        "peak_kib_per_doc": round(max(peaks) / 1024, 1),
+        "chars_extracted": chars,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=60)
+    parser.add_argument("--table-rows", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    corpus = [build_docx(args.paragraphs, args.table_rows, rng) for _ in range(args.docs)]
+
+    results = {
+        "corpus": {"docs": args.docs, "paragraphs": args.paragraphs, "table_rows": args.table_rows,
+                   "mean_kib": round(sum(map(len, corpus)) / len(corpus) / 1024, 1)},
+        "python_docx": measure(_extract_docx_with_python_docx, corpus),
+        "streaming": measure(extract_text_from_docx, corpus),
+    }
+    results["speedup"] = round(results["streaming"]["docs_per_sec"] / results["python_docx"]["docs_per_sec"], 2)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"corpus: {args.docs} docs, ~{results['corpus']['mean_kib']} KiB each")
+    print(f"{'extractor':<14}{'docs/s':>10}{'MB/s':>10}{'peak KiB':>12}{'chars':>12}")
+    for name in ("python_docx", "streaming"):
+        row = results[name]
+        print(f"{name:<14}{row['docs_per_sec']:>10}{row['mb_per_sec']:>10}"
+              f"{row['peak_kib_per_doc']:>12}{row['chars_extracted']:>12}")
+    print(f"speedup: {results['speedup']}x (streaming also includes table and header text)")
+
+if __name__ == "__main__":
+    main()
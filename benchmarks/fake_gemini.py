@@ -0,0 +1,256 @@
+"""
+Local stand-in for the Gemini generateContent API
+
+Answers generateContent and streamGenerateContent calls with canned JSON in
+the shape the resume, sentiment, bulk sentiment and merge prompts ask for,
+after a delay drawn from a configurable latency distribution, and fails a
+configurable share of calls with an API error. Point the app at it with
+GEMINI_BASE_URL; any API key is accepted.
+
+Latency specs: fixed:SECONDS, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA.
+
+Usage:
+    python -m benchmarks.fake_gemini [--port 8089] [--latency lognormal:0.8,0.4] [--error-rate 0.02]
+"""
+import sys
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SKILLS = ["Python", "Java", "SQL", "AWS", "Docker", "Kubernetes", "React", "Go", "Terraform", "Kafka", "Spark", "Git"]
+THEMES = ["Workload", "Compensation", "Management", "Career Growth", "Team Culture", "Work-Life Balance"]
+SENTIMENTS = ["positive", "negative", "neutral", "mixed"]
+LEVELS = ["low", "medium", "high"]
+ERROR_STATUSES = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Turn a latency spec into a sampler returning seconds
+
+    Args:
+        spec (str): fixed:SECONDS, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA
+
+    Returns:
+        Callable[[random.Random], float]: Draws one delay
+    """
+    kind, _, params = spec.partition(':')
+    values = [float(value) for value in params.split(',') if value]
+    if kind == 'fixed' and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == 'uniform' and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'lognormal' and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) if values[0] > 0 else 0.0
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+def prompt_kind(prompt: str) -> str:
+    if 'Analyze each employee feedback comment' in prompt:
+        return 'sentiment_bulk'
+    if prompt.startswith('You are an expert HR recruiter'):
+        return 'resume'
+    return 'sentiment'
+
+def _pick(rng: random.Random, values: List[str], low: int, high: int) -> List[str]:
+    return rng.sample(values, rng.randint(low, high))
+
+def resume_result(rng: random.Random) -> Dict[str, Any]:
+    extracted = _pick(rng, SKILLS, 4, 9)
+    matching = extracted[:rng.randint(1, len(extracted))]
+    return {
+        "extracted_skills": extracted,
+        "matching_skills": matching,
+        "missing_skills": [skill for skill in _pick(rng, SKILLS, 2, 5) if skill not in extracted],
+        "experience_summary": f"{rng.randint(1, 15)} years of backend and platform engineering",
+        "education_summary": "BS in Computer Science",
+        "match_score": rng.randint(20, 95),
+        "strengths": ["Strong fundamentals", "Ships reliably"],
+        "weaknesses": ["Limited leadership experience"],
+        "overall_assessment": "Solid candidate whose experience covers most of the role.",
+    }
+
+def sentiment_result(rng: random.Random) -> Dict[str, Any]:
+    score = round(rng.uniform(-1, 1), 2)
+    return {
+        "sentiment_score": score,
+        "primary_sentiment": rng.choice(SENTIMENTS),
+        "key_themes": _pick(rng, THEMES, 1, 4),
+        "positive_aspects": ["Supportive colleagues"],
+        "concerns": ["Workload"] if score < 0 else [],
+        "attrition_risk": {"level": rng.choice(LEVELS), "reasoning": "Canned benchmark answer"},
+        "engagement_recommendations": ["Review workload distribution"],
+        "summary": "Canned benchmark answer.",
+    }
+
+def bulk_result(prompt: str, rng: random.Random) -> List[Dict[str, Any]]:
+    _, _, packed = prompt.partition('COMMENTS:\n')
+    try:
+        items = json.loads(packed)
+    except ValueError:
+        items = []
+    return [{"id": item.get('id'), "sentiment_score": round(rng.uniform(-1, 1), 2),
+             "primary_sentiment": rng.choice(SENTIMENTS), "key_themes": _pick(rng, THEMES, 1, 3),
+             "concerns": [], "attrition_risk": {"level": rng.choice(LEVELS)}} for item in items]
+
+def canned_answer(prompt: str) -> str:
+    """
+    Build the JSON text Gemini would return for a prompt
+
+    Answers are seeded by the prompt, so the same input always gets the same answer.
+    """
+    rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).digest())
+    kind = prompt_kind(prompt)
+    if kind == 'resume':
+        return json.dumps(resume_result(rng))
+    if kind == 'sentiment_bulk':
+        return json.dumps(bulk_result(prompt, rng))
+    return json.dumps(sentiment_result(rng))
+
+def _envelope(text: str, prompt_tokens: int, finished: bool = True) -> Dict[str, Any]:
+    candidate = {'content': {'role': 'model', 'parts': [{'text': text}]}, 'index': 0}
+    if finished:
+        candidate['finishReason'] = 'STOP'
+    output_tokens = max(1, len(text) // 4)
+    return {'candidates': [candidate],
+            'usageMetadata': {'promptTokenCount': prompt_tokens, 'candidatesTokenCount': output_tokens,
+                              'totalTokenCount': prompt_tokens + output_tokens}}
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        fake = self.server.fake
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        prompt = ''.join(part.get('text', '') for content in body.get('contents', []) for part in content.get('parts', []))
+        delay, fail = fake.draw()
+        fake.record(prompt_kind(prompt), fail)
+        if fail:
+            time.sleep(delay / 2)
+            status = fake.error_status
+            self._send_json(status, {'error': {'code': status, 'message': 'Injected benchmark error',
+                                               'status': ERROR_STATUSES.get(status, 'UNKNOWN')}})
+            return
+
+        text = canned_answer(prompt)
+        prompt_tokens = max(1, len(prompt) // 4)
+        if ':streamGenerateContent' not in self.path:
+            time.sleep(delay)
+            self._send_json(200, _envelope(text, prompt_tokens))
+            return
+
+        # Stream a few chunks, with the first one arriving after a fifth of the delay
+        pieces = max(1, min(fake.stream_chunks, len(text)))
+        size = math.ceil(len(text) / pieces)
+        chunks = [text[start:start + size] for start in range(0, len(text), size)]
+        time.sleep(delay / 5)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        for number, chunk in enumerate(chunks):
+            if number:
+                time.sleep(delay * 4 / 5 / max(1, len(chunks) - 1))
+            event = _envelope(chunk, prompt_tokens, finished=number == len(chunks) - 1)
+            self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode())
+            self.wfile.flush()
+        self.close_connection = True
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+class FakeGemini:
+    """
+    Threaded fake Gemini server, started and stopped as a context manager
+
+        with FakeGemini(latency='lognormal:0.8,0.4', error_rate=0.02) as fake:
+            env['GEMINI_BASE_URL'] = fake.url
+
+    script lists (delay, fail) outcomes for the first calls, in arrival
+    order, before the latency distribution and error rate take over.
+    """
+
+    def __init__(self, latency: str = 'fixed:0', error_rate: float = 0.0, error_status: int = 503,
+                 stream_chunks: int = 8, seed: int = 7, host: str = '127.0.0.1', port: int = 0,
+                 script: Optional[List[Tuple[float, bool]]] = None):
+        self.sample = parse_latency(latency)
+        self.script = list(script or [])
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stream_chunks = stream_chunks
+        self.counts: Dict[str, int] = {}
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self):
+        with self._lock:
+            if self.script:
+                return self.script.pop(0)
+            return max(0.0, self.sample(self._rng)), self._rng.random() < self.error_rate
+
+    def record(self, kind: str, failed: bool) -> None:
+        with self._lock:
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            self.errors += failed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'calls': dict(self.counts), 'errors': self.errors}
+
+    def start(self) -> "FakeGemini":
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-gemini', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeGemini":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="lognormal:0.8,0.4", help="per-call latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls that fail")
+    parser.add_argument("--error-status", type=int, default=503, choices=sorted(ERROR_STATUSES))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    fake = FakeGemini(args.latency, args.error_rate, args.error_status, seed=args.seed, host=args.host, port=args.port)
+    print(f"fake Gemini listening on {fake.url}, run the app with GEMINI_BASE_URL={fake.url}", file=sys.stderr)
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(fake.stats()))
+
+if __name__ == "__main__":
+    main()
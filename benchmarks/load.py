@@ -0,0 +1,297 @@
+"""
+End-to-end load benchmark for /analyze-resume and /analyze-sentiment
+
+Starts a fake Gemini server (see benchmarks/fake_gemini.py) and the app under
+gunicorn, then runs closed-loop load against each endpoint at several
+concurrency levels with unique synthetic resumes (PDF and DOCX of varying
+page counts) and feedback texts. Reports p50/p95/p99 latency, requests/sec,
+the server-side stage breakdown from Server-Timing, and in-process text
+extraction throughput per format and page count.
+
+The report is JSON (--output) with the commit it ran on, so runs can be
+compared across commits with --baseline. The result cache, near-duplicate
+reuse and admission control are off unless --keep-caches is given, so every
+request takes the full analysis path.
+
+Usage:
+    python -m benchmarks.load [--concurrency 1,4,16] [--requests 32] [--latency lognormal:0.8,0.4]
+                              [--error-rate 0.0] [--output report.json] [--baseline old.json] [--json]
+"""
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import platform
+import threading
+import subprocess
+import urllib.parse
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from benchmarks.fake_gemini import FakeGemini
+from benchmarks.corpus import generate_corpus
+from benchmarks.app_server import AppServer, PROFILE_COMMAND, BASELINE_COMMAND, ROOT
+from utils.resume_parser import extract_text_from_pdf, extract_text_from_docx
+
+JOB_DESCRIPTION = (
+    "Senior Backend Engineer. We need 5+ years of Python or Go, PostgreSQL, AWS, Docker and Kubernetes, "
+    "experience running Kafka or Spark pipelines, and a track record of owning production services."
+)
+FEEDBACK_PHRASES = [
+    "I really enjoy working with my team and my manager is supportive.",
+    "The workload has been exhausting for months and nobody seems to notice.",
+    "I don't feel valued and I'm looking for other opportunities.",
+    "Career growth is unclear, promotion criteria change every cycle.",
+    "Great colleagues, interesting projects and flexible hours.",
+    "Meetings take up most of the week so real work happens at night.",
+    "Compensation is below market but the learning opportunities are good.",
+]
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 2) if values else None
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def build_feedback(rng: random.Random) -> str:
+    phrases = [rng.choice(FEEDBACK_PHRASES) for _ in range(rng.randint(3, 12))]
+    # A unique tail keeps every text out of the result cache
+    return ' '.join(phrases) + f" Ref {uuid.UUID(int=rng.getrandbits(128)).hex[:12]}."
+
+def multipart(fields: Dict[str, str], files: Dict[str, Tuple[str, bytes]]) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, data) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/octet-stream\r\n\r\n'.encode() + data + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+_opener = urllib.request.build_opener(NoRedirect)
+
+def post(url: str, body: bytes, content_type: str) -> Tuple[int, float, Dict[str, float]]:
+    # The non-AJAX form path runs the analysis inside the request and answers with a redirect
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': content_type, 'X-Trace': '1'})
+    started = time.perf_counter()
+    try:
+        with _opener.open(request, timeout=300) as response:
+            response.read()
+            status, headers = response.status, response.headers
+    except urllib.error.HTTPError as e:
+        status, headers = e.code, e.headers
+    except OSError:
+        # Connection refused or reset, reported as status 0
+        return 0, time.perf_counter() - started, {}
+    elapsed = time.perf_counter() - started
+    stages = {}
+    for entry in (headers.get('Server-Timing') or '').split(','):
+        name, _, duration = entry.strip().partition(';dur=')
+        if name and duration:
+            stages[name] = stages.get(name, 0.0) + float(duration)
+    return status, elapsed, stages
+
+def resume_requests(corpus: List[Dict[str, Any]]) -> List[Tuple[bytes, str]]:
+    return [multipart({'job_description': JOB_DESCRIPTION}, {'resume': (item['filename'], item['data'])})
+            for item in corpus]
+
+def sentiment_requests(count: int, rng: random.Random) -> List[Tuple[bytes, str]]:
+    return [(urllib.parse.urlencode({'feedback_text': build_feedback(rng)}).encode(),
+             'application/x-www-form-urlencoded') for _ in range(count)]
+
+def run_level(url: str, payloads: List[Tuple[bytes, str]], concurrency: int) -> Dict[str, Any]:
+    """
+    Send every payload with `concurrency` requests outstanding at all times
+    """
+    samples = []
+    lock = threading.Lock()
+    pending = iter(payloads)
+
+    def worker():
+        while True:
+            with lock:
+                payload = next(pending, None)
+            if payload is None:
+                return
+            sample = post(url, *payload)
+            with lock:
+                samples.append(sample)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall = time.perf_counter() - started
+
+    latencies = [elapsed * 1000 for _, elapsed, _ in samples]
+    statuses: Dict[str, int] = {}
+    for status, _, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    stage_names = sorted({name for _, _, stages in samples for name in stages})
+    stages = {}
+    for name in stage_names:
+        values = [sample_stages.get(name, 0.0) for _, _, sample_stages in samples]
+        stages[name] = {'mean_ms': round(sum(values) / len(values), 2), 'p95_ms': percentile(values, 95)}
+    return {
+        'requests': len(samples),
+        'concurrency': concurrency,
+        'statuses': statuses,
+        'errors': sum(count for status, count in statuses.items() if not 200 <= int(status) < 400),
+        'wall_s': round(wall, 3),
+        'rps': round(len(samples) / wall, 2),
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'stages': stages,
+    }
+
+def measure_extraction(corpus: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    extractors = {'pdf': extract_text_from_pdf, 'docx': extract_text_from_docx}
+    groups: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+    for item in corpus:
+        groups.setdefault((item['format'], item['pages']), []).append(item)
+    results: Dict[str, Dict[str, Any]] = {}
+    for (fmt, pages), items in sorted(groups.items()):
+        # One untimed pass so one-off parser setup is not charged to the first group
+        extractors[fmt](io.BytesIO(items[0]['data']))
+        times = []
+        for item in items:
+            started = time.perf_counter()
+            extractors[fmt](io.BytesIO(item['data']))
+            times.append(time.perf_counter() - started)
+        total = sum(times)
+        results.setdefault(fmt, {})[f"{pages}p"] = {
+            'docs': len(items),
+            'p50_ms': percentile([t * 1000 for t in times], 50),
+            'docs_per_sec': round(len(items) / total, 1),
+            'pages_per_sec': round(len(items) * pages / total, 1),
+            'mb_per_sec': round(sum(len(item['data']) for item in items) / total / 1e6, 2),
+        }
+    return results
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    lines = [f"vs {baseline['meta']['commit']} (negative latency / positive rps change is better)"]
+    for scenario, levels in report['scenarios'].items():
+        for level, current in levels.items():
+            previous = baseline.get('scenarios', {}).get(scenario, {}).get(level)
+            if not previous:
+                continue
+            changes = []
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'rps'):
+                if previous.get(key):
+                    changes.append(f"{key} {(current[key] - previous[key]) / previous[key] * 100:+.1f}%")
+            lines.append(f"  {scenario} c={level}: " + ', '.join(changes))
+    return lines
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="resume,sentiment")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=32, help="requests per scenario and level")
+    parser.add_argument("--latency", default="lognormal:0.8,0.4", help="fake Gemini latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of fake Gemini calls that fail")
+    parser.add_argument("--pages", default="1,2,4,8",
+                        help="resume page counts to cycle through; past ~9 pages resumes take the chunked path")
+    parser.add_argument("--formats", default="pdf,docx")
+    parser.add_argument("--server", choices=("profile", "baseline"), default="profile",
+                        help="gunicorn_config.py profile or the single sync worker")
+    parser.add_argument("--workers", type=int, help="gunicorn workers for the profile")
+    parser.add_argument("--threads", type=int, help="threads per worker for the profile")
+    parser.add_argument("--keep-caches", action="store_true",
+                        help="leave the result cache, near-duplicate reuse and admission control on")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    scenarios = args.scenarios.split(',')
+    levels = [int(value) for value in args.concurrency.split(',')]
+    rng = random.Random(args.seed)
+    corpus = generate_corpus(args.requests * len(levels) + 1, [int(value) for value in args.pages.split(',')],
+                             args.formats.split(','), args.seed)
+
+    overrides = {}
+    if not args.keep_caches:
+        overrides.update({'RESULT_CACHE_ENABLED': '0', 'NEAR_DUP_ENABLED': '0', 'ADMISSION_ENABLED': '0'})
+    if args.workers:
+        overrides['GUNICORN_WORKERS'] = str(args.workers)
+    if args.threads:
+        overrides['GUNICORN_THREADS'] = str(args.threads)
+    command = PROFILE_COMMAND if args.server == 'profile' else BASELINE_COMMAND
+
+    report: Dict[str, Any] = {
+        'meta': {'commit': git_commit(), 'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                 'python': platform.python_version(), 'cpus': os.cpu_count(), 'args': vars(args)},
+        'extraction': measure_extraction(corpus),
+        'scenarios': {},
+    }
+    with FakeGemini(args.latency, args.error_rate, seed=args.seed) as fake, \
+            AppServer(command, fake.url, overrides) as server:
+        report['meta']['first_200_s'] = round(server.first_200_seconds, 3)
+        payloads = {
+            'resume': resume_requests(corpus),
+            'sentiment': sentiment_requests(args.requests * len(levels) + 1, rng),
+        }
+        endpoints = {'resume': '/analyze-resume', 'sentiment': '/analyze-sentiment'}
+        for scenario in scenarios:
+            url = server.url + endpoints[scenario]
+            remaining = payloads[scenario]
+            # One untimed request so lazy per-process setup is not charged to the first level
+            post(url, *remaining[0])
+            remaining = remaining[1:]
+            report['scenarios'][scenario] = {}
+            for level in levels:
+                batch, remaining = remaining[:args.requests], remaining[args.requests:]
+                report['scenarios'][scenario][str(level)] = run_level(url, batch, level)
+        report['fake_gemini'] = fake.stats()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"commit {report['meta']['commit']}, {args.server} server up in {report['meta']['first_200_s']} s, "
+          f"fake Gemini {args.latency}, error rate {args.error_rate}")
+    print(f"{'scenario':<11}{'conc':>5}{'req':>6}{'err':>5}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for scenario, results in report['scenarios'].items():
+        for level, row in results.items():
+            print(f"{scenario:<11}{level:>5}{row['requests']:>6}{row['errors']:>5}{row['rps']:>8}"
+                  f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+            top = sorted(row['stages'].items(), key=lambda entry: -entry[1]['mean_ms'])[:5]
+            print('    ' + ', '.join(f"{name} {stats['mean_ms']} ms" for name, stats in top))
+    print("extraction (in-process)")
+    for fmt, groups in report['extraction'].items():
+        for pages, row in groups.items():
+            print(f"  {fmt:<5}{pages:>4}: {row['docs_per_sec']} docs/s, {row['pages_per_sec']} pages/s, "
+                  f"{row['mb_per_sec']} MB/s, p50 {row['p50_ms']} ms")
+    if args.baseline:
+        with open(args.baseline) as f:
+            print('\n'.join(compare(report, json.load(f))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure the local lexicon sentiment scorer
+
+Reports the time to score one comment, to build the full provisional
+result shown while Gemini is pending, and the per-comment cost of NumPy
+bulk scoring over synthetic survey comments.
+
+Usage:
+    python -m benchmarks.local_sentiment [--comments 100000] [--json]
+"""
+import sys
+import json
+import time
+import random
+import argparse
+
+import numpy as np
+
+from utils.local_sentiment import get_lexicon, score_comment, score_comments, local_sentiment_result, local_bulk_results
+
+FILLER = (
+    "the team my manager work project people we our this company office time meetings process "
+    "and is are was have been with for on in at to of it"
+).split()
+PHRASES = [
+    "I'm looking for other opportunities", "not very supportive", "really great colleagues",
+    "but the workload is exhausting", "no growth here", "I don't feel valued", "pretty good overall",
+]
+
+def build_comment(rng: random.Random, vocabulary) -> str:
+    words = [rng.choice(FILLER) if rng.random() < 0.8 else rng.choice(vocabulary) for _ in range(rng.randint(5, 60))]
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(PHRASES))
+    return ' '.join(words) + '.'
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)) * 1e6, 1)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--comments", type=int, default=100000)
+    parser.add_argument("--single", type=int, default=5000, help="comments timed one at a time")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    vocabulary = list(get_lexicon().vocabulary)
+    comments = [build_comment(rng, vocabulary) for _ in range(args.comments)]
+    sample = comments[:args.single]
+
+    score_times, result_times = [], []
+    for text in sample:
+        start = time.perf_counter()
+        score_comment(text)
+        score_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        local_sentiment_result(text)
+        result_times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    score_comments(comments)
+    bulk_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    local_bulk_results([{'id': str(number), 'text': text} for number, text in enumerate(comments)])
+    bulk_results_seconds = time.perf_counter() - start
+
+    results = {
+        "score_us": {"p50": percentile(score_times, 50), "p99": percentile(score_times, 99)},
+        "result_us": {"p50": percentile(result_times, 50), "p99": percentile(result_times, 99)},
+        "bulk": {"comments": args.comments,
+                 "score_us_per_comment": round(bulk_seconds / args.comments * 1e6, 2),
+                 "result_us_per_comment": round(bulk_results_seconds / args.comments * 1e6, 2)},
+    }
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"score one comment: p50 {results['score_us']['p50']} us, p99 {results['score_us']['p99']} us")
+    print(f"provisional result: p50 {results['result_us']['p50']} us, p99 {results['result_us']['p99']} us")
+    print(f"bulk ({args.comments} comments): {results['bulk']['score_us_per_comment']} us/comment scores, "
+          f"{results['bulk']['result_us_per_comment']} us/comment results")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Measure near-duplicate index lookups as the number of stored resumes grows
+
+Fills a fresh index with synthetic signatures (plus a set of real resume-like
+texts and edited copies of them), then reports insert throughput, MinHash
+signature time, index lookup latency percentiles and how many edited copies
+were found.
+
+Usage:
+    python -m benchmarks.near_duplicates [--docs 100000] [--queries 500] [--json]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+import numpy as np
+
+from utils.result_cache import content_digest
+from utils.near_duplicates import NearDuplicateIndex, minhash_signature, NUM_PERM, NEAR_DUP_THRESHOLD
+
+WORDS = (
+    "python java kubernetes docker aws react sql agile led designed built migrated "
+    "scalable services pipeline team customers latency reduced improved platform data "
+    "engineer senior backend frontend cloud microservices testing delivery ownership"
+).split()
+
+def build_resume(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) + str(rng.randint(0, 500)) for _ in range(words))
+
+def edit(text: str, rng: random.Random, edits: int) -> str:
+    tokens = text.split()
+    for _ in range(edits):
+        tokens[rng.randrange(len(tokens))] = rng.choice(WORDS)
+    return ' '.join(tokens) + ' Phone: +1 555 0199'
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 3)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--words", type=int, default=600)
+    parser.add_argument("--edits", type=int, default=5, help="words changed in each near-duplicate query")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    np_rng = np.random.default_rng(args.seed)
+    path = os.path.join(tempfile.mkdtemp(), "near_duplicates.sqlite3")
+    index = NearDuplicateIndex(path)
+
+    originals = [build_resume(rng, args.words) for _ in range(args.queries)]
+    start = time.perf_counter()
+    for number, text in enumerate(originals):
+        index.add(content_digest(text), minhash_signature(text), f"resume-{number}.pdf")
+    # Filler documents only need realistic band keys, so random signatures stand in for texts
+    for number in range(args.docs - len(originals)):
+        signature = np_rng.integers(0, 1 << 32, size=NUM_PERM, dtype=np.uint32)
+        index.add(f"filler-{number}", signature)
+    insert_seconds = time.perf_counter() - start
+
+    queries = [edit(text, rng, args.edits) for text in originals]
+    signatures, signature_times = [], []
+    for text in queries:
+        start = time.perf_counter()
+        signatures.append(minhash_signature(text))
+        signature_times.append(time.perf_counter() - start)
+
+    lookup_times, found = [], 0
+    for number, signature in enumerate(signatures):
+        start = time.perf_counter()
+        matches = index.query(signature, NEAR_DUP_THRESHOLD)
+        lookup_times.append(time.perf_counter() - start)
+        found += any(match['label'] == f"resume-{number}.pdf" for match in matches)
+
+    results = {
+        "index": {"docs": args.docs, "inserts_per_sec": round(args.docs / insert_seconds, 1),
+                  "db_mib": round(os.path.getsize(path) / 2 ** 20, 1)},
+        "signature_ms": {"p50": percentile(signature_times, 50), "p99": percentile(signature_times, 99)},
+        "lookup_ms": {"p50": percentile(lookup_times, 50), "p95": percentile(lookup_times, 95),
+                      "p99": percentile(lookup_times, 99)},
+        "recall": round(found / len(queries), 3),
+    }
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"index: {args.docs} docs, {results['index']['db_mib']} MiB, "
+          f"{results['index']['inserts_per_sec']} inserts/s")
+    print(f"signature: p50 {results['signature_ms']['p50']} ms, p99 {results['signature_ms']['p99']} ms "
+          f"({args.words} words)")
+    print(f"lookup: p50 {results['lookup_ms']['p50']} ms, p95 {results['lookup_ms']['p95']} ms, "
+          f"p99 {results['lookup_ms']['p99']} ms")
+    print(f"recall: {results['recall']} of copies with {args.edits} edited words found")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Measure talent pool indexing throughput and search latency
+
+Appends synthetic resumes to a fresh pool, indexes them through the same
+flush and merge steps the background thread runs, then reports search
+latency percentiles for job-description queries.
+
+Usage:
+    python -m benchmarks.talent_pool [--docs 20000] [--queries 200] [--json]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+import numpy as np
+
+from utils.talent_pool import TalentPool
+
+WORDS = (
+    "python java kubernetes docker aws react sql agile led designed built migrated "
+    "scalable services pipeline team customers latency reduced improved platform data "
+    "engineer senior backend frontend cloud microservices testing delivery ownership "
+    "terraform postgresql kafka spark airflow typescript golang linux security mentoring"
+).split()
+# Zipf-distributed vocabulary, so a few terms are in most resumes and most terms are rare
+VOCABULARY = WORDS + [f"term{i}" for i in range(50000)]
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+def build_text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choices(VOCABULARY, WEIGHTS, k=words))
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 3)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--words", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    pool = TalentPool(tempfile.mkdtemp(), background=False)
+    texts = [build_text(rng, args.words) for _ in range(args.docs)]
+
+    add_times = []
+    for number, text in enumerate(texts):
+        start = time.perf_counter()
+        pool.add(text, f"resume-{number}.pdf")
+        add_times.append(time.perf_counter() - start)
+
+    # Index synchronously so the timing is not mixed with the background thread
+    start = time.perf_counter()
+    while pool.flush():
+        pass
+    flush_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    while pool.merge():
+        pass
+    merge_seconds = time.perf_counter() - start
+
+    queries = [build_text(rng, 120) for _ in range(args.queries)]
+    search_times = []
+    for query in queries:
+        start = time.perf_counter()
+        pool.search(query, args.limit)
+        search_times.append(time.perf_counter() - start)
+
+    stats = pool.stats()
+    results = {
+        "pool": {"docs": args.docs, "segments": stats["segments"],
+                 "index_mib": round(os.path.getsize(pool.index_path) / 2 ** 20, 1)},
+        "add_ms": {"p50": percentile(add_times, 50), "p99": percentile(add_times, 99)},
+        "indexing": {"docs_per_sec": round(args.docs / flush_seconds, 1), "merge_seconds": round(merge_seconds, 2)},
+        "search_ms": {"p50": percentile(search_times, 50), "p95": percentile(search_times, 95),
+                      "p99": percentile(search_times, 99)},
+    }
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"pool: {args.docs} docs in {stats['segments']} segments, index {results['pool']['index_mib']} MiB")
+    print(f"add: p50 {results['add_ms']['p50']} ms, p99 {results['add_ms']['p99']} ms")
+    print(f"indexing: {results['indexing']['docs_per_sec']} docs/s, merging {results['indexing']['merge_seconds']} s")
+    print(f"search (top {args.limit}): p50 {results['search_ms']['p50']} ms, p95 {results['search_ms']['p95']} ms, "
+          f"p99 {results['search_ms']['p99']} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Production serving profile for the autoscale deployment
+
+    gunicorn --config gunicorn_config.py main:app
+
+The app is imported once in the master (preload_app) together with the
+heavy SDK and parser modules, so forked workers share them copy-on-write
+and a cold start pays the imports once instead of once per worker. Each
+worker then primes its own Gemini client, database pool and caches before
+it accepts requests; /readyz reports when that is done.
+
+Requests spend nearly all their time waiting on Gemini, so workers are
+gthread workers: a few processes for CPU work (PDF parsing, scoring),
+many threads each for concurrent LLM calls.
+
+Every setting can be overridden through the environment (GUNICORN_*).
+"""
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("GUNICORN_WORKERS", str(min(4, multiprocessing.cpu_count()))))
+threads = int(os.environ.get("GUNICORN_THREADS", "16"))
+# Above the analysis latency budgets, so a slow Gemini call degrades instead of the worker being killed
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+# Recycle workers now and then to bound memory growth; with preloading a respawn is cheap
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before any worker forks
+    from utils.warmup import preload_modules
+    server.log.info(f"Preloaded SDK and parser modules in {preload_modules():.3f}s")
+
+def post_fork(server, worker):
+    # Connections the master opened while importing the app must not be shared across processes
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
+    # The PDF page pool must exist before this worker starts its request threads
+    from utils.resume_parser import start_process_pool
+    start_process_pool()
+
+def post_worker_init(worker):
+    from app import warm_up
+    timings = warm_up()
+    worker.log.info(f"Worker {worker.pid} warmed up in {timings['total']:.3f}s")
@@ -1,32 +1,283 @@
-# This file is included for future expansion of the application
-# Currently we're not using database models, but this structure allows for easy addition
+import json
+import base64
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
 
-# If database functionality is added later, uncomment and modify as needed:
-'''
 from app import db
-from flask_login import UserMixin
-from datetime import datetime
+from utils.metrics import stage
+from utils.sentiment_trends import record_sentiment_results
 
-class User(UserMixin, db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(64), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(256))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 200
 
 class Resume(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     filename = db.Column(db.String(255), nullable=False)
     content = db.Column(db.Text)
+    job_description = db.Column(db.Text)
+    match_score = db.Column(db.Float)
     analysis_result = db.Column(db.JSON)
-    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Composite indexes back the keyset pagination below
+    __table_args__ = (
+        db.Index('ix_resume_created_at_id', 'created_at', 'id'),
+        db.Index('ix_resume_match_score_id', 'match_score', 'id'),
+    )
+
+    def to_summary(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'match_score': self.match_score,
+            'created_at': self.created_at.isoformat(),
+        }
 
 class SentimentAnalysis(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     feedback_text = db.Column(db.Text, nullable=False)
     sentiment_score = db.Column(db.Float)
+    attrition_risk = db.Column(db.String(16))
     analysis_result = db.Column(db.JSON)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-'''
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_sentiment_analysis_created_at_id', 'created_at', 'id'),
+        db.Index('ix_sentiment_analysis_sentiment_score_id', 'sentiment_score', 'id'),
+    )
+
+    def to_summary(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'sentiment_score': self.sentiment_score,
+            'attrition_risk': self.attrition_risk,
+            'primary_sentiment': (self.analysis_result or {}).get('primary_sentiment'),
+            'created_at': self.created_at.isoformat(),
+        }
+
+def _score(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _resume_row(filename: str, resume_text: str, job_description: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'filename': filename,
+        'content': resume_text,
+        'job_description': job_description,
+        'match_score': _score(result.get('match_score')),
+        'analysis_result': result,
+        'created_at': datetime.utcnow(),
+    }
+
+def _sentiment_row(feedback_text: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    attrition_risk = result.get('attrition_risk')
+    return {
+        'feedback_text': feedback_text,
+        'sentiment_score': _score(result.get('sentiment_score')),
+        'attrition_risk': attrition_risk.get('level') if isinstance(attrition_risk, dict) else None,
+        'analysis_result': result,
+        'created_at': datetime.utcnow(),
+    }
+
+def save_resume_analysis(filename: str, resume_text: str, job_description: str,
+                         result: Dict[str, Any]) -> Optional[int]:
+    """
+    Persist a resume analysis
+
+    Storage failures are logged and never fail the analysis itself.
+
+    Args:
+        filename (str): Uploaded file name
+        resume_text (str): Extracted text from resume
+        job_description (str): Job description text
+        result (Dict[str, Any]): Analysis result
+
+    Returns:
+        Optional[int]: Id of the stored row, or None if it could not be stored
+    """
+    try:
+        with stage('db_save'):
+            row = Resume(**_resume_row(filename, resume_text, job_description, result))
+            db.session.add(row)
+            db.session.commit()
+        return row.id
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Failed to store resume analysis: {str(e)}")
+        return None
+
+def save_resume_analyses(rows: List[Dict[str, Any]]) -> int:
+    """
+    Bulk-insert resume analyses from a batch run in one executemany round trip
+
+    Args:
+        rows (List[Dict[str, Any]]): Dicts with filename, resume_text, job_description and result
+
+    Returns:
+        int: Number of rows stored
+    """
+    if not rows:
+        return 0
+    try:
+        with stage('db_save'):
+            db.session.execute(db.insert(Resume), [
+                _resume_row(row['filename'], row['resume_text'], row['job_description'], row['result'])
+                for row in rows
+            ])
+            db.session.commit()
+        return len(rows)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Failed to store batch resume analyses: {str(e)}")
+        return 0
+
+def save_sentiment_analysis(feedback_text: str, result: Dict[str, Any], team: Optional[str] = None) -> Optional[int]:
+    """
+    Persist a sentiment analysis and fold it into the team's trend rollups
+
+    Args:
+        feedback_text (str): Employee feedback text
+        result (Dict[str, Any]): Analysis result
+        team (Optional[str]): Team the feedback came from
+
+    Returns:
+        Optional[int]: Id of the stored row, or None if it could not be stored
+    """
+    try:
+        with stage('db_save'):
+            fields = _sentiment_row(feedback_text, result)
+            row = SentimentAnalysis(**fields)
+            db.session.add(row)
+            db.session.commit()
+        record_sentiment_results([(result, team, fields['created_at'])])
+        return row.id
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Failed to store sentiment analysis: {str(e)}")
+        return None
+
+def save_sentiment_analyses(rows: List[Dict[str, Any]]) -> int:
+    """
+    Bulk-insert sentiment analyses from a bulk upload in one executemany round trip
+
+    Args:
+        rows (List[Dict[str, Any]]): Dicts with feedback_text, result and optionally team
+
+    Returns:
+        int: Number of rows stored
+    """
+    if not rows:
+        return 0
+    try:
+        with stage('db_save'):
+            stored = [_sentiment_row(row['feedback_text'], row['result']) for row in rows]
+            db.session.execute(db.insert(SentimentAnalysis), stored)
+            db.session.commit()
+        record_sentiment_results(
+            (item['analysis_result'], row.get('team'), item['created_at']) for row, item in zip(rows, stored)
+        )
+        return len(rows)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Failed to store bulk sentiment analyses: {str(e)}")
+        return 0
+
+def recent_sentiment_results(limit: int = 500) -> List[Dict[str, Any]]:
+    """
+    Fetch the most recent stored sentiment analyses with their feedback text
+
+    Args:
+        limit (int): Maximum number of rows
+
+    Returns:
+        List[Dict[str, Any]]: Dicts with feedback_text and result, newest first
+    """
+    rows = db.session.execute(
+        db.select(SentimentAnalysis.feedback_text, SentimentAnalysis.analysis_result)
+        .order_by(SentimentAnalysis.created_at.desc(), SentimentAnalysis.id.desc())
+        .limit(limit)
+    ).all()
+    return [{'feedback_text': text, 'result': result} for text, result in rows]
+
+def load_analysis_result(model, row_id: Optional[int]) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the stored analysis JSON for a row id kept in the session
+
+    Args:
+        model: Resume or SentimentAnalysis
+        row_id (Optional[int]): Row id
+
+    Returns:
+        Optional[Dict[str, Any]]: The analysis result, or None
+    """
+    if row_id is None:
+        return None
+    row = db.session.get(model, row_id)
+    return row.analysis_result if row is not None else None
+
+def _encode_cursor(value: Any, row_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def _decode_cursor(cursor: str, is_datetime: bool) -> tuple:
+    # Cursors come back from clients, so anything but a [value, row id] pair we could have issued is a ValueError
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(decoded, list) or len(decoded) != 2:
+        raise ValueError("Invalid cursor")
+    value, row_id = decoded
+    if type(row_id) is not int or not 0 < row_id < 2 ** 63:
+        raise ValueError("Invalid cursor")
+    if is_datetime:
+        if not isinstance(value, str):
+            raise ValueError("Invalid cursor")
+        value = datetime.fromisoformat(value)
+    elif type(value) not in (int, float):
+        raise ValueError("Invalid cursor")
+    return value, row_id
+
+def list_page(model, sort: str = 'created_at', cursor: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+    """
+    Return one page of stored analyses, newest or highest-scoring first
+
+    Uses keyset pagination on (sort column, id), so every page is an index
+    range scan and costs the same no matter how deep the client pages.
+
+    Args:
+        model: Resume or SentimentAnalysis
+        sort (str): Column to order by, "created_at" or the model's score column
+        cursor (Optional[str]): Opaque cursor from the previous page
+        limit (int): Page size, capped at MAX_PAGE_SIZE
+
+    Returns:
+        Dict[str, Any]: Page items and the cursor for the next page (None on the last page)
+    """
+    allowed = {'created_at'} | ({'match_score'} if model is Resume else {'sentiment_score'})
+    if sort not in allowed:
+        raise ValueError(f"Unsupported sort column: {sort}")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    column = getattr(model, sort)
+
+    query = db.select(model).where(column.isnot(None))
+    if cursor:
+        value, row_id = _decode_cursor(cursor, sort == 'created_at')
+        query = query.where(db.tuple_(column, model.id) < (value, row_id))
+    query = query.order_by(column.desc(), model.id.desc()).limit(limit + 1)
+
+    rows = db.session.execute(query).scalars().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(getattr(last, sort), last.id)
+    return {'items': [row.to_summary() for row in rows], 'next_cursor': next_cursor}
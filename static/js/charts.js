@@ -180,6 +180,186 @@ function addCenterText(ctx, text, color) {
   chart.update();
 }
 
+// Trend charts, drawn from the pre-aggregated series served by /api/sentiment-trends
+const trendCharts = {};
+const THEME_COLORS = [
+  'rgba(13, 110, 253, 0.8)',
+  'rgba(102, 16, 242, 0.8)',
+  'rgba(214, 51, 132, 0.8)',
+  'rgba(253, 126, 20, 0.8)',
+  'rgba(32, 201, 151, 0.8)'
+];
+
+function drawTrendChart(id, config) {
+  const ctx = document.getElementById(id);
+  if (!ctx) return;
+  
+  if (trendCharts[id]) {
+    trendCharts[id].destroy();
+  }
+  trendCharts[id] = new Chart(ctx, config);
+}
+
+function renderTrendCharts(series) {
+  const empty = document.getElementById('trend-empty');
+  const charts = document.getElementById('trend-charts');
+  const hasData = series.summary.count > 0;
+  if (empty) empty.classList.toggle('d-none', hasData);
+  if (charts) charts.classList.toggle('d-none', !hasData);
+  if (!hasData) return;
+  
+  const labels = series.labels;
+  const quantiles = series.score_quantiles;
+  
+  // Mean score with the 10th-90th percentile band around the median
+  drawTrendChart('trend-score-chart', {
+    type: 'line',
+    data: {
+      labels: labels,
+      datasets: [
+        {
+          label: '90th percentile',
+          data: quantiles.p90,
+          borderColor: 'rgba(40, 167, 69, 0.3)',
+          backgroundColor: 'rgba(40, 167, 69, 0.1)',
+          pointRadius: 0,
+          fill: '+1'
+        },
+        {
+          label: '10th percentile',
+          data: quantiles.p10,
+          borderColor: 'rgba(220, 53, 69, 0.3)',
+          pointRadius: 0,
+          fill: false
+        },
+        {
+          label: 'Median',
+          data: quantiles.p50,
+          borderColor: 'rgba(255, 193, 7, 0.9)',
+          borderDash: [4, 4],
+          fill: false
+        },
+        {
+          label: 'Mean',
+          data: series.mean_score,
+          borderColor: 'rgba(13, 202, 240, 1)',
+          backgroundColor: 'rgba(13, 202, 240, 1)',
+          fill: false
+        }
+      ]
+    },
+    options: {
+      responsive: true,
+      maintainAspectRatio: false,
+      spanGaps: true,
+      scales: {
+        y: {
+          min: -1,
+          max: 1
+        }
+      },
+      plugins: {
+        tooltip: {
+          mode: 'index',
+          intersect: false,
+          callbacks: {
+            footer: function(items) {
+              return items.length ? series.count[items[0].dataIndex] + ' responses' : '';
+            }
+          }
+        }
+      }
+    }
+  });
+  
+  // Attrition risk levels per period, stacked
+  drawTrendChart('trend-risk-chart', {
+    type: 'bar',
+    data: {
+      labels: labels,
+      datasets: [
+        { label: 'High', data: series.attrition_risk.high, backgroundColor: 'rgba(220, 53, 69, 0.7)' },
+        { label: 'Medium', data: series.attrition_risk.medium, backgroundColor: 'rgba(255, 193, 7, 0.7)' },
+        { label: 'Low', data: series.attrition_risk.low, backgroundColor: 'rgba(40, 167, 69, 0.7)' },
+        { label: 'Unknown', data: series.attrition_risk.unknown, backgroundColor: 'rgba(200, 200, 200, 0.4)' }
+      ]
+    },
+    options: {
+      responsive: true,
+      maintainAspectRatio: false,
+      scales: {
+        x: { stacked: true },
+        y: { stacked: true, beginAtZero: true, ticks: { precision: 0 } }
+      }
+    }
+  });
+  
+  // Mentions of the window's top themes per period
+  drawTrendChart('trend-theme-chart', {
+    type: 'line',
+    data: {
+      labels: labels,
+      datasets: Object.entries(series.themes).map(([theme, counts], index) => ({
+        label: theme,
+        data: counts,
+        borderColor: THEME_COLORS[index % THEME_COLORS.length],
+        backgroundColor: THEME_COLORS[index % THEME_COLORS.length],
+        fill: false
+      }))
+    },
+    options: {
+      responsive: true,
+      maintainAspectRatio: false,
+      scales: {
+        y: { beginAtZero: true, ticks: { precision: 0 } }
+      }
+    }
+  });
+}
+
+function updateTeamOptions(teams) {
+  const select = document.getElementById('trend-team');
+  const datalist = document.getElementById('trend-team-options');
+  if (select) {
+    const selected = select.value;
+    select.innerHTML = '<option value="">All teams</option>';
+    teams.forEach(item => {
+      const option = document.createElement('option');
+      option.value = item.team;
+      option.textContent = item.team + ' (' + item.count + ')';
+      select.appendChild(option);
+    });
+    select.value = selected;
+  }
+  if (datalist) {
+    datalist.innerHTML = '';
+    teams.forEach(item => {
+      const option = document.createElement('option');
+      option.value = item.team;
+      datalist.appendChild(option);
+    });
+  }
+}
+
+function loadSentimentTrends() {
+  const teamSelect = document.getElementById('trend-team');
+  const weeksSelect = document.getElementById('trend-weeks');
+  if (!teamSelect || !weeksSelect) return Promise.resolve();
+  
+  const params = new URLSearchParams({ weeks: weeksSelect.value });
+  if (teamSelect.value) {
+    params.set('team', teamSelect.value);
+  }
+  return fetch('/api/sentiment-trends?' + params.toString())
+    .then(response => response.json())
+    .then(data => {
+      if (!data.success) return;
+      updateTeamOptions(data.teams);
+      renderTrendCharts(data);
+    })
+    .catch(error => console.error('Error loading sentiment trends:', error));
+}
+
 document.addEventListener('DOMContentLoaded', function() {
   // Initialize attrition gauge if the element exists
   const attritionRiskEl = document.getElementById('attrition-risk');
@@ -187,4 +367,13 @@ document.addEventListener('DOMContentLoaded', function() {
     const riskLevel = attritionRiskEl.textContent.toLowerCase();
     initializeAttritionGauge(riskLevel);
   }
+  
+  // Load the trend charts and reload them when the filters change
+  ['trend-team', 'trend-weeks'].forEach(id => {
+    const el = document.getElementById(id);
+    if (el) {
+      el.addEventListener('change', loadSentimentTrends);
+    }
+  });
+  loadSentimentTrends();
 });
@@ -59,7 +59,14 @@ document.addEventListener('DOMContentLoaded', function() {
       // Submit form with AJAX
       const formData = new FormData(resumeForm);
       
-      fetch('/analyze-resume', {
+      // Render fields as they are generated, falling back to a queued job
+      streamAnalysis('/analyze-resume/stream', formData, (partial, first) => {
+        if (loadingOverlay) {
+          loadingOverlay.style.display = 'none';
+        }
+        displayResumeAnalysis(partial, first);
+      })
+      .catch(error => error.shed ? { success: false, error: error.message } : fetch('/analyze-resume', {
         method: 'POST',
         body: formData,
         headers: {
@@ -67,6 +74,7 @@ document.addEventListener('DOMContentLoaded', function() {
         }
       })
       .then(response => response.json())
+      .then(data => (data.success && data.job_id ? waitForJob(data.status_url) : data)))
       .then(data => {
         // Hide loading overlay
         if (loadingOverlay) {
@@ -74,7 +82,7 @@ document.addEventListener('DOMContentLoaded', function() {
         }
         
         if (data.success) {
-          displayResumeAnalysis(data.result);
+          displayResumeAnalysis(data.result, !data.streamed);
         } else {
           showAlert(data.error || 'An error occurred during resume analysis', 'danger');
         }
@@ -90,12 +98,184 @@ document.addEventListener('DOMContentLoaded', function() {
     });
   }
   
+  // Handle batch screening
+  const batchForm = document.getElementById('batch-form');
+  const batchFilesInput = document.getElementById('batch-files');
+  const batchJobDescriptionInput = document.getElementById('batch-job-description');
+  const batchSubmitButton = document.getElementById('batch-submit');
+  const batchResultSection = document.getElementById('batch-result-section');
+  const batchResultsBody = document.getElementById('batch-results-body');
+  const batchStatus = document.getElementById('batch-status');
+  const batchProgress = document.getElementById('batch-progress');
+  const batchProgressBar = document.getElementById('batch-progress-bar');
+  let batchRows = [];
+  let batchTotal = 0;
+
+  if (batchForm) {
+    batchForm.addEventListener('submit', function(e) {
+      e.preventDefault();
+
+      if (!batchFilesInput.files.length) {
+        showAlert('Please select one or more resume files', 'danger');
+        return;
+      }
+
+      if (!batchJobDescriptionInput.value.trim()) {
+        showAlert('Please enter a job description', 'danger');
+        return;
+      }
+
+      batchRows = [];
+      batchTotal = 0;
+      renderBatchTable();
+      batchResultSection.classList.remove('d-none');
+      batchProgress.classList.remove('d-none');
+      batchSubmitButton.disabled = true;
+
+      fetch('/analyze-resume-batch', {
+        method: 'POST',
+        body: new FormData(batchForm),
+        headers: {
+          'X-Requested-With': 'XMLHttpRequest'
+        }
+      })
+      .then(response => {
+        if (!response.ok) {
+          return response.json().then(data => {
+            throw new Error(data.error || 'Batch screening failed');
+          });
+        }
+        return readNdjson(response, handleBatchEvent);
+      })
+      .catch(error => {
+        showAlert('Error screening batch: ' + error.message, 'danger');
+      })
+      .finally(() => {
+        batchSubmitButton.disabled = false;
+      });
+    });
+  }
+
+  // Read a newline-delimited JSON stream, calling onEvent for every line
+  function readNdjson(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    function pump() {
+      return reader.read().then(({ done, value }) => {
+        buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.filter(line => line.trim()).forEach(line => onEvent(JSON.parse(line)));
+        if (done) {
+          if (buffer.trim()) {
+            onEvent(JSON.parse(buffer));
+          }
+          return;
+        }
+        return pump();
+      });
+    }
+
+    return pump();
+  }
+
+  function handleBatchEvent(event) {
+    if (event.event === 'start') {
+      batchTotal = event.total;
+    } else if (event.event === 'result') {
+      batchRows.push(event);
+    }
+    renderBatchTable();
+  }
+
+  // Render the batch table ranked by match score, then pre-screen score, failures last
+  function renderBatchTable() {
+    if (!batchResultsBody) return;
+
+    const score = row => {
+      if (row.status === 'ok' && row.result) {
+        return Number(row.result.match_score) || 0;
+      }
+      if (row.status === 'skipped') {
+        return (row.prescreen_score || 0) - 1;
+      }
+      return -2;
+    };
+    const ranked = batchRows.slice().sort((a, b) => score(b) - score(a));
+
+    batchResultsBody.innerHTML = '';
+    ranked.forEach((row, position) => {
+      const tr = document.createElement('tr');
+      const result = row.result || {};
+
+      const cells = [
+        row.status === 'ok' ? String(position + 1) : '-',
+        row.filename,
+        row.status === 'ok' ? String(result.match_score ?? 0) : '-',
+        row.prescreen_score !== undefined ? `${Math.round(row.prescreen_score * 100)}%` : '-',
+        (result.matching_skills || []).join(', '),
+        (result.missing_skills || []).join(', ')
+      ];
+      cells.forEach(text => {
+        const td = document.createElement('td');
+        td.textContent = text;
+        tr.appendChild(td);
+      });
+
+      const statusCell = document.createElement('td');
+      const badge = document.createElement('span');
+      if (row.status === 'ok') {
+        badge.className = 'badge bg-success';
+        badge.textContent = 'Analyzed';
+      } else if (row.status === 'skipped') {
+        badge.className = 'badge bg-secondary';
+        badge.textContent = 'Filtered';
+      } else {
+        badge.className = 'badge bg-danger';
+        badge.textContent = 'Failed';
+      }
+      if (row.error) {
+        badge.title = row.error;
+      }
+      statusCell.appendChild(badge);
+      tr.appendChild(statusCell);
+
+      batchResultsBody.appendChild(tr);
+    });
+
+    const percent = batchTotal ? Math.round((batchRows.length / batchTotal) * 100) : 0;
+    if (batchStatus) {
+      batchStatus.textContent = `${batchRows.length} / ${batchTotal}`;
+    }
+    if (batchProgressBar) {
+      batchProgressBar.style.width = `${percent}%`;
+      batchProgressBar.textContent = `${percent}%`;
+    }
+  }
+
   // Display resume analysis results
-  function displayResumeAnalysis(result) {
+  function displayResumeAnalysis(result, scroll = true) {
     if (resultSection) {
       // Make result section visible
       resultSection.classList.remove('d-none');
       
+      // Flag provisional results computed locally after a timeout
+      const degradedNotice = document.getElementById('degraded-notice');
+      if (degradedNotice) {
+        degradedNotice.classList.toggle('d-none', !result.degraded);
+      }
+      
+      const duplicateNotice = document.getElementById('duplicate-notice');
+      if (duplicateNotice) {
+        const matches = result.near_duplicates || [];
+        duplicateNotice.classList.toggle('d-none', matches.length === 0);
+        document.getElementById('duplicate-matches').textContent = matches
+          .map(match => `${match.filename} (${Math.round(match.similarity * 100)}% similar)`)
+          .join(', ');
+      }
+      
       // Set values in the result display
       const matchScore = document.getElementById('match-score');
       if (matchScore) {
@@ -203,7 +383,9 @@ document.addEventListener('DOMContentLoaded', function() {
       }
       
       // Scroll to results
-      resultSection.scrollIntoView({ behavior: 'smooth' });
+      if (scroll) {
+        resultSection.scrollIntoView({ behavior: 'smooth' });
+      }
     }
   }
   
@@ -248,6 +430,94 @@ document.addEventListener('DOMContentLoaded', function() {
     ctx.stroke();
   }
   
+  // POST a form to an SSE analysis endpoint, calling onPartial with the fields received so far.
+  // Rejects when streaming is unavailable or fails, so the caller can fall back to a job.
+  // A request shed by admission control rejects with error.shed set; retrying it as a job would be shed too.
+  function streamAnalysis(url, formData, onPartial) {
+    return fetch(url, {
+      method: 'POST',
+      body: formData,
+      headers: {
+        'X-Requested-With': 'XMLHttpRequest'
+      }
+    })
+    .then(response => {
+      if (response.status === 429 || response.status === 503) {
+        return response.json().then(data => {
+          const error = new Error(data.error || 'The service is busy, please retry shortly');
+          error.shed = true;
+          throw error;
+        });
+      }
+      const contentType = response.headers.get('Content-Type') || '';
+      if (!response.ok || !response.body || !contentType.startsWith('text/event-stream')) {
+        throw new Error('Streaming unavailable');
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      const partial = {};
+      let buffer = '';
+      let streamed = false;
+
+      function handleEvent(block) {
+        let name = 'message';
+        let data = '';
+        block.split('\n').forEach(line => {
+          if (line.startsWith('event:')) {
+            name = line.slice(6).trim();
+          } else if (line.startsWith('data:')) {
+            data += line.slice(5).trim();
+          }
+        });
+        const payload = data ? JSON.parse(data) : {};
+        if (name === 'field') {
+          partial[payload.name] = payload.value;
+          onPartial(partial, !streamed);
+          streamed = true;
+        } else if (name === 'done') {
+          return { ...payload, streamed };
+        } else if (name === 'error') {
+          throw new Error(payload.error || 'Streaming failed');
+        }
+        return null;
+      }
+
+      function pump() {
+        return reader.read().then(({ done, value }) => {
+          buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+          const blocks = buffer.split('\n\n');
+          buffer = blocks.pop();
+          for (const block of blocks) {
+            const result = block.trim() ? handleEvent(block) : null;
+            if (result) {
+              return result;
+            }
+          }
+          if (done) {
+            throw new Error('Stream ended before the analysis finished');
+          }
+          return pump();
+        });
+      }
+
+      return pump();
+    });
+  }
+  
+  // Poll a queued analysis job until it finishes, backing off up to 2 seconds
+  function waitForJob(statusUrl, delay = 500) {
+    return new Promise(resolve => setTimeout(resolve, delay))
+      .then(() => fetch(statusUrl))
+      .then(response => response.json())
+      .then(job => {
+        if (job.status === 'done' || job.status === 'error' || !job.status) {
+          return job;
+        }
+        return waitForJob(statusUrl, Math.min(delay * 1.5, 2000));
+      });
+  }
+  
   // Helper function to show alerts
   function showAlert(message, type = 'info') {
     const alertsContainer = document.getElementById('alerts-container');
@@ -37,7 +37,14 @@ document.addEventListener('DOMContentLoaded', function() {
       // Submit form with AJAX
       const formData = new FormData(sentimentForm);
       
-      fetch('/analyze-sentiment', {
+      // Render fields as they are generated, falling back to a queued job
+      streamAnalysis('/analyze-sentiment/stream', formData, (partial, first) => {
+        if (loadingOverlay) {
+          loadingOverlay.style.display = 'none';
+        }
+        displaySentimentAnalysis(partial, first);
+      })
+      .catch(error => error.shed ? { success: false, error: error.message } : fetch('/analyze-sentiment', {
         method: 'POST',
         body: formData,
         headers: {
@@ -45,6 +52,19 @@ document.addEventListener('DOMContentLoaded', function() {
         }
       })
       .then(response => response.json())
+      .then(data => {
+        if (data.success && data.job_id) {
+          // Show the instant local score while the full analysis runs
+          if (data.provisional) {
+            if (loadingOverlay) {
+              loadingOverlay.style.display = 'none';
+            }
+            displaySentimentAnalysis(data.provisional);
+          }
+          return waitForJob(data.status_url).then(job => ({ ...job, streamed: Boolean(data.provisional) }));
+        }
+        return data;
+      }))
       .then(data => {
         // Hide loading overlay
         if (loadingOverlay) {
@@ -52,7 +72,8 @@ document.addEventListener('DOMContentLoaded', function() {
         }
         
         if (data.success) {
-          displaySentimentAnalysis(data.result);
+          displaySentimentAnalysis(data.result, !data.streamed);
+          refreshTrends();
         } else {
           showAlert(data.error || 'An error occurred during sentiment analysis', 'danger');
         }
@@ -69,11 +90,21 @@ document.addEventListener('DOMContentLoaded', function() {
   }
   
   // Display sentiment analysis results
-  function displaySentimentAnalysis(result) {
+  function displaySentimentAnalysis(result, scroll = true) {
     if (resultSection) {
       // Make result section visible
       resultSection.classList.remove('d-none');
       
+      // Flag results computed locally, either as an instant pre-score or after a failure
+      const degradedNotice = document.getElementById('degraded-notice');
+      if (degradedNotice) {
+        degradedNotice.classList.toggle('d-none', !result.degraded);
+      }
+      const provisionalNotice = document.getElementById('provisional-notice');
+      if (provisionalNotice) {
+        provisionalNotice.classList.toggle('d-none', !result.provisional);
+      }
+      
       // Set sentiment score and label
       const sentimentScoreEl = document.getElementById('sentiment-score');
       const sentimentLabelEl = document.getElementById('sentiment-label');
@@ -207,7 +238,17 @@ document.addEventListener('DOMContentLoaded', function() {
       updateSentimentChart(result);
       
       // Scroll to results
-      resultSection.scrollIntoView({ behavior: 'smooth' });
+      if (scroll) {
+        resultSection.scrollIntoView({ behavior: 'smooth' });
+      }
+    }
+  }
+  
+  // Refresh the trend charts once a new analysis has been stored
+  function refreshTrends() {
+    // This function is implemented in charts.js
+    if (typeof loadSentimentTrends === 'function') {
+      loadSentimentTrends();
     }
   }
   
@@ -219,6 +260,204 @@ document.addEventListener('DOMContentLoaded', function() {
     }
   }
   
+  // POST a form to an SSE analysis endpoint, calling onPartial with the fields received so far.
+  // Rejects when streaming is unavailable or fails, so the caller can fall back to a job.
+  // A request shed by admission control rejects with error.shed set; retrying it as a job would be shed too.
+  function streamAnalysis(url, formData, onPartial) {
+    return fetch(url, {
+      method: 'POST',
+      body: formData,
+      headers: {
+        'X-Requested-With': 'XMLHttpRequest'
+      }
+    })
+    .then(response => {
+      if (response.status === 429 || response.status === 503) {
+        return response.json().then(data => {
+          const error = new Error(data.error || 'The service is busy, please retry shortly');
+          error.shed = true;
+          throw error;
+        });
+      }
+      const contentType = response.headers.get('Content-Type') || '';
+      if (!response.ok || !response.body || !contentType.startsWith('text/event-stream')) {
+        throw new Error('Streaming unavailable');
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      const partial = {};
+      let buffer = '';
+      let streamed = false;
+
+      function handleEvent(block) {
+        let name = 'message';
+        let data = '';
+        block.split('\n').forEach(line => {
+          if (line.startsWith('event:')) {
+            name = line.slice(6).trim();
+          } else if (line.startsWith('data:')) {
+            data += line.slice(5).trim();
+          }
+        });
+        const payload = data ? JSON.parse(data) : {};
+        if (name === 'provisional') {
+          // Local pre-score; streamed fields replace its values as they arrive
+          Object.assign(partial, payload.result);
+          onPartial(partial, !streamed);
+          streamed = true;
+        } else if (name === 'field') {
+          partial[payload.name] = payload.value;
+          onPartial(partial, !streamed);
+          streamed = true;
+        } else if (name === 'done') {
+          return { ...payload, streamed };
+        } else if (name === 'error') {
+          throw new Error(payload.error || 'Streaming failed');
+        }
+        return null;
+      }
+
+      function pump() {
+        return reader.read().then(({ done, value }) => {
+          buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+          const blocks = buffer.split('\n\n');
+          buffer = blocks.pop();
+          for (const block of blocks) {
+            const result = block.trim() ? handleEvent(block) : null;
+            if (result) {
+              return result;
+            }
+          }
+          if (done) {
+            throw new Error('Stream ended before the analysis finished');
+          }
+          return pump();
+        });
+      }
+
+      return pump();
+    });
+  }
+  
+  // Poll a queued analysis job until it finishes, backing off up to 2 seconds
+  function waitForJob(statusUrl, delay = 500) {
+    return new Promise(resolve => setTimeout(resolve, delay))
+      .then(() => fetch(statusUrl))
+      .then(response => response.json())
+      .then(job => {
+        if (job.status === 'done' || job.status === 'error' || !job.status) {
+          return job;
+        }
+        return waitForJob(statusUrl, Math.min(delay * 1.5, 2000));
+      });
+  }
+  
+  // Handle bulk survey analysis
+  const bulkForm = document.getElementById('bulk-form');
+  const bulkFileInput = document.getElementById('bulk-file');
+  const bulkSubmitButton = document.getElementById('bulk-submit');
+  const bulkResultSection = document.getElementById('bulk-result-section');
+
+  if (bulkForm) {
+    bulkForm.addEventListener('submit', function(e) {
+      e.preventDefault();
+
+      if (!bulkFileInput.files.length) {
+        showAlert('Please select a CSV or JSONL file', 'danger');
+        return;
+      }
+
+      renderRollup({ count: 0, failed: 0, mean_sentiment_score: null, attrition_risk_levels: {}, top_themes: [] });
+      bulkResultSection.classList.remove('d-none');
+      bulkSubmitButton.disabled = true;
+
+      fetch('/analyze-sentiment-bulk', {
+        method: 'POST',
+        body: new FormData(bulkForm),
+        headers: {
+          'X-Requested-With': 'XMLHttpRequest'
+        }
+      })
+      .then(response => {
+        if (!response.ok) {
+          return response.json().then(data => {
+            throw new Error(data.error || 'Bulk analysis failed');
+          });
+        }
+        return readNdjson(response, handleBulkEvent);
+      })
+      .catch(error => {
+        showAlert('Error analyzing file: ' + error.message, 'danger');
+      })
+      .finally(() => {
+        bulkSubmitButton.disabled = false;
+      });
+    });
+  }
+
+  // Read a newline-delimited JSON stream, calling onEvent for every line
+  function readNdjson(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    function pump() {
+      return reader.read().then(({ done, value }) => {
+        buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.filter(line => line.trim()).forEach(line => onEvent(JSON.parse(line)));
+        if (done) {
+          if (buffer.trim()) {
+            onEvent(JSON.parse(buffer));
+          }
+          return;
+        }
+        return pump();
+      });
+    }
+
+    return pump();
+  }
+
+  function handleBulkEvent(event) {
+    if (event.event === 'rollup' || event.event === 'done') {
+      renderRollup(event);
+      if (event.event === 'done') {
+        refreshTrends();
+      }
+    } else if (event.event === 'error') {
+      showAlert('Error analyzing file: ' + event.error, 'danger');
+    }
+  }
+
+  function renderRollup(rollup) {
+    document.getElementById('bulk-status').textContent = `${rollup.count} analyzed`;
+    document.getElementById('bulk-mean-score').textContent =
+      rollup.mean_sentiment_score === null ? '-' : Number(rollup.mean_sentiment_score).toFixed(2);
+    document.getElementById('bulk-failed').textContent = [
+      rollup.failed ? `${rollup.failed} comments could not be analyzed` : '',
+      rollup.degraded ? `${rollup.degraded} scored locally after AI failures` : ''
+    ].filter(Boolean).join('; ');
+
+    const riskList = document.getElementById('bulk-risk-levels');
+    riskList.innerHTML = '';
+    Object.entries(rollup.attrition_risk_levels || {}).forEach(([level, count]) => {
+      const li = document.createElement('li');
+      li.textContent = `${level.charAt(0).toUpperCase() + level.slice(1)}: ${count}`;
+      riskList.appendChild(li);
+    });
+
+    const themeList = document.getElementById('bulk-themes');
+    themeList.innerHTML = '';
+    (rollup.top_themes || []).forEach(item => {
+      const li = document.createElement('li');
+      li.textContent = `${item.theme} (${item.count})`;
+      themeList.appendChild(li);
+    });
+  }
+
   // Helper function to show alerts
   function showAlert(message, type = 'info') {
     const alertsContainer = document.getElementById('alerts-container');
@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# The app binds its database when imported, so point it at a scratch file before any test imports it
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+os.environ.setdefault('GEMINI_API_KEY', 'test-key')
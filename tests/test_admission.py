@@ -0,0 +1,62 @@
+import os
+import time
+
+import pytest
+
+from utils import admission
+from utils.admission import AdmissionController, AdmissionRejected
+
+
+@pytest.fixture
+def controller(tmp_path, monkeypatch):
+    monkeypatch.setattr(admission, 'CLIENT_RATE', 1.0)
+    monkeypatch.setattr(admission, 'CLIENT_BURST', 2.0)
+    monkeypatch.setattr(admission, 'GLOBAL_RATE', 100.0)
+    monkeypatch.setattr(admission, 'GLOBAL_BURST', 100.0)
+    return AdmissionController(os.path.join(str(tmp_path), 'admission.sqlite3'),
+                               max_in_flight=2, max_queue=2, queue_timeout=0.1)
+
+
+def test_client_bucket_rejects_with_429(controller):
+    controller.admit('a').release()
+    controller.admit('a').release()
+    with pytest.raises(AdmissionRejected) as info:
+        controller.admit('a')
+    assert info.value.status == 429
+    assert info.value.reason == 'client_rate'
+    # Other clients have their own bucket
+    controller.admit('b').release()
+
+
+def test_capacity_rejects_with_503_until_released(controller):
+    first = controller.admit('a')
+    second = controller.admit('b')
+    with pytest.raises(AdmissionRejected) as info:
+        controller.admit('c')
+    assert info.value.status == 503
+    first.release()
+    controller.admit('d').release()
+    second.release()
+    assert controller.stats()['in_flight'] == 0
+
+
+def test_bulk_limited_to_its_share(controller, monkeypatch):
+    monkeypatch.setattr(admission, 'BULK_SHARE', 0.5)
+    bulk = controller.admit('a', 'bulk', cost=1)
+    with pytest.raises(AdmissionRejected):
+        controller.admit('b', 'bulk', cost=1)
+    # The remaining slot is still open to interactive requests
+    controller.admit('c').release()
+    bulk.release()
+
+
+def test_held_lease_is_renewed_past_its_ttl(controller, monkeypatch):
+    monkeypatch.setattr(admission, 'LEASE_TTL_SECONDS', 0.3)
+    monkeypatch.setattr(admission, 'LEASE_RENEW_SECONDS', 0.05)
+    held = controller.admit('a')
+    released = controller.admit('b')
+    released.release()
+    time.sleep(0.6)
+    assert controller.stats()['in_flight'] == 1
+    held.release()
+    assert controller.stats()['in_flight'] == 0
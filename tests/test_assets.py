@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from utils import assets
+
+CSS = b"body{background:url(../img/bg.png)}"
+JS = b"console.log('vendored');"
+
+@pytest.fixture
+def static(tmp_path, monkeypatch):
+    vendor = tmp_path / 'vendor'
+    monkeypatch.setattr(assets, 'STATIC_DIR', str(tmp_path))
+    monkeypatch.setattr(assets, 'VENDOR_DIR', str(vendor))
+    monkeypatch.setattr(assets, 'VENDOR_LOCK', str(vendor / 'vendor.lock.json'))
+    monkeypatch.setattr(assets, 'VENDOR_ASSETS', {
+        'vendor/lib/lib.css': 'https://cdn.example/lib.css',
+        'vendor/lib/lib.js': 'https://cdn.example/lib.js',
+    })
+    served = {'https://cdn.example/lib.css': CSS, 'https://cdn.example/lib.js': JS}
+    monkeypatch.setattr(assets, '_download', lambda url, timeout: served.get(url))
+    return tmp_path, served
+
+def write_lock(root, entries):
+    (root / 'vendor').mkdir(exist_ok=True)
+    (root / 'vendor' / 'vendor.lock.json').write_text(json.dumps(entries))
+
+def test_without_a_lock_nothing_is_vendored(static):
+    root, _ = static
+    status = assets.fetch_vendor_assets()
+    assert set(status.values()) == {'unlocked'}
+    assert not (root / 'vendor').exists()
+
+def test_locked_assets_are_downloaded_and_built(static):
+    root, _ = static
+    assets.update_vendor_lock()
+    assert assets.fetch_vendor_assets() == {'vendor/lib/lib.css': 'downloaded', 'vendor/lib/lib.js': 'downloaded'}
+    manifest = assets.build_assets(str(root / 'dist'))
+    assert set(manifest['files']) == {'vendor/lib/lib.css', 'vendor/lib/lib.js'}
+
+def test_unpinned_asset_fails_the_build(static):
+    root, _ = static
+    write_lock(root, {'vendor/lib/lib.css': {'url': 'https://cdn.example/lib.css', 'integrity': assets.sri(CSS)}})
+    with pytest.raises(Exception, match='not pinned'):
+        assets.fetch_vendor_assets()
+    assert not (root / 'vendor' / 'lib').exists()
+
+def test_changed_upstream_content_fails_the_build(static):
+    root, served = static
+    assets.update_vendor_lock()
+    served['https://cdn.example/lib.js'] = b"alert('tampered');"
+    with pytest.raises(Exception, match='does not match'):
+        assets.fetch_vendor_assets()
+    assert not (root / 'vendor' / 'lib' / 'lib.js').exists()
+
+def test_unverified_vendor_files_are_not_built(static):
+    root, _ = static
+    (root / 'vendor' / 'lib').mkdir(parents=True)
+    (root / 'vendor' / 'lib' / 'lib.js').write_bytes(JS)
+    manifest = assets.build_assets(str(root / 'dist'))
+    assert 'vendor/lib/lib.js' not in manifest['files']
+    assert assets.vendor_fallback_url('vendor/lib/lib.js') == 'https://cdn.example/lib.js'
@@ -0,0 +1,52 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from utils import batch_screening
+from utils.batch_screening import collect_resume_files
+
+def make_zip(members, compression=zipfile.ZIP_DEFLATED):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+def test_archive_members_are_expanded():
+    data = make_zip([('a.pdf', os.urandom(1000)), ('notes.txt', b'skip'), ('__MACOSX/._a.pdf', b'x'),
+                     ('dir/b.docx', os.urandom(500))])
+    resumes = collect_resume_files([('batch.zip', data), ('c.pdf', b'%PDF')])
+    assert [name for name, _ in resumes] == ['a.pdf', 'b.docx', 'c.pdf']
+
+def test_member_count_is_checked_before_reading(monkeypatch):
+    monkeypatch.setattr(batch_screening, 'MAX_BATCH_FILES', 3)
+    read = []
+    monkeypatch.setattr(zipfile.ZipFile, 'read', lambda self, *args: read.append(args) or b'')
+    data = make_zip([(f'{number}.pdf', os.urandom(100)) for number in range(4)])
+    with pytest.raises(ValueError, match='more than 3 resumes'):
+        collect_resume_files([('batch.zip', data)])
+    assert read == []
+
+def test_archives_share_the_file_budget(monkeypatch):
+    monkeypatch.setattr(batch_screening, 'MAX_BATCH_FILES', 3)
+    data = make_zip([('a.pdf', os.urandom(100)), ('b.pdf', os.urandom(100))])
+    with pytest.raises(ValueError):
+        collect_resume_files([('one.pdf', b'%PDF'), ('two.pdf', b'%PDF'), ('batch.zip', data)])
+
+def test_total_uncompressed_size_is_capped(monkeypatch):
+    monkeypatch.setattr(batch_screening, 'MAX_BATCH_UNCOMPRESSED_BYTES', 1500)
+    data = make_zip([('a.pdf', os.urandom(1000)), ('b.pdf', os.urandom(1000))], zipfile.ZIP_STORED)
+    with pytest.raises(ValueError, match='expands to'):
+        collect_resume_files([('batch.zip', data)])
+
+def test_zip_bomb_is_rejected():
+    data = make_zip([('bomb.pdf', b'\0' * (8 * 1024 * 1024))])
+    assert len(data) < 100 * 1024
+    with pytest.raises(ValueError, match='compression ratio'):
+        collect_resume_files([('batch.zip', data)])
+
+def test_corrupt_archive_is_a_value_error():
+    with pytest.raises(ValueError, match='Invalid zip'):
+        collect_resume_files([('batch.zip', b'not a zip')])
@@ -0,0 +1,75 @@
+import io
+import json
+
+from utils import bulk_sentiment
+from utils.bulk_sentiment import iter_feedback_items, iter_bulk_results
+from utils.local_sentiment import local_sentiment_result
+
+def items_of(content, filename):
+    return list(iter_feedback_items(io.BytesIO(content.encode('utf-8')), filename))
+
+def failing_gemini(monkeypatch):
+    def fail(batch, api_key):
+        raise Exception('quota exhausted')
+    monkeypatch.setattr(bulk_sentiment, 'analyze_sentiment_batch_with_gemini', fail)
+
+def test_csv_picks_the_comment_id_and_team_columns():
+    items = items_of('response_id,Department,Comment\n7,platform,Great team\n8,sales,\n9,,Too many meetings\n',
+                     'survey.csv')
+    assert items == [
+        {'id': '7', 'text': 'Great team', 'team': 'platform'},
+        {'id': '9', 'text': 'Too many meetings'},
+    ]
+
+def test_single_column_csv_uses_row_numbers():
+    items = items_of('Thoughts\nLove it\nHate it\n', 'survey.csv')
+    assert items == [{'id': '1', 'text': 'Love it'}, {'id': '2', 'text': 'Hate it'}]
+
+def test_repeated_ids_are_suffixed():
+    items = items_of('id,text\n5,one\n5,two\n5#2,three\n5,four\n', 'survey.csv')
+    assert [item['id'] for item in items] == ['5', '5#2', '5#2#2', '5#3']
+
+def test_bad_jsonl_lines_become_per_record_errors():
+    content = '\n'.join(['{"text": "Fine"}', '{"text": broken', '"Just a string"', '[1]', '42', '', '{"comment": "Ok"}'])
+    items = items_of(content, 'survey.jsonl')
+    assert [(item['id'], item['text']) for item in items] == [
+        ('1', 'Fine'), ('2', ''), ('3', 'Just a string'), ('4', ''), ('5', ''), ('6', 'Ok'),
+    ]
+    assert items[1]['error'].startswith('Invalid JSON')
+    assert items[3]['error'] == 'Expected a JSON object, got list'
+    assert items[4]['error'] == 'Expected a JSON object, got int'
+
+def test_failed_batches_fall_back_to_local_scoring(monkeypatch):
+    failing_gemini(monkeypatch)
+    items = [{'id': '1', 'text': 'I am not happy with my manager'}, {'id': '2', 'text': 'x', 'error': 'Invalid JSON'},
+             {'id': '3', 'text': 'Great growth opportunities and a supportive team', 'team': 'platform'}]
+    records = [record for batch in iter_bulk_results(items, 'test-key', 1, 10) for record in batch]
+    assert [record['status'] for record in records] == ['ok', 'error', 'ok']
+    assert records[1]['error'] == 'Invalid JSON'
+    for record, item in zip(records[::2], items[::2]):
+        assert record['result']['degraded'] is True
+        assert record['result']['degraded_reason'] == 'quota exhausted'
+        assert record['result']['sentiment_score'] == local_sentiment_result(item['text'])['sentiment_score']
+    assert records[2]['team'] == 'platform'
+
+def test_missing_answers_are_scored_locally(monkeypatch):
+    monkeypatch.setattr(bulk_sentiment, 'analyze_sentiment_batch_with_gemini',
+                        lambda batch, api_key: {'1': {'sentiment_score': 0.9}})
+    items = [{'id': '1', 'text': 'Great'}, {'id': '2', 'text': 'Awful'}]
+    records = [record for batch in iter_bulk_results(items, 'test-key', 1, 10) for record in batch]
+    assert records[0]['result'] == {'sentiment_score': 0.9}
+    assert records[1]['result']['degraded_reason'] == 'No result returned for this comment'
+
+def test_bulk_endpoint_streams_a_large_upload(monkeypatch):
+    import app
+    failing_gemini(monkeypatch)
+    # Large enough for the upload to be spooled to disk rather than kept in memory
+    rows = 12000
+    content = 'id,comment\n' + ''.join(f'{n},The workload this sprint is heavy but the team is great\n' for n in range(rows))
+    response = app.app.test_client().post('/analyze-sentiment-bulk', data={
+        'feedback_file': (io.BytesIO(content.encode('utf-8')), 'survey.csv'),
+    }, content_type='multipart/form-data')
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert events[-1]['event'] == 'done'
+    assert events[-1]['count'] == rows
+    assert sum(event['event'] == 'result' for event in events) == rows
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from utils import chunking, gemini_api
+from utils.result_cache import ResultCache, LRUCache
+
+WORDS = "team manager workload growth salary culture remote project deadline support career review".split()
+
+def long_feedback(paragraphs=6, words=900, seed=3):
+    rng = random.Random(seed)
+    parts = [' '.join(rng.choice(WORDS) for _ in range(words)) for _ in range(paragraphs)]
+    parts[0] = 'FAILMARKER ' + parts[0]
+    return '\n\n'.join(parts)
+
+def chunk_answer(prompt):
+    if 'FAILMARKER' in prompt and chunk_answer.fail:
+        raise Exception("503 UNAVAILABLE")
+    return {'sentiment_score': 0.2, 'primary_sentiment': 'neutral', 'key_themes': ['Workload'],
+            'attrition_risk': {'level': 'low', 'reasoning': 'stub'}, 'summary': 'stub',
+            'positive_aspects': [], 'concerns': [], 'engagement_recommendations': []}
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResultCache(LRUCache(16, 60))
+    monkeypatch.setattr(gemini_api, 'get_result_cache', lambda: cache)
+    monkeypatch.setattr(gemini_api, 'CHUNK_MODEL_MERGE', False)
+    monkeypatch.setattr(gemini_api, '_analyze_prompt', lambda prompt, api_key: chunk_answer(prompt))
+    return cache
+
+def test_partial_chunk_merge_is_not_cached(cache):
+    chunk_answer.fail = True
+    feedback = long_feedback()
+    result = gemini_api.analyze_sentiment_with_gemini(feedback, 'key')
+    assert result['chunks']['count'] > 1 and result['chunks']['failed'] == 1
+    assert len(cache.memory) == 0
+
+    # Once every chunk succeeds the result is cached
+    chunk_answer.fail = False
+    result = gemini_api.analyze_sentiment_with_gemini(feedback, 'key')
+    assert result['chunks']['failed'] == 0
+    assert len(cache.memory) == 1
+
+def test_streamed_partial_chunk_merge_is_not_cached(cache):
+    chunk_answer.fail = True
+    events = list(gemini_api.stream_sentiment_analysis(long_feedback(seed=4), 'key'))
+    assert events[-1]['result']['chunks']['failed'] == 1
+    assert len(cache.memory) == 0
+
+def test_truncated_chunk_merge_is_flagged_and_not_cached(cache, monkeypatch):
+    chunk_answer.fail = False
+    # Small enough that the feedback needs more than CHUNK_MAX_CHUNKS chunks
+    monkeypatch.setattr(gemini_api, 'FEEDBACK_TOKEN_BUDGET', 500)
+    result = gemini_api.analyze_sentiment_with_gemini(long_feedback(seed=5), 'key')
+    assert result['truncated'] is True
+    assert result['chunks']['count'] == chunking.CHUNK_MAX_CHUNKS and result['chunks']['dropped'] > 0
+    assert len(cache.memory) == 0
+
+def test_split_reports_dropped_chunks():
+    chunks, dropped = chunking.split_text(long_feedback(paragraphs=6), max_tokens=500, max_chunks=3)
+    assert len(chunks) == 3 and dropped > 0
+    chunks, dropped = chunking.split_text(long_feedback(paragraphs=2), max_tokens=5000, max_chunks=3)
+    assert dropped == 0
@@ -0,0 +1,123 @@
+import json
+import time
+import asyncio
+import threading
+import itertools
+from collections import deque
+
+import pytest
+
+from benchmarks.fake_gemini import FakeGemini, canned_answer
+from utils import gemini_api
+from utils.deadline import deadline, DeadlineExceeded
+
+_keys = itertools.count()
+
+@pytest.fixture
+def gemini(monkeypatch):
+    # Clients are shared per API key, so each test gets a fresh dummy key pointed at its own server
+    def start(**options):
+        fake = FakeGemini(**options).start()
+        started.append(fake)
+        monkeypatch.setattr(gemini_api, 'GEMINI_BASE_URL', fake.url)
+        return fake, f"test-key-{next(_keys)}"
+
+    started = []
+    monkeypatch.setattr(gemini_api, 'GEMINI_BACKOFF_BASE', 0.01)
+    monkeypatch.setattr(gemini_api, 'GEMINI_HEDGING', False)
+    yield start
+    for fake in started:
+        fake.stop()
+
+def test_call_returns_the_model_text(gemini):
+    fake, key = gemini()
+    response = gemini_api.call_gemini_api('How is the team doing?', key)
+    assert json.loads(response.text) == json.loads(canned_answer('How is the team doing?'))
+    assert fake.stats()['calls'] == {'sentiment': 1}
+
+def test_transient_errors_are_retried(gemini):
+    fake, key = gemini(script=[(0, True), (0, True)])
+    response = gemini_api.call_gemini_api('How is the team doing?', key)
+    assert json.loads(response.text)['summary']
+    assert fake.stats() == {'calls': {'sentiment': 3}, 'errors': 2}
+
+def test_retries_stop_at_the_limit(gemini, monkeypatch):
+    monkeypatch.setattr(gemini_api, 'GEMINI_MAX_RETRIES', 1)
+    fake, key = gemini(error_rate=1.0)
+    with pytest.raises(Exception, match='Failed to call Gemini API'):
+        gemini_api.call_gemini_api('How is the team doing?', key)
+    assert fake.stats()['errors'] == 2
+
+def test_client_errors_are_not_retried(gemini):
+    fake, key = gemini(error_rate=1.0, error_status=400)
+    with pytest.raises(Exception, match='Failed to call Gemini API'):
+        gemini_api.call_gemini_api('How is the team doing?', key)
+    assert fake.stats()['errors'] == 1
+
+def test_async_calls_work_across_event_loops(gemini):
+    fake, key = gemini()
+    for _ in range(3):
+        response = asyncio.run(gemini_api.call_gemini_api_async('How is the team doing?', key))
+        assert json.loads(response.text)['summary']
+    assert fake.stats()['calls'] == {'sentiment': 3}
+
+def test_stream_yields_chunks_of_the_answer(gemini):
+    fake, key = gemini(stream_chunks=4)
+    chunks = list(gemini_api.call_gemini_api_stream('How is the team doing?', key))
+    assert len(chunks) == 4
+    assert ''.join(chunks) == canned_answer('How is the team doing?')
+
+def test_stream_retries_before_the_first_chunk(gemini):
+    fake, key = gemini(script=[(0, True)])
+    text = ''.join(gemini_api.call_gemini_api_stream('How is the team doing?', key))
+    assert text == canned_answer('How is the team doing?')
+    assert fake.stats()['errors'] == 1
+
+def test_slow_calls_are_hedged(gemini, monkeypatch):
+    monkeypatch.setattr(gemini_api, 'GEMINI_HEDGING', True)
+    monkeypatch.setattr(gemini_api, 'hedge_delay', lambda: 0.2)
+    fake, key = gemini(script=[(3, False), (0, False)])
+    started = time.monotonic()
+    response = gemini_api.call_gemini_api('How is the team doing?', key)
+    assert time.monotonic() - started < 2
+    assert json.loads(response.text)['summary']
+    assert fake.stats()['calls'] == {'sentiment': 2}
+
+def test_hedge_loser_stops_retrying(gemini, monkeypatch):
+    monkeypatch.setattr(gemini_api, 'GEMINI_HEDGING', True)
+    monkeypatch.setattr(gemini_api, 'hedge_delay', lambda: 0.1)
+    fake, key = gemini(script=[(0.5, True), (0, False)])
+    assert json.loads(gemini_api.call_gemini_api('How is the team doing?', key).text)['summary']
+    time.sleep(1)
+    assert fake.stats()['calls'] == {'sentiment': 2}
+
+def test_saturated_pool_runs_calls_inline_without_a_hedge(gemini, monkeypatch):
+    monkeypatch.setattr(gemini_api, 'GEMINI_HEDGING', True)
+    monkeypatch.setattr(gemini_api, 'hedge_delay', lambda: 0.1)
+    monkeypatch.setattr(gemini_api, '_pool_slots', threading.BoundedSemaphore(0))
+    fake, key = gemini(script=[(0.5, False)])
+    assert json.loads(gemini_api.call_gemini_api('How is the team doing?', key).text)['summary']
+    assert fake.stats()['calls'] == {'sentiment': 1}
+
+def test_hedge_delay_tracks_recent_latencies(monkeypatch):
+    monkeypatch.setattr(gemini_api, '_latencies', deque([0.5] * 90 + [4.0] * 10, maxlen=500))
+    monkeypatch.setattr(gemini_api, 'GEMINI_HEDGE_PERCENTILE', 0.95)
+    assert gemini_api.hedge_delay() == 4.0
+    monkeypatch.setattr(gemini_api, '_latencies', deque([0.1] * 5, maxlen=500))
+    assert gemini_api.hedge_delay() == gemini_api.GEMINI_HEDGE_DEFAULT_DELAY
+
+def test_deadline_abandons_slow_calls(gemini):
+    fake, key = gemini(latency='fixed:3')
+    started = time.monotonic()
+    with deadline(0.3), pytest.raises(DeadlineExceeded):
+        gemini_api.call_gemini_api('How is the team doing?', key)
+    assert time.monotonic() - started < 1
+
+def test_deadline_stops_retry_backoff(gemini, monkeypatch):
+    monkeypatch.setattr(gemini_api, '_backoff_delay', lambda attempt: 5)
+    fake, key = gemini(error_rate=1.0)
+    started = time.monotonic()
+    with deadline(1), pytest.raises(Exception, match='Failed to call Gemini API'):
+        gemini_api.call_gemini_api('How is the team doing?', key)
+    assert time.monotonic() - started < 2
+    assert fake.stats()['errors'] == 1
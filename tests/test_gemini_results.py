@@ -0,0 +1,45 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fake_gemini import canned_answer
+from utils import gemini_api
+from utils.result_cache import ResultCache, LRUCache
+
+FEEDBACK = 'The team is great but the workload keeps growing.'
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResultCache(LRUCache(16, 60))
+    monkeypatch.setattr(gemini_api, 'get_result_cache', lambda: cache)
+    return cache
+
+def answer():
+    return canned_answer(gemini_api.build_sentiment_prompt(FEEDBACK))
+
+def stream(monkeypatch, text):
+    pieces = [text[start:start + 20] for start in range(0, len(text), 20)]
+    monkeypatch.setattr(gemini_api, 'call_gemini_api_stream', lambda prompt, api_key: iter(pieces))
+
+def test_truncated_stream_is_served_but_not_cached(cache, monkeypatch):
+    text = answer()
+    stream(monkeypatch, text[:text.index('"summary"')])
+    events = list(gemini_api.stream_sentiment_analysis(FEEDBACK, 'key'))
+    assert 'summary' not in events[-1]['result']
+    assert 'sentiment_score' in events[-1]['result']
+    assert len(cache.memory) == 0
+
+def test_complete_stream_is_cached(cache, monkeypatch):
+    stream(monkeypatch, answer())
+    events = list(gemini_api.stream_sentiment_analysis(FEEDBACK, 'key'))
+    assert events[-1]['result'] == json.loads(answer())
+    assert len(cache.memory) == 1
+
+def test_truncated_response_is_not_cached(cache, monkeypatch):
+    text = answer()
+    response = SimpleNamespace(text=text[:text.index('"summary"')])
+    monkeypatch.setattr(gemini_api, 'call_gemini_api', lambda prompt, api_key: response)
+    result = gemini_api.analyze_sentiment_with_gemini(FEEDBACK, 'key')
+    assert 'summary' not in result
+    assert len(cache.memory) == 0
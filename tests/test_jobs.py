@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import threading
+import time
+
+from utils import jobs
+from utils.jobs import JobQueue
+
+
+def test_jobs_without_a_heartbeat_are_failed(tmp_path):
+    db_path = os.path.join(str(tmp_path), 'jobs.sqlite3')
+    JobQueue(db_path).stats()
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    now = time.time()
+    conn.execute("INSERT INTO jobs (id, kind, status, created_at, heartbeat_at) VALUES ('stale', 'resume', 'running', ?, ?)",
+                 (now - 120, now - jobs.JOB_ORPHAN_SECONDS - 1))
+    conn.execute("INSERT INTO jobs (id, kind, status, created_at, heartbeat_at) VALUES ('live', 'resume', 'queued', ?, ?)",
+                 (now - 120, now))
+    conn.close()
+
+    queue = JobQueue(db_path)
+    stats = queue.stats()
+    assert stats['running'] == 0
+    assert stats['queue_depth'] == 1
+    assert queue.get('stale')['status'] == 'error'
+    assert queue.get('live')['status'] == 'queued'
+
+def test_heartbeat_keeps_long_jobs_alive(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, 'JOB_HEARTBEAT_SECONDS', 0.05)
+    monkeypatch.setattr(jobs, 'JOB_ORPHAN_SECONDS', 0.2)
+    queue = JobQueue(os.path.join(str(tmp_path), 'jobs.sqlite3'), max_workers=1)
+    release = threading.Event()
+    job_id = queue.submit('resume', lambda: release.wait(5) and {'ok': True})
+    time.sleep(0.5)
+    assert queue.stats()['running'] == 1
+    assert queue.get(job_id)['status'] == 'running'
+    release.set()
+    assert queue.wait(job_id, 'running', 5)['status'] == 'done'
+
+def test_wait_wakes_when_a_local_job_finishes(tmp_path):
+    queue = JobQueue(os.path.join(str(tmp_path), 'jobs.sqlite3'))
+    release = threading.Event()
+    job_id = queue.submit('resume', lambda: release.wait(5) and {'ok': True})
+    job = queue.wait(job_id, 'queued', 5)
+    assert job['status'] == 'running'
+
+    threading.Timer(0.1, release.set).start()
+    started = time.monotonic()
+    job = queue.wait(job_id, 'running', 5)
+    assert job['status'] == 'done'
+    assert job['result'] == {'ok': True}
+    assert time.monotonic() - started < 1
+
+def test_event_stream_reports_a_purged_job(tmp_path, monkeypatch):
+    import app
+    queue = JobQueue(os.path.join(str(tmp_path), 'jobs.sqlite3'))
+    job_id = queue.submit('resume', lambda: time.sleep(0.3) or {'ok': True})
+    monkeypatch.setattr(app, 'get_job_queue', lambda: queue)
+    monkeypatch.setattr(queue, 'wait', lambda *args: None)
+    body = app.app.test_client().get(f'/jobs/{job_id}/events').get_data(as_text=True)
+    assert body.rstrip().endswith('"error": "Unknown job"}')
+    assert 'event: error' in body
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from utils.json_stream import JSONFieldStream, parse_json_response
+
+ANSWER = {
+    'match_score': 82,
+    'extracted_skills': ['Python', 'SQL'],
+    'attrition_risk': {'level': 'low', 'reasoning': 'Says "happy", {not} leaving, [really]'},
+    'summary': 'Escaped \\ backslash, comma, and é',
+}
+
+def feed_in_chunks(text, size):
+    stream = JSONFieldStream()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(stream.feed(text[start:start + size]))
+    return stream, events
+
+@pytest.mark.parametrize('size', [1, 3, 17, 10000])
+def test_fields_complete_in_order_whatever_the_chunking(size):
+    text = '```json\n' + json.dumps(ANSWER, indent=2) + '\n```\nTrailing prose {"ignored": true}'
+    stream, events = feed_in_chunks(text, size)
+    assert stream.complete
+    assert events == list(ANSWER.items())
+    assert stream.fields == ANSWER
+
+def test_field_is_reported_as_soon_as_its_value_ends():
+    stream = JSONFieldStream()
+    assert stream.feed('{"match_score": 7') == []
+    assert stream.feed('5, "summary": "Go') == [('match_score', 75)]
+    assert stream.feed('od"}') == [('summary', 'Good')]
+    assert stream.feed('{"more": 1}') == []
+
+def test_malformed_values_are_skipped():
+    stream, events = feed_in_chunks('{"a": nope, "b": 2}', 4)
+    assert events == [('b', 2)]
+
+def test_parse_tolerates_fences_and_trailing_commas():
+    assert parse_json_response('Here you go:\n```json\n{"a": [1, 2,], "b": 3,}\n```') == {'a': [1, 2], 'b': 3}
+
+def test_parse_recovers_completed_fields_of_a_truncated_object():
+    assert parse_json_response('{"a": 1, "b": [1, 2], "c": "cut of') == {'a': 1, 'b': [1, 2]}
+
+def test_parse_rejects_text_without_an_object():
+    with pytest.raises(ValueError):
+        parse_json_response('The model declined to answer.')
@@ -0,0 +1,78 @@
+import pytest
+
+from utils.local_sentiment import (
+    local_sentiment_result, local_bulk_results, agreement_report, score_comment, score_comments
+)
+
+COMMENTS = [
+    'I am happy here',
+    'I am not happy with my manager',
+    'The office is not bad at all',
+    'My manager is great but the pay is terrible',
+    'I have been looking for other options lately',
+    'Feeling burned out and underpaid',
+    'The team is very supportive and I love the projects',
+    'Meetings on Tuesdays',
+]
+
+def test_negation_flips_polarity():
+    assert local_sentiment_result('I am happy here')['primary_sentiment'] == 'positive'
+    assert local_sentiment_result('I am not happy here')['primary_sentiment'] == 'negative'
+    assert local_sentiment_result('This is bad')['primary_sentiment'] == 'negative'
+    assert local_sentiment_result('This is not bad')['primary_sentiment'] == 'positive'
+
+def test_negation_only_reaches_a_few_words():
+    assert score_comment('Not once did I feel the team was anything but great') > 0
+
+def test_intensifiers_and_diminishers_scale_the_next_word():
+    plain = score_comment('The team is good')
+    assert score_comment('The team is very good') > plain > score_comment('The team is slightly good') > 0
+    assert score_comment('The pay is extremely bad') < score_comment('The pay is bad') < 0
+
+def test_text_after_a_contrast_weighs_more():
+    assert score_comment('My manager is great but the pay is terrible') < 0
+    assert score_comment('The pay is terrible but my manager is great') > 0
+
+@pytest.mark.parametrize('text', [
+    'I am looking for other options',
+    "Honestly I'm updating my resume",
+    'I have been looking for other options lately',
+])
+def test_intent_to_leave_is_high_risk_whatever_the_score(text):
+    result = local_sentiment_result(text)
+    assert result['attrition_risk']['level'] == 'high'
+    assert result['primary_sentiment'] == 'neutral'
+
+def test_disengagement_risk_depends_on_the_score():
+    assert local_sentiment_result('Burned out, but I love my team')['attrition_risk']['level'] == 'medium'
+    assert local_sentiment_result('Feeling burned out lately')['attrition_risk']['level'] == 'high'
+    assert local_sentiment_result('Great team, good projects')['attrition_risk']['level'] == 'low'
+
+def test_bulk_results_agree_with_single_comments():
+    bulk = local_bulk_results([{'id': str(n), 'text': text} for n, text in enumerate(COMMENTS)])
+    assert score_comments(COMMENTS).tolist() == pytest.approx([score_comment(text) for text in COMMENTS])
+    for n, text in enumerate(COMMENTS):
+        single = local_sentiment_result(text)
+        assert bulk[str(n)]['sentiment_score'] == single['sentiment_score']
+        assert bulk[str(n)]['primary_sentiment'] == single['primary_sentiment']
+        assert bulk[str(n)]['key_themes'] == single['key_themes']
+        assert bulk[str(n)]['attrition_risk']['level'] == single['attrition_risk']['level']
+
+def test_agreement_report_compares_with_gemini():
+    results = [{'sentiment_score': 0.8, 'attrition_risk': {'level': 'low'}},
+               {'sentiment_score': -0.6, 'attrition_risk': 'medium'},
+               {'sentiment_score': 0.3, 'attrition_risk': {'level': 'low'}},
+               {'sentiment_score': -0.9, 'degraded': True},
+               {'sentiment_score': -0.5, 'attrition_risk': {'level': 'low'}}]
+    report = agreement_report(COMMENTS[:5], results)
+    # The degraded result came from the local scorer, so it is left out
+    assert report['count'] == 4
+    assert report['polarity_agreement'] == 0.75
+    assert report['polarity_confusion']['positive'] == {'positive': 2, 'neutral': 0, 'negative': 0}
+    assert report['polarity_confusion']['negative'] == {'positive': 0, 'neutral': 1, 'negative': 1}
+    assert report['attrition_agreement'] == 0.75
+    assert report['attrition_confusion']['low']['high'] == 1
+    assert report['score_correlation'] > 0.5
+
+def test_agreement_report_without_gemini_results():
+    assert agreement_report(COMMENTS[:2], [{'sentiment_score': 0.5, 'provisional': True}, None]) == {'count': 0}
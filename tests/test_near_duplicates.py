@@ -0,0 +1,88 @@
+import os
+import random
+
+import pytest
+
+from utils import gemini_api, near_duplicates
+from utils.near_duplicates import NearDuplicateIndex, minhash_signature, _shingle_hashes
+from utils.result_cache import ResultCache, LRUCache, content_digest, key_from_digests
+
+WORDS = ("python java kubernetes terraform led team built service migrated platform designed api "
+         "reduced latency improved reliability mentored engineers shipped features data pipeline").split()
+
+def resume(seed, words=300):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) + str(rng.randint(0, 50)) for _ in range(words))
+
+def edit(text, every, seed=0):
+    # Replace every n-th word, each replacement breaking up to SHINGLE_SIZE shingles
+    rng = random.Random(seed)
+    return ' '.join(f"edited{rng.randint(0, 10 ** 6)}" if n % every == 0 else word
+                    for n, word in enumerate(text.split(), start=1))
+
+def jaccard(first, second):
+    a, b = set(_shingle_hashes(first).tolist()), set(_shingle_hashes(second).tolist())
+    return len(a & b) / len(a | b)
+
+def estimate(first, second):
+    return float((minhash_signature(first) == minhash_signature(second)).mean())
+
+@pytest.fixture
+def index(tmp_path):
+    return NearDuplicateIndex(os.path.join(str(tmp_path), 'near_duplicates.sqlite3'))
+
+@pytest.mark.parametrize('every', [150, 60, 25, 8])
+def test_signature_similarity_estimates_jaccard(every):
+    original = resume(1)
+    edited = edit(original, every)
+    assert abs(estimate(original, edited) - jaccard(original, edited)) < 0.1
+
+def test_thresholds_separate_light_and_heavy_edits(index):
+    original = resume(2)
+    index.add(content_digest(original), minhash_signature(original), 'original.pdf')
+    # One word in 150 changed stays above the reuse bar, one in 60 is only flagged, one in 8 is unrelated
+    light, moderate, heavy = edit(original, 150), edit(original, 60), edit(original, 8)
+    assert index.find(light, near_duplicates.NEAR_DUP_REUSE_THRESHOLD)[0]['label'] == 'original.pdf'
+    assert index.find(moderate, near_duplicates.NEAR_DUP_THRESHOLD)
+    assert not index.find(moderate, near_duplicates.NEAR_DUP_REUSE_THRESHOLD)
+    assert not index.find(heavy, near_duplicates.NEAR_DUP_THRESHOLD)
+    assert not index.find(resume(3), 0.3)
+
+def test_exact_copies_are_excluded(index):
+    original = resume(4)
+    digest, signature = content_digest(original), minhash_signature(original)
+    index.add(digest, signature, 'original.pdf')
+    assert index.query(signature) and index.query(signature)[0]['similarity'] == 1.0
+    assert index.query(signature, exclude_digest=digest) == []
+    assert index.find(original) == []
+
+def test_documents_persist_across_instances(index):
+    original = resume(5)
+    digest, signature = content_digest(original), minhash_signature(original)
+    assert index.add(digest, signature, 'original.pdf')
+    assert not index.add(digest, signature, 'renamed.pdf')
+    reopened = NearDuplicateIndex(index.db_path)
+    assert [match['label'] for match in reopened.find(edit(original, 150))] == ['original.pdf']
+    assert reopened.stats()['documents'] == 1
+
+def test_reuse_needs_a_matching_job_description(index, monkeypatch):
+    monkeypatch.setattr(gemini_api, 'get_near_duplicate_index', lambda: index)
+    cache = ResultCache(LRUCache(16, 60))
+    original, job_description = resume(6), 'Senior Python engineer with Kubernetes'
+    index.add(content_digest(original), minhash_signature(original), 'jane-doe.pdf')
+    cache.set(key_from_digests('resume', gemini_api.GEMINI_MODEL, gemini_api.RESUME_PROMPT_VERSION,
+                               [content_digest(original), content_digest(job_description)]), {
+        'extracted_skills': ['Python'], 'matching_skills': ['Python'], 'missing_skills': [],
+        'experience_summary': 'Jane Doe spent 6 years at Acme', 'education_summary': 'BSc, State University',
+        'match_score': 82, 'strengths': ['Jane led the Acme migration'], 'weaknesses': ['No Go'],
+        'overall_assessment': 'Jane is a strong fit',
+    })
+
+    near_copy = edit(original, 150)
+    assert gemini_api._reuse_near_duplicate(near_copy, 'Staff Java engineer', cache) is None
+    reused = gemini_api._reuse_near_duplicate(near_copy, job_description, cache)
+    assert reused['match_score'] == 82
+    assert reused['reused_from']['similarity'] >= near_duplicates.NEAR_DUP_REUSE_THRESHOLD
+    # Nothing written about the other upload, nor its filename, is carried over
+    assert 'Jane' not in str(reused) and 'Acme' not in str(reused)
+    assert 'jane-doe' not in str(reused)
@@ -0,0 +1,68 @@
+import json
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import app, db
+from models import Resume, list_page
+
+@pytest.fixture
+def resumes():
+    with app.app_context():
+        db.session.query(Resume).delete()
+        start = datetime(2026, 1, 1)
+        # Repeated timestamps and scores make the id tiebreak matter
+        db.session.add_all([
+            Resume(filename=f"r{n}.pdf", match_score=float(n % 4), created_at=start + timedelta(minutes=n // 3))
+            for n in range(23)
+        ] + [Resume(filename='unscored.pdf', match_score=None, created_at=start)])
+        db.session.commit()
+        yield
+        db.session.query(Resume).delete()
+        db.session.commit()
+
+def walk(sort, limit):
+    pages, cursor = [], None
+    while True:
+        page = list_page(Resume, sort, cursor, limit)
+        pages.append(page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages
+
+@pytest.mark.parametrize('sort', ['created_at', 'match_score'])
+def test_pages_cover_every_row_once_in_order(resumes, sort):
+    with app.app_context():
+        pages = walk(sort, 5)
+        items = [item for page in pages for item in page]
+        expected = sorted(
+            (row for row in db.session.query(Resume).all() if getattr(row, sort) is not None),
+            key=lambda row: (getattr(row, sort), row.id), reverse=True
+        )
+    assert all(len(page) == 5 for page in pages[:-1]) and 0 < len(pages[-1]) <= 5
+    assert [item['id'] for item in items] == [row.id for row in expected]
+
+def test_rows_added_while_paging_do_not_shift_later_pages(resumes):
+    with app.app_context():
+        first = list_page(Resume, 'created_at', None, 5)
+        db.session.add(Resume(filename='new.pdf', match_score=1.0, created_at=datetime(2027, 1, 1)))
+        db.session.commit()
+        second = list_page(Resume, 'created_at', first['next_cursor'], 5)
+    seen = {item['id'] for item in first['items']}
+    assert not seen & {item['id'] for item in second['items']}
+    assert second['items'][0]['created_at'] <= first['items'][-1]['created_at']
+
+def test_endpoint_rejects_bad_sorts_and_cursors(resumes):
+    client = app.test_client()
+    assert client.get('/api/resumes?sort=filename').status_code == 400
+    assert client.get('/api/resumes?cursor=not-a-cursor').status_code == 400
+    # Well-formed base64 JSON of the wrong shape is rejected too
+    for shape in ([1], [1, 2, 3], {'value': 1}, ['2026-01-01', 'x'], [None, 1], [[1], 1], [1, 2 ** 70]):
+        cursor = base64.urlsafe_b64encode(json.dumps(shape).encode('utf-8')).decode('ascii')
+        assert client.get(f'/api/resumes?cursor={cursor}').status_code == 400
+        assert client.get(f'/api/resumes?sort=match_score&cursor={cursor}').status_code == 400
+    assert client.get('/api/sentiment-analyses?cursor=W10').status_code == 400
+    response = client.get('/api/resumes?limit=1000')
+    assert response.status_code == 200
+    assert len(response.get_json()['items']) == 24
@@ -0,0 +1,42 @@
+from utils.prompts import trim_resume
+from utils.chunking import split_resume
+
+HEADER = 'Jane Doe - Senior Engineer'
+FOOTER = 'jane@example.com | +1 555 0100'
+
+
+def paged_resume(pages, body_lines):
+    return '\f'.join(
+        '\n'.join([HEADER] + [f'Built service {page}-{i} with Python and Postgres' for i in range(body_lines)] + [FOOTER])
+        for page in range(pages)
+    )
+
+
+def test_repeated_lines_are_kept_under_budget():
+    text = '\n'.join(['Experience', 'Shipped the billing migration'] + ['Led weekly incident review'] * 3)
+    assert trim_resume(text, 1000).count('Led weekly incident review') == 3
+    assert trim_resume(paged_resume(3, 2), 1000).count(HEADER) == 3
+
+
+def test_running_headers_are_dropped_when_over_budget():
+    text = paged_resume(4, 20)
+    trimmed = trim_resume(text, 900)
+    assert len(text) > 900 * 4 >= len(trimmed)
+    assert trimmed.count(HEADER) == 1
+    assert trimmed.count(FOOTER) == 1
+    assert 'Built service 3-19 with Python and Postgres' in trimmed
+
+
+def test_body_lines_repeated_mid_page_are_not_headers():
+    line = 'Led weekly incident review'
+    page = '\n'.join([f'Project {n} intro line' for n in range(3)] + [line] + [f'Project {n} outro' for n in range(3)])
+    text = '\f'.join([page] * 4)
+    assert trim_resume(text, 10, truncate=False).count(line) == 4
+
+
+def test_chunked_resumes_drop_running_headers_without_truncating():
+    chunks, dropped = split_resume(paged_resume(6, 20), 500)
+    assert dropped == 0
+    joined = '\n'.join(chunks)
+    assert joined.count(HEADER) == 1
+    assert 'Built service 5-19 with Python and Postgres' in joined
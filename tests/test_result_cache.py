@@ -0,0 +1,29 @@
+import os
+
+from utils import result_cache
+from utils.result_cache import ResultCache, LRUCache, SQLiteStore
+
+
+def test_memory_hits_are_copies():
+    cache = ResultCache(LRUCache(16, 60))
+    value = {'score': 80, 'skills': ['python']}
+    cache.set('k', value)
+    value['skills'].append('mutated after set')
+
+    hit = cache.get('k')
+    hit['skills'].append('mutated after get')
+    assert cache.get('k') == {'score': 80, 'skills': ['python']}
+
+
+def test_disk_store_purges_expired_rows_while_writing(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, 'PURGE_EVERY_WRITES', 5)
+    store = SQLiteStore(os.path.join(str(tmp_path), 'cache.sqlite3'), ttl=60)
+    for i in range(3):
+        store.set(f'old{i}', {'i': i}, ttl=-1)
+    store.set('fresh', {'i': 3})
+    assert store._connect().execute("SELECT COUNT(*) FROM results").fetchone()[0] == 4
+
+    store.set('fresh2', {'i': 4})
+    keys = {row[0] for row in store._connect().execute("SELECT key FROM results")}
+    assert keys == {'fresh', 'fresh2'}
+    assert store.evictions == 3
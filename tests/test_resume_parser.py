@@ -0,0 +1,28 @@
+import io
+
+from PyPDF2 import PdfWriter
+
+from utils import resume_parser
+
+
+def blank_pdf(pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_large_pdfs_are_split_across_a_forkserver_pool(monkeypatch):
+    monkeypatch.setattr(resume_parser, 'PARALLEL_PAGE_THRESHOLD', 4)
+    monkeypatch.setattr(resume_parser, 'PDF_PROCESS_WORKERS', 2)
+    monkeypatch.setattr(resume_parser, '_process_pool', None)
+    pool = resume_parser.start_process_pool()
+    try:
+        assert pool._mp_context.get_start_method() == 'forkserver'
+        text = resume_parser.extract_text_from_pdf(io.BytesIO(blank_pdf(6)))
+        assert text == '\f' * 5
+        assert resume_parser._get_process_pool() is pool
+    finally:
+        pool.shutdown()
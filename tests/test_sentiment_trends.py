@@ -0,0 +1,103 @@
+import os
+import random
+from collections import Counter
+from datetime import date, datetime
+
+import pytest
+
+from utils import sentiment_trends
+from utils.sentiment_trends import TrendBucket, SentimentTrends
+
+THEMES = [f"Theme {n}" for n in range(12)]
+
+def results(count, seed):
+    rng = random.Random(seed)
+    # A few heavy themes and a long tail, like real survey feedback
+    weights = [40, 25, 15] + [2] * (len(THEMES) - 3)
+    return [{
+        'sentiment_score': round(rng.uniform(-1, 1), 2),
+        'attrition_risk': {'level': rng.choice(['low', 'medium', 'High', 'bogus'])},
+        'key_themes': rng.choices(THEMES, weights, k=2),
+    } for _ in range(count)]
+
+def bucket_of(items):
+    bucket = TrendBucket()
+    for item in items:
+        bucket.add(item)
+    return bucket
+
+def test_merge_matches_adding_everything_to_one_bucket():
+    first, second = results(50, 1), results(70, 2)
+    merged = bucket_of(first)
+    merged.merge(bucket_of(second))
+    whole = bucket_of(first + second)
+    assert merged.count == whole.count == 120
+    assert merged.histogram == whole.histogram
+    assert merged.risk == whole.risk
+    assert merged.mean_score == whole.mean_score
+    assert merged.quantile(0.5) == whole.quantile(0.5)
+    assert merged.themes == whole.themes
+
+def test_merge_of_full_sketches_bounds_theme_counts(monkeypatch):
+    monkeypatch.setattr(sentiment_trends, 'THEME_CAPACITY', 4)
+    parts = [results(60, seed) for seed in range(5)]
+    merged = TrendBucket()
+    for part in parts:
+        merged.merge(bucket_of(part))
+    truth = Counter(theme for part in parts for item in part for theme in set(item['key_themes']))
+
+    assert len(merged.themes) == 4
+    for theme, (count, error) in merged.themes.items():
+        assert count - error <= truth[theme] <= count
+    assert [entry['theme'] for entry in merged.top_themes(3)] == [theme for theme, _ in truth.most_common(3)]
+
+def test_row_round_trip_keeps_the_bucket():
+    bucket = bucket_of(results(30, 3))
+    restored = TrendBucket.from_row(bucket.to_row())
+    assert restored.to_row() == bucket.to_row()
+
+def test_quantiles_of_an_empty_bucket_are_null():
+    assert TrendBucket().quantile(0.5) is None
+    assert TrendBucket().mean_score is None
+
+def test_series_fills_empty_weeks_and_rolls_up_teams(tmp_path):
+    trends = SentimentTrends(os.path.join(str(tmp_path), 'trends.sqlite3'))
+    trends.record_many([
+        ({'sentiment_score': 0.5, 'key_themes': ['workload']}, 'platform', datetime(2026, 3, 2, 9)),
+        ({'sentiment_score': -0.5, 'key_themes': ['Workload']}, 'Platform ', datetime(2026, 3, 4, 9)),
+        ({'sentiment_score': 1.0, 'key_themes': ['growth']}, 'sales', datetime(2026, 3, 18, 9)),
+    ])
+    series = trends.series('platform', weeks=3, until=date(2026, 3, 22))
+    assert series['labels'] == ['2026-03-02', '2026-03-09', '2026-03-16']
+    assert series['count'] == [2, 0, 0]
+    assert series['mean_score'] == [0.0, None, None]
+    assert series['themes'] == {'Workload': [2, 0, 0]}
+
+    everyone = trends.series(weeks=3, until=date(2026, 3, 22))
+    assert everyone['count'] == [2, 0, 1]
+    assert everyone['summary']['count'] == 3
+    with pytest.raises(ValueError):
+        trends.series(granularity='day')
+
+def test_series_clamps_the_span(tmp_path):
+    trends = SentimentTrends(os.path.join(str(tmp_path), 'trends.sqlite3'))
+    series = trends.series(weeks=10 ** 9, until=date(2026, 3, 22))
+    assert series['granularity'] == 'month'
+    assert len(series['labels']) == 25
+    assert len(trends.series(weeks=-5, until=date(2026, 3, 22))['labels']) == 1
+
+def test_fallback_results_are_left_out(tmp_path):
+    trends = SentimentTrends(os.path.join(str(tmp_path), 'trends.sqlite3'))
+    recorded = trends.record_many([
+        ({'sentiment_score': 0.5}, 'platform', datetime(2026, 3, 2, 9)),
+        ({'sentiment_score': -0.9, 'degraded': True}, 'platform', datetime(2026, 3, 2, 9)),
+        ({'sentiment_score': -0.9, 'provisional': True}, 'platform', datetime(2026, 3, 2, 9)),
+    ])
+    assert recorded == 1
+    assert trends.series('platform', weeks=1, until=date(2026, 3, 8))['mean_score'] == [0.5]
+
+def test_trends_view_clamps_huge_spans():
+    import app
+    response = app.app.test_client().get('/api/sentiment-trends?weeks=99999999999999999999')
+    assert response.status_code == 200
+    assert len(response.get_json()['labels']) <= sentiment_trends.MAX_POINTS
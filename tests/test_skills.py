@@ -0,0 +1,52 @@
+import pytest
+
+from utils.skills import SkillMatcher, find_skills, get_skill_matcher, reconcile_skill_lists
+
+@pytest.mark.parametrize('text', [
+    'Willing to go the extra mile for customers',
+    'I excel at stakeholder management',
+    'Joined as an intern in spring 2023',
+    'Shipped by express delivery',
+    'Runs the weekly scrum of the rugby club',
+    'Able to react quickly and stay swift under pressure',
+    'Added a worker node to the cluster',
+])
+def test_ordinary_words_are_not_skills(text):
+    assert find_skills(text) == []
+
+def test_guarded_skills_match_when_written_as_skills():
+    text = 'Backend in Go and golang, dashboards in Excel, APIs with Express and Spring Boot, Scrum master'
+    assert find_skills(text) == ['Go', 'Excel', 'Express', 'Spring Boot', 'Scrum']
+
+def test_alias_only_skills_are_found_through_their_aliases():
+    assert find_skills('Migrated the Spring Framework services') == ['Spring']
+    assert find_skills('Spring') == []
+
+def test_aliases_map_to_canonical_names_on_token_boundaries():
+    text = 'k8s, ReactJS and node.js; Postgres. JavaScript not Java? C++ and C#, scikit learn'
+    assert find_skills(text) == ['Kubernetes', 'React', 'Node.js', 'PostgreSQL', 'JavaScript', 'Java',
+                                 'C++', 'C#', 'scikit-learn']
+
+def test_canonicalize_accepts_any_case_for_skill_lists():
+    matcher = get_skill_matcher()
+    assert matcher.canonicalize('golang') == 'Go'
+    assert matcher.canonicalize('go') == 'Go'
+    assert matcher.canonicalize('spring') == 'Spring'
+    assert matcher.canonicalize('  Microsoft   Excel ') == 'Excel'
+    assert matcher.canonicalize('Cobol') is None
+
+def test_compiled_automaton_round_trips():
+    matcher = SkillMatcher.build({'Go': ['golang'], 'Spring': ['spring mvc']}, ['Go'], ['Spring'])
+    restored = SkillMatcher.from_dict(matcher.to_dict())
+    for text in ['go home', 'Go services', 'spring mvc', 'spring']:
+        assert restored.find(text) == matcher.find(text)
+    assert restored.find('Go and spring mvc') == ['Go', 'Spring']
+
+def test_reconcile_keeps_guarded_words_out_of_skill_lists():
+    result = {'extracted_skills': ['Python', 'Go', 'Cobol'], 'matching_skills': ['Go'], 'missing_skills': []}
+    resume = 'Python developer, happy to go the extra mile.'
+    job = 'We need Python and Go engineers.'
+    reconciled = reconcile_skill_lists(result, resume, job)
+    assert reconciled['extracted_skills'] == ['Python', 'Cobol']
+    assert reconciled['matching_skills'] == ['Python']
+    assert reconciled['missing_skills'] == ['Go']
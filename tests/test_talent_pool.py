@@ -0,0 +1,47 @@
+import pytest
+
+from utils import talent_pool
+from utils.talent_pool import TalentPool
+
+RESUMES = [
+    "Python developer with Django and PostgreSQL experience",
+    "Java engineer building Kafka streaming pipelines",
+    "Frontend developer working in React and TypeScript",
+    "Data scientist using Python, Pandas and PyTorch",
+    "DevOps engineer running Kubernetes and Terraform on AWS",
+    "Go backend engineer with gRPC and Redis",
+]
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(talent_pool, 'TALENT_POOL_SEGMENT_DOCS', 3)
+    monkeypatch.setattr(talent_pool, 'TALENT_POOL_MERGE_FACTOR', 2)
+    return TalentPool(str(tmp_path), background=False)
+
+def test_search_after_merge_uses_merged_segment_lengths(pool):
+    for number, text in enumerate(RESUMES):
+        pool.add(text, f"resume_{number}.pdf")
+    assert pool.flush() == 3
+    # Caches the document lengths of the first three-document segment
+    assert pool.search("Python developer")
+    assert pool.flush() == 3
+    assert pool.search("Python developer")
+
+    assert pool.merge()
+    results = pool.search("Python Kubernetes Redis")
+    assert {result['filename'] for result in results} >= {'resume_4.pdf', 'resume_5.pdf'}
+    assert pool.stats()['segments'] == 1
+
+def test_merged_index_scores_like_unmerged(pool):
+    for number, text in enumerate(RESUMES):
+        pool.add(text, f"resume_{number}.pdf")
+    pool.flush()
+    pool.flush()
+    before = [(r['candidate_id'], round(r['score'], 5)) for r in pool.search("Python engineer")]
+    pool.merge()
+    after = [(r['candidate_id'], round(r['score'], 5)) for r in pool.search("Python engineer")]
+    assert before == after
+
+def test_duplicate_upload_is_stored_once(pool):
+    first = pool.add(RESUMES[0], "a.pdf")
+    assert pool.add(RESUMES[0], "b.pdf") in (None, first)
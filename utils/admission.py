@@ -0,0 +1,378 @@
+import os
+import math
+import time
+import uuid
+import sqlite3
+import logging
+import tempfile
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Admission settings, overridable through environment variables
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "1").lower() not in ("0", "false", "no")
+ADMISSION_DB_PATH = os.environ.get(
+    "ADMISSION_DB_PATH", os.path.join(tempfile.gettempdir(), "tatviq_admission.sqlite3")
+)
+# Token buckets: sustained requests per second and burst size, per client and for the whole host
+CLIENT_RATE = float(os.environ.get("ADMISSION_CLIENT_RATE", "1"))
+CLIENT_BURST = float(os.environ.get("ADMISSION_CLIENT_BURST", "10"))
+GLOBAL_RATE = float(os.environ.get("ADMISSION_GLOBAL_RATE", "8"))
+GLOBAL_BURST = float(os.environ.get("ADMISSION_GLOBAL_BURST", "40"))
+# Analyses running at once across all workers, and how many requests may wait for a slot
+MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", "32"))
+MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "32"))
+QUEUE_TIMEOUT_SECONDS = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "2"))
+# Bulk requests never take more than this share of the slots, the rest stays free for single analyses
+BULK_SHARE = float(os.environ.get("ADMISSION_BULK_SHARE", "0.5"))
+BULK_COST = float(os.environ.get("ADMISSION_BULK_COST", "5"))
+# Held leases are renewed in the background, so one left behind by a crashed worker frees its slot after this long
+LEASE_TTL_SECONDS = float(os.environ.get("ADMISSION_LEASE_TTL", "120"))
+LEASE_RENEW_SECONDS = LEASE_TTL_SECONDS / 3
+OVERLOAD_RETRY_AFTER = float(os.environ.get("ADMISSION_RETRY_AFTER", "1"))
+
+# Lower value is served first
+PRIORITIES = {'interactive': 0, 'bulk': 1}
+
+POLL_SECONDS = 0.02
+BUCKET_IDLE_SECONDS = 3600
+
+registry.describe('tatviq_admission_admitted_total', 'Analysis requests admitted')
+registry.describe('tatviq_admission_rejected_total', 'Analysis requests rejected by admission control')
+registry.describe('tatviq_admission_wait_seconds', 'Time admitted requests waited for an in-flight slot')
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is shed instead of admitted
+
+    status is 429 when a rate limit was hit and 503 when the service is at
+    capacity; retry_after is the suggested wait in seconds.
+    """
+
+    def __init__(self, message: str, status: int, retry_after: float, reason: str):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+class Lease:
+    """
+    An admitted request's in-flight slot; release it when the work is done
+    """
+
+    __slots__ = ('controller', 'lease_id', 'released')
+
+    def __init__(self, controller: Optional["AdmissionController"], lease_id: Optional[str]):
+        self.controller = controller
+        self.lease_id = lease_id
+        self.released = False
+
+    def release(self) -> None:
+        if self.released:
+            return
+        self.released = True
+        if self.controller is not None and self.lease_id is not None:
+            self.controller.release(self.lease_id)
+
+    def __enter__(self) -> "Lease":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+class AdmissionController:
+    """
+    Token buckets and an in-flight semaphore shared by every worker process
+
+    Buckets, leases and the wait queue live in SQLite and every decision is
+    made inside one write transaction, so limits hold across gunicorn
+    workers. Waiters are served by priority, then arrival. Store errors are
+    logged and the request is admitted, so admission control can never take
+    the analysis endpoints down by itself.
+    """
+
+    def __init__(self, db_path: str = ADMISSION_DB_PATH, max_in_flight: int = MAX_IN_FLIGHT,
+                 max_queue: int = MAX_QUEUE, queue_timeout: float = QUEUE_TIMEOUT_SECONDS):
+        self.db_path = db_path
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        # Wakes waiters in this process as soon as a local lease is released
+        self._released = threading.Condition()
+        self._last_purge = 0.0
+        # Leases held by this process, kept alive by the renewer thread while streams and jobs run
+        self._held = set()
+        self._held_lock = threading.Lock()
+        self._renewer_pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS buckets ("
+                        "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+                    )
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS leases ("
+                        "id TEXT PRIMARY KEY, priority INTEGER NOT NULL, client TEXT NOT NULL, expires_at REAL NOT NULL)"
+                    )
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS waiters ("
+                        "id TEXT PRIMARY KEY, priority INTEGER NOT NULL, enqueued_at REAL NOT NULL, "
+                        "expires_at REAL NOT NULL)"
+                    )
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    def _limit(self, priority: int) -> int:
+        if priority == PRIORITIES['interactive']:
+            return self.max_in_flight
+        return max(1, int(self.max_in_flight * BULK_SHARE))
+
+    def _take_tokens(self, conn: sqlite3.Connection, client: str, cost: float, now: float) -> Optional[Tuple[str, float]]:
+        # Debit the client and global buckets together, or neither; returns (bucket, wait) when one is short
+        buckets = [(f"client:{client}", CLIENT_RATE, CLIENT_BURST), ("global", GLOBAL_RATE, GLOBAL_BURST)]
+        levels = []
+        shortfall = None
+        for key, rate, burst in buckets:
+            if rate <= 0:
+                continue
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            levels.append((key, tokens))
+            if tokens < min(cost, burst):
+                wait = (min(cost, burst) - tokens) / rate
+                if shortfall is None or wait > shortfall[1]:
+                    shortfall = (key.split(':', 1)[0], wait)
+        for key, tokens in levels:
+            if shortfall is None:
+                tokens = max(0.0, tokens - cost)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)", (key, tokens, now)
+            )
+        return shortfall
+
+    def _try_lease(self, conn: sqlite3.Connection, lease_id: str, client: str, priority: int,
+                   now: float, waiter: Optional[Tuple[str, float]]) -> bool:
+        conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+        in_flight = conn.execute("SELECT COUNT(*) FROM leases").fetchone()[0]
+        if in_flight >= self._limit(priority):
+            return False
+        # Requests already waiting ahead of this one get the slot first
+        if waiter is None:
+            ahead = conn.execute(
+                "SELECT COUNT(*) FROM waiters WHERE expires_at >= ? AND priority <= ?", (now, priority)
+            ).fetchone()[0]
+        else:
+            ahead = conn.execute(
+                "SELECT COUNT(*) FROM waiters WHERE expires_at >= ? AND id != ? AND "
+                "(priority < ? OR (priority = ? AND enqueued_at < ?))",
+                (now, waiter[0], priority, priority, waiter[1])
+            ).fetchone()[0]
+        if ahead and in_flight + ahead >= self.max_in_flight:
+            return False
+        conn.execute(
+            "INSERT INTO leases (id, priority, client, expires_at) VALUES (?, ?, ?, ?)",
+            (lease_id, priority, client, now + LEASE_TTL_SECONDS)
+        )
+        if waiter is not None:
+            conn.execute("DELETE FROM waiters WHERE id = ?", (waiter[0],))
+        return True
+
+    def admit(self, client: str, priority: str = 'interactive', cost: float = 1) -> Lease:
+        """
+        Admit a request or raise AdmissionRejected
+
+        Checks the client and global token buckets first, then takes an
+        in-flight slot, waiting up to the queue timeout for one to free up.
+
+            with controller.admit(client_id, 'interactive'):
+                result = analyze_sentiment_with_gemini(...)
+
+        Args:
+            client (str): Client identity the per-client bucket is keyed on
+            priority (str): 'interactive' or 'bulk'
+            cost (float): Tokens the request takes from the buckets
+
+        Returns:
+            Lease: The in-flight slot, to be released when the work finishes
+        """
+        level = PRIORITIES[priority]
+        labels = (('priority', priority),)
+        lease_id = uuid.uuid4().hex
+        started = time.monotonic()
+        waiter = None
+        try:
+            conn = self._connect()
+            now = time.time()
+            self._purge_idle(conn, now)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                shortfall = self._take_tokens(conn, client, cost, now)
+                if shortfall is None:
+                    if self._try_lease(conn, lease_id, client, level, now, None):
+                        conn.execute("COMMIT")
+                        registry.inc('tatviq_admission_admitted_total', labels=labels)
+                        registry.histogram('tatviq_admission_wait_seconds', labels).observe(0.0)
+                        return self._hold(lease_id)
+                    queued = conn.execute("SELECT COUNT(*) FROM waiters WHERE expires_at >= ?", (now,)).fetchone()[0]
+                    if queued < self.max_queue and self.queue_timeout > 0:
+                        waiter = (uuid.uuid4().hex, now)
+                        conn.execute(
+                            "INSERT INTO waiters (id, priority, enqueued_at, expires_at) VALUES (?, ?, ?, ?)",
+                            (waiter[0], level, now, now + self.queue_timeout + 1)
+                        )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Admission check failed, admitting: {str(e)}")
+            return Lease(None, None)
+
+        if shortfall is not None:
+            bucket, wait = shortfall
+            reason = f"{bucket}_rate"
+            self._reject(priority, reason)
+            raise AdmissionRejected('Too many analysis requests, please retry shortly', 429, wait, reason)
+        if waiter is None:
+            self._reject(priority, 'queue_full')
+            raise AdmissionRejected('The service is at capacity, please retry shortly', 503,
+                                    OVERLOAD_RETRY_AFTER, 'queue_full')
+
+        if self._wait_for_slot(lease_id, client, level, waiter, started + self.queue_timeout):
+            registry.inc('tatviq_admission_admitted_total', labels=labels)
+            registry.histogram('tatviq_admission_wait_seconds', labels).observe(time.monotonic() - started)
+            return self._hold(lease_id)
+        self._reject(priority, 'queue_timeout')
+        raise AdmissionRejected('The service is at capacity, please retry shortly', 503,
+                                OVERLOAD_RETRY_AFTER, 'queue_timeout')
+
+    def _wait_for_slot(self, lease_id: str, client: str, priority: int,
+                       waiter: Tuple[str, float], until: float) -> bool:
+        conn = self._connect()
+        try:
+            while True:
+                with self._released:
+                    self._released.wait(max(0.0, min(POLL_SECONDS, until - time.monotonic())))
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    acquired = self._try_lease(conn, lease_id, client, priority, time.time(), waiter)
+                    if not acquired and time.monotonic() >= until:
+                        conn.execute("DELETE FROM waiters WHERE id = ?", (waiter[0],))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                if acquired:
+                    return True
+                if time.monotonic() >= until:
+                    return False
+        except sqlite3.Error as e:
+            logger.warning(f"Admission wait failed, admitting: {str(e)}")
+            return True
+
+    def _reject(self, priority: str, reason: str) -> None:
+        registry.inc('tatviq_admission_rejected_total', labels=(('priority', priority), ('reason', reason)))
+
+    def _purge_idle(self, conn: sqlite3.Connection, now: float) -> None:
+        # A bucket idle this long has refilled completely, so dropping it changes nothing
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        conn.execute("DELETE FROM buckets WHERE updated_at < ?", (now - BUCKET_IDLE_SECONDS,))
+        conn.execute("DELETE FROM waiters WHERE expires_at < ?", (now,))
+
+    def _hold(self, lease_id: str) -> Lease:
+        with self._held_lock:
+            self._held.add(lease_id)
+            # Threads do not survive a fork, so every worker starts its own renewer
+            if self._renewer_pid != os.getpid():
+                self._renewer_pid = os.getpid()
+                threading.Thread(target=self._renew_held, name='admission-renewer', daemon=True).start()
+        return Lease(self, lease_id)
+
+    def _renew_held(self) -> None:
+        while True:
+            time.sleep(LEASE_RENEW_SECONDS)
+            with self._held_lock:
+                held = list(self._held)
+            for lease_id in held:
+                self.renew(lease_id)
+
+    def renew(self, lease_id: str) -> None:
+        """
+        Push a held lease's expiry out by another LEASE_TTL_SECONDS
+
+        Called periodically for every lease this process still holds, so long
+        streams and jobs keep their slot however long they run.
+
+        Args:
+            lease_id (str): The lease to keep alive
+        """
+        try:
+            self._connect().execute(
+                "UPDATE leases SET expires_at = ? WHERE id = ?", (time.time() + LEASE_TTL_SECONDS, lease_id)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Admission lease renewal failed: {str(e)}")
+
+    def release(self, lease_id: str) -> None:
+        with self._held_lock:
+            self._held.discard(lease_id)
+        try:
+            self._connect().execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+        except sqlite3.Error as e:
+            logger.warning(f"Admission lease release failed: {str(e)}")
+        with self._released:
+            self._released.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the host-wide in-flight and waiting counts for monitoring
+
+        Returns:
+            Dict[str, Any]: Admission gauges
+        """
+        now = time.time()
+        conn = self._connect()
+        return {
+            'in_flight': conn.execute("SELECT COUNT(*) FROM leases WHERE expires_at >= ?", (now,)).fetchone()[0],
+            'waiting': conn.execute("SELECT COUNT(*) FROM waiters WHERE expires_at >= ?", (now,)).fetchone()[0],
+            'max_in_flight': self.max_in_flight,
+        }
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """
+    Return the process-wide admission controller, creating it on first use
+
+    Returns:
+        Optional[AdmissionController]: The shared controller, or None when admission control is disabled
+    """
+    global _controller
+    if not ADMISSION_ENABLED:
+        return None
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController()
+    return _controller
@@ -0,0 +1,467 @@
+"""
+Static asset build: vendored third-party files plus our own JS/CSS, minified,
+content-hashed and precompressed into static/dist
+
+    python -m utils.assets [--no-vendor] [--lock]
+
+Third-party assets are listed in VENDOR_ASSETS and pinned by the SHA-384
+hashes in the committed static/vendor/vendor.lock.json. The build downloads
+them into static/vendor and fails on any file that is not in the lock or does
+not match it. --lock records new hashes; run it only when adding or upgrading
+an asset and review the diff. The app serves static/dist under
+/assets/ with immutable cache headers (see asset_url in app.py) and falls
+back to the plain static files and pinned CDN URLs when nothing was built.
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import base64
+import hashlib
+import logging
+import argparse
+import posixpath
+import threading
+import urllib.parse
+import urllib.request
+from typing import Dict, Any, Optional, List, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional, without it only gzip variants are written
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+DIST_DIR = os.environ.get("ASSETS_DIST_DIR", os.path.join(STATIC_DIR, 'dist'))
+VENDOR_DIR = os.path.join(STATIC_DIR, 'vendor')
+VENDOR_LOCK = os.path.join(VENDOR_DIR, 'vendor.lock.json')
+MANIFEST_NAME = 'manifest.json'
+
+# Our own sources, relative to static/
+SOURCE_DIRS = ('css', 'js')
+
+# Pinned third-party assets: path under static/ -> download URL
+FONT_AWESOME = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0"
+# The Replit theme URL carries no version, so its lock hash is its only pin: when Replit
+# changes the file the build fails until someone reviews the change and relocks
+VENDOR_ASSETS = {
+    'vendor/bootstrap/bootstrap-agent-dark-theme.min.css': "https://cdn.replit.com/agent/bootstrap-agent-dark-theme.min.css",
+    'vendor/bootstrap/bootstrap.bundle.min.js': "https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js",
+    'vendor/chart.js/chart.umd.js': "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.js",
+    'vendor/font-awesome/css/all.min.css': f"{FONT_AWESOME}/css/all.min.css",
+    **{
+        f'vendor/font-awesome/webfonts/{name}.{ext}': f"{FONT_AWESOME}/webfonts/{name}.{ext}"
+        for name in ('fa-brands-400', 'fa-regular-400', 'fa-solid-900', 'fa-v4compatibility')
+        for ext in ('woff2', 'ttf')
+    },
+}
+
+HASH_LENGTH = 12
+# Already compressed formats gain nothing from gzip/brotli
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.ttf', '.map')
+MIN_COMPRESS_BYTES = 512
+
+_WORD = re.compile(r'[\w$\u0080-￿]')
+_REGEX_KEYWORD = re.compile(r'(?:^|[^\w$])(?:return|typeof|case|do|else|in|of|new|delete|void|throw|yield|await)$')
+_CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+def minify_js(source: str) -> str:
+    """
+    Strip comments and indentation from JavaScript
+
+    Line breaks are kept (collapsed to one), so automatic semicolon insertion
+    behaves exactly as in the source. Strings, template literals and regex
+    literals are copied verbatim.
+
+    Args:
+        source (str): JavaScript source
+
+    Returns:
+        str: Minified source
+    """
+    out: List[str] = []
+    i, n = 0, len(source)
+
+    def tail() -> str:
+        return out[-1][-1] if out and out[-1] else ''
+
+    while i < n:
+        c = source[i]
+        nxt = source[i + 1] if i + 1 < n else ''
+        if c in '\'"`':
+            j = i + 1
+            while j < n and source[j] != c:
+                j += 2 if source[j] == '\\' else 1
+            out.append(source[i:j + 1])
+            i = j + 1
+        elif c == '/' and nxt == '/':
+            while i < n and source[i] not in '\r\n':
+                i += 1
+        elif c == '/' and nxt == '*':
+            end = source.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            # A comment spanning lines still separates statements
+            if '\n' in source[i:end] and tail() not in ('', '\n'):
+                out.append('\n')
+            i = end
+        elif c == '/' and (tail() in ('', '\n') or tail() in '(,=:[!&|?{};+-*%<>~^'
+                           or _REGEX_KEYWORD.search(''.join(out[-12:]))):
+            j, in_class = i + 1, False
+            while j < n and source[j] != '\n':
+                if source[j] == '\\':
+                    j += 1
+                elif source[j] == '[':
+                    in_class = True
+                elif source[j] == ']':
+                    in_class = False
+                elif source[j] == '/' and not in_class:
+                    break
+                j += 1
+            j += 1
+            while j < n and _WORD.match(source[j]):
+                j += 1
+            out.append(source[i:j])
+            i = j
+        elif c in ' \t\r\n\f\v':
+            j = i
+            newline = False
+            while j < n and source[j] in ' \t\r\n\f\v':
+                newline = newline or source[j] == '\n'
+                j += 1
+            previous, following = tail(), source[j] if j < n else ''
+            if newline:
+                if previous not in ('', '\n'):
+                    out.append('\n')
+            elif previous and following and ((_WORD.match(previous) and _WORD.match(following)) or
+                                              (previous in '+-' and following in '+-')):
+                # Keep "a b" and "a + +b" apart, everything else can touch
+                out.append(' ')
+            i = j
+        else:
+            out.append(c)
+            i += 1
+    return ''.join(out).strip() + '\n'
+
+def minify_css(source: str) -> str:
+    """
+    Strip comments and insignificant whitespace from CSS
+
+    Args:
+        source (str): CSS source
+
+    Returns:
+        str: Minified source
+    """
+    css = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip() + '\n'
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+def hashed_name(path: str, data: bytes) -> str:
+    root, ext = posixpath.splitext(path)
+    return f"{root}.{content_hash(data)}{ext}"
+
+def sri(data: bytes) -> str:
+    return 'sha384-' + base64.b64encode(hashlib.sha384(data).digest()).decode('ascii')
+
+def _read_lock() -> Dict[str, Dict[str, str]]:
+    if not os.path.exists(VENDOR_LOCK):
+        return {}
+    with open(VENDOR_LOCK) as f:
+        return json.load(f)
+
+def _download(url: str, timeout: float) -> Optional[bytes]:
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.read()
+    except OSError as e:
+        logger.warning(f"Could not download {url}: {str(e)}")
+        return None
+
+def update_vendor_lock(timeout: float = 30) -> Dict[str, Dict[str, str]]:
+    """
+    Download every pinned third-party asset and record its SHA-384 in vendor.lock.json
+
+    This is the only place hashes are recorded. Run it deliberately when
+    adding or upgrading an asset, review the lock diff and commit it; the
+    deployment build never trusts a download that is not in the lock.
+
+    Args:
+        timeout (float): Per-download timeout in seconds
+
+    Returns:
+        Dict[str, Dict[str, str]]: The new lock
+
+    Raises:
+        Exception: If any asset could not be downloaded
+    """
+    lock = {}
+    for path, url in VENDOR_ASSETS.items():
+        data = _download(url, timeout)
+        if data is None:
+            raise Exception(f"Failed to lock {path}: {url} could not be downloaded")
+        lock[path] = {'url': url, 'integrity': sri(data)}
+    os.makedirs(VENDOR_DIR, exist_ok=True)
+    with open(VENDOR_LOCK, 'w') as f:
+        json.dump(lock, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return lock
+
+def _verified(path: str, data: bytes, lock: Dict[str, Dict[str, str]]) -> bool:
+    pinned = lock.get(path)
+    return pinned is not None and pinned['url'] == VENDOR_ASSETS[path] and pinned['integrity'] == sri(data)
+
+def fetch_vendor_assets(timeout: float = 30) -> Dict[str, str]:
+    """
+    Download missing pinned third-party assets into static/vendor
+
+    Every asset must have its SHA-384 in the committed vendor.lock.json, and
+    downloaded or already present files must match it; anything unpinned or
+    different fails the build instead of being recorded. Without a lock
+    nothing is vendored and the templates keep using the CDN URLs. A failed
+    download is logged and skipped, the templates then keep using the CDN
+    URL for that asset.
+
+    Args:
+        timeout (float): Per-download timeout in seconds
+
+    Returns:
+        Dict[str, str]: Status per asset path: present, downloaded, failed or unlocked
+
+    Raises:
+        Exception: If an asset is missing from the lock or does not match its hash
+    """
+    lock = _read_lock()
+    if not lock:
+        logger.warning("No vendor.lock.json, skipping vendoring; run `python -m utils.assets --lock` and commit it")
+        return {path: 'unlocked' for path in VENDOR_ASSETS}
+    unpinned = [path for path in VENDOR_ASSETS if path not in lock or lock[path]['url'] != VENDOR_ASSETS[path]]
+    if unpinned:
+        raise Exception(f"Failed to vendor assets: {', '.join(unpinned)} not pinned in vendor.lock.json")
+
+    status = {}
+    for path, url in VENDOR_ASSETS.items():
+        target = os.path.join(STATIC_DIR, path)
+        if os.path.exists(target):
+            with open(target, 'rb') as f:
+                data = f.read()
+            status[path] = 'present'
+        else:
+            data = _download(url, timeout)
+            if data is None:
+                status[path] = 'failed'
+                continue
+            status[path] = 'downloaded'
+        if not _verified(path, data, lock):
+            raise Exception(f"Failed to vendor {path}: content does not match vendor.lock.json")
+        if status[path] == 'downloaded':
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+    return status
+
+def _sources() -> List[str]:
+    paths = []
+    for directory in SOURCE_DIRS:
+        for root, _, files in os.walk(os.path.join(STATIC_DIR, directory)):
+            paths += [os.path.relpath(os.path.join(root, name), STATIC_DIR).replace(os.sep, '/') for name in files]
+    # Only vendor files that match the lock are built; anything else stays on the CDN
+    lock = _read_lock()
+    for path in VENDOR_ASSETS:
+        target = os.path.join(STATIC_DIR, path)
+        if os.path.exists(target):
+            with open(target, 'rb') as f:
+                if _verified(path, f.read(), lock):
+                    paths.append(path)
+    # CSS last, so the files its url()s point at already have their hashed names
+    return sorted(paths, key=lambda path: (path.endswith('.css'), path))
+
+def _rewrite_css_urls(css: str, path: str, built: Dict[str, Dict[str, Any]]) -> str:
+    # Point url()s at the hashed files; the CSS file keeps its directory, so relative paths stay relative
+    def replace(match):
+        reference = match.group(2).strip()
+        if re.match(r'^(?:[a-z]+:|//|#)', reference, re.I):
+            return match.group(0)
+        clean = re.split(r'[?#]', reference, maxsplit=1)[0]
+        suffix = reference[len(clean):]
+        resolved = posixpath.normpath(posixpath.join(posixpath.dirname(path), clean))
+        if resolved in built:
+            return f"url({posixpath.relpath(built[resolved]['path'], posixpath.dirname(path))}{suffix})"
+        if path in VENDOR_ASSETS:
+            # Something the vendored stylesheet needs but we did not vendor, keep loading it from its origin
+            return f"url({urllib.parse.urljoin(VENDOR_ASSETS[path], reference)})"
+        return match.group(0)
+    return _CSS_URL.sub(replace, css)
+
+def _write_compressed(target: str, data: bytes) -> Dict[str, int]:
+    variants = {}
+    if not target.endswith(COMPRESSIBLE) or len(data) < MIN_COMPRESS_BYTES:
+        return variants
+    encoded = {'gzip': ('.gz', gzip.compress(data, compresslevel=9, mtime=0))}
+    if brotli is not None:
+        encoded['br'] = ('.br', brotli.compress(data, quality=11))
+    for encoding, (suffix, payload) in encoded.items():
+        # Keep a variant only when it actually saves bytes
+        if len(payload) < len(data):
+            with open(target + suffix, 'wb') as f:
+                f.write(payload)
+            variants[encoding] = len(payload)
+    return variants
+
+def build_assets(dist_dir: str = DIST_DIR) -> Dict[str, Any]:
+    """
+    Minify, fingerprint and precompress every asset into dist_dir
+
+    Writes dist_dir/manifest.json mapping each logical path (relative to
+    static/) to its hashed path, size and precompressed variants.
+
+    Args:
+        dist_dir (str): Output directory
+
+    Returns:
+        Dict[str, Any]: The manifest
+    """
+    built: Dict[str, Dict[str, Any]] = {}
+    for path in _sources():
+        with open(os.path.join(STATIC_DIR, path), 'rb') as f:
+            data = f.read()
+        vendored = path.startswith('vendor/')
+        if path.endswith('.js') and not vendored:
+            data = minify_js(data.decode('utf-8')).encode('utf-8')
+        elif path.endswith('.css'):
+            css = data.decode('utf-8')
+            data = _rewrite_css_urls(css if vendored else minify_css(css), path, built).encode('utf-8')
+        target_path = hashed_name(path, data)
+        target = os.path.join(dist_dir, target_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+        built[path] = {'path': target_path, 'size': len(data), 'integrity': sri(data),
+                       'encodings': _write_compressed(target, data)}
+
+    manifest = {'version': 1, 'files': built}
+    os.makedirs(dist_dir, exist_ok=True)
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+class AssetManifest:
+    """
+    Lookup of built assets, reloaded when the manifest file changes
+    """
+
+    def __init__(self, dist_dir: str = DIST_DIR):
+        self.dist_dir = dist_dir
+        self._path = os.path.join(dist_dir, MANIFEST_NAME)
+        self._mtime: Optional[float] = None
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._by_hashed: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        try:
+            mtime = os.stat(self._path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            files = {}
+            if mtime is not None:
+                try:
+                    with open(self._path) as f:
+                        files = json.load(f).get('files', {})
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not read asset manifest: {str(e)}")
+            self._files = files
+            self._by_hashed = {entry['path']: entry for entry in files.values()}
+            self._mtime = mtime
+
+    def hashed_path(self, filename: str) -> Optional[str]:
+        """
+        Return the fingerprinted path of a static file, or None if it was not built
+        """
+        self._refresh()
+        entry = self._files.get(filename)
+        return entry['path'] if entry else None
+
+    def variant(self, hashed_path: str, accepted: Dict[str, float]) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Pick the file to send for a fingerprinted path
+
+        Args:
+            hashed_path (str): Path under dist_dir, as returned by hashed_path()
+            accepted (Dict[str, float]): Content codings the client accepts, with their quality
+
+        Returns:
+            Optional[Tuple[str, Optional[str]]]: (file under dist_dir, content coding or None),
+            or None when the path is not a built asset
+        """
+        self._refresh()
+        entry = self._by_hashed.get(hashed_path)
+        if entry is None:
+            return None
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if encoding in entry['encodings'] and accepted.get(encoding, 0) > 0:
+                return hashed_path + suffix, encoding
+        return hashed_path, None
+
+def vendor_fallback_url(filename: str) -> Optional[str]:
+    """
+    Return the pinned CDN URL of a vendored asset, for when it was not built
+
+    Unbuilt vendor files are never served from static/, since only files
+    matching vendor.lock.json make it into the build.
+    """
+    return VENDOR_ASSETS.get(filename)
+
+_manifest: Optional[AssetManifest] = None
+_manifest_lock = threading.Lock()
+
+def get_asset_manifest() -> AssetManifest:
+    """
+    Return the process-wide asset manifest, creating it on first use
+
+    Returns:
+        AssetManifest: The shared manifest
+    """
+    global _manifest
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                _manifest = AssetManifest()
+    return _manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--no-vendor", action="store_true", help="skip downloading missing third-party assets")
+    parser.add_argument("--lock", action="store_true",
+                        help="download every third-party asset and rewrite vendor.lock.json with their hashes")
+    parser.add_argument("--dist", default=DIST_DIR, help="output directory")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.lock:
+        update_vendor_lock()
+    if not args.no_vendor:
+        status = fetch_vendor_assets()
+        missing = [path for path, state in status.items() if state == 'failed']
+        if missing:
+            logger.warning(f"{len(missing)} vendor assets unavailable, pages will load them from the CDN")
+    manifest = build_assets(args.dist)
+    files = manifest['files']
+    raw = sum(entry['size'] for entry in files.values())
+    gz = sum(entry['encodings'].get('gzip', entry['size']) for entry in files.values())
+    br = sum(entry['encodings'].get('br', entry['encodings'].get('gzip', entry['size'])) for entry in files.values())
+    print(f"built {len(files)} assets into {args.dist}: {raw} bytes, {gz} gzip, {br} best encoding"
+          + ("" if brotli is not None else " (brotli not installed)"), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
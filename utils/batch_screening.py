@@ -0,0 +1,170 @@
+import io
+import os
+import logging
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Tuple, Iterator, Iterable, Optional
+
+from utils.resume_parser import extract_text_from_bytes
+from utils.gemini_api import analyze_resume_with_gemini
+from utils.prescreen import shortlist_resumes
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent Gemini calls per batch; requests may ask for less
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "4"))
+BATCH_EXTRACTION_WORKERS = int(os.environ.get("BATCH_EXTRACTION_WORKERS", "4"))
+MAX_BATCH_FILES = int(os.environ.get("MAX_BATCH_FILES", "500"))
+MAX_ARCHIVE_MEMBER_SIZE = 16 * 1024 * 1024  # same cap as a single upload
+# Total uncompressed resume bytes a batch may expand to, and the most a member may shrink when
+# compressed; PDFs and DOCX files are compressed already, so a huge ratio means a zip bomb
+MAX_BATCH_UNCOMPRESSED_BYTES = int(os.environ.get("MAX_BATCH_UNCOMPRESSED_BYTES", 256 * 1024 * 1024))
+MAX_COMPRESSION_RATIO = float(os.environ.get("MAX_ARCHIVE_COMPRESSION_RATIO", "100"))
+
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+
+def _expand_archive(data: bytes, max_files: int = MAX_BATCH_FILES,
+                    max_bytes: int = MAX_BATCH_UNCOMPRESSED_BYTES) -> List[Tuple[str, bytes]]:
+    """
+    Read PDF/DOCX members out of a zip archive, skipping anything else
+
+    The member count, total uncompressed size and compression ratios are
+    checked from the central directory before anything is decompressed.
+    zipfile never inflates a member past its recorded size, so the checks
+    also bound memory for archives with forged headers.
+
+    Args:
+        data (bytes): Raw zip file content
+        max_files (int): Most resumes the archive may contain
+        max_bytes (int): Most uncompressed resume bytes the archive may contain
+
+    Returns:
+        List[Tuple[str, bytes]]: (member name, content) pairs
+
+    Raises:
+        ValueError: If the archive is corrupt or exceeds a limit
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Invalid zip archive: {str(e)}")
+    with archive:
+        selected = []
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+                continue
+            if not name.lower().endswith(RESUME_EXTENSIONS):
+                continue
+            if info.file_size > MAX_ARCHIVE_MEMBER_SIZE:
+                logger.warning(f"Skipping oversized archive member: {info.filename}")
+                continue
+            if info.file_size > MAX_COMPRESSION_RATIO * max(info.compress_size, 1):
+                raise ValueError(f"Archive member {info.filename} has an implausible compression ratio")
+            selected.append((name, info))
+        if len(selected) > max_files:
+            raise ValueError(f"Batch contains more than {MAX_BATCH_FILES} resumes")
+        total = sum(info.file_size for _, info in selected)
+        if total > max_bytes:
+            raise ValueError(f"Archive expands to {total} bytes, the limit is {MAX_BATCH_UNCOMPRESSED_BYTES}")
+        return [(name, archive.read(info)) for name, info in selected]
+
+def collect_resume_files(uploads: Iterable[Tuple[str, bytes]]) -> List[Tuple[str, bytes]]:
+    """
+    Flatten uploaded files into a list of resumes, expanding zip archives
+
+    Args:
+        uploads (Iterable[Tuple[str, bytes]]): (file name, content) pairs as uploaded
+
+    Returns:
+        List[Tuple[str, bytes]]: (file name, content) pairs for every PDF/DOCX resume
+
+    Raises:
+        ValueError: If the batch has too many resumes or an archive is unsafe to expand
+    """
+    resumes = []
+    expanded_bytes = 0
+    for filename, data in uploads:
+        lower = filename.lower()
+        if lower.endswith('.zip'):
+            # Archives share the batch's file and size budget with everything before them
+            members = _expand_archive(data, MAX_BATCH_FILES - len(resumes),
+                                      MAX_BATCH_UNCOMPRESSED_BYTES - expanded_bytes)
+            expanded_bytes += sum(len(content) for _, content in members)
+            resumes.extend(members)
+        elif lower.endswith(RESUME_EXTENSIONS):
+            resumes.append((filename, data))
+        else:
+            logger.warning(f"Skipping unsupported batch file: {filename}")
+        if len(resumes) > MAX_BATCH_FILES:
+            raise ValueError(f"Batch contains more than {MAX_BATCH_FILES} resumes")
+    return resumes
+
+def iter_batch_results(resumes: List[Tuple[str, bytes]], job_description: str, api_key: str,
+                       concurrency: int = BATCH_CONCURRENCY, top_k: Optional[int] = None,
+                       min_score: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Extract and analyze a batch of resumes, yielding each result as soon as it finishes
+
+    Text extraction runs in parallel first. Every resume then gets a local
+    BM25 pre-screen score; when ``top_k`` or ``min_score`` is given only the
+    shortlisted resumes are sent to Gemini and the rest are reported as
+    skipped. The Gemini analyses fan out over a pool bounded by
+    ``concurrency``. Failures are reported per resume and never abort the
+    rest of the batch.
+
+    Args:
+        resumes (List[Tuple[str, bytes]]): (file name, content) pairs
+        job_description (str): Job description text
+        api_key (str): Gemini API key
+        concurrency (int): Maximum number of concurrent Gemini calls
+        top_k (Optional[int]): Only analyze the K best pre-screened resumes
+        min_score (Optional[float]): Only analyze resumes whose normalized pre-screen score is at least this
+
+    Yields:
+        Dict[str, Any]: Per-resume record with index, filename, status and result or error;
+            analyzed records also carry the extracted resume_text
+    """
+    concurrency = max(1, min(concurrency, BATCH_CONCURRENCY))
+    texts: Dict[int, str] = {}
+
+    with ThreadPoolExecutor(max_workers=BATCH_EXTRACTION_WORKERS) as pool:
+        futures = {
+            pool.submit(extract_text_from_bytes, filename, data): index
+            for index, (filename, data) in enumerate(resumes)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                texts[index] = future.result()
+            except Exception as e:
+                logger.error(f"Batch extraction failed for {resumes[index][0]}: {str(e)}")
+                yield {'index': index, 'filename': resumes[index][0], 'status': 'error', 'error': str(e)}
+
+    indices = list(texts)
+    prescreen = {}
+    for entry in shortlist_resumes(job_description, [texts[i] for i in indices], top_k, min_score):
+        index = indices[entry['index']]
+        prescreen[index] = entry['normalized_score']
+        if not entry['shortlisted']:
+            yield {'index': index, 'filename': resumes[index][0], 'status': 'skipped',
+                   'prescreen_score': entry['normalized_score']}
+            del texts[index]
+
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        futures = {
+            pool.submit(analyze_resume_with_gemini, text, job_description, api_key): index
+            for index, text in texts.items()
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            record = {'index': index, 'filename': resumes[index][0], 'prescreen_score': prescreen[index]}
+            try:
+                yield {**record, 'status': 'ok', 'result': future.result(), 'resume_text': texts[index]}
+            except Exception as e:
+                logger.error(f"Batch analysis failed for {resumes[index][0]}: {str(e)}")
+                yield {**record, 'status': 'error', 'error': str(e)}
+    finally:
+        # Drop queued analyses if the client disconnects mid-stream
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,229 @@
+import io
+import os
+import csv
+import json
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Iterator, Iterable, IO, Set
+
+from utils.gemini_api import analyze_sentiment_batch_with_gemini
+from utils.local_sentiment import local_bulk_results
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = int(os.environ.get("BULK_SENTIMENT_BATCH_SIZE", "20"))
+BULK_BATCH_MAX_CHARS = int(os.environ.get("BULK_SENTIMENT_BATCH_MAX_CHARS", "12000"))
+BULK_CONCURRENCY = int(os.environ.get("BULK_SENTIMENT_CONCURRENCY", "4"))
+MAX_COMMENT_CHARS = 4000
+
+TEXT_FIELDS = ('feedback_text', 'feedback', 'comment', 'comments', 'text', 'response')
+ID_FIELDS = ('id', 'response_id', 'comment_id')
+TEAM_FIELDS = ('team', 'department', 'dept', 'group')
+RISK_LEVELS = ('low', 'medium', 'high')
+
+def _pick(record: Dict[str, Any], fields: Iterable[str]) -> Any:
+    lowered = {str(key).strip().lower(): value for key, value in record.items()}
+    for field in fields:
+        if lowered.get(field) not in (None, ''):
+            return lowered[field]
+    return None
+
+def _jsonl_records(lines: Iterable[str]) -> Iterator[Any]:
+    # A bad line becomes a ValueError in place of its record, so one typo does not end the run
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        if isinstance(record, str):
+            record = {'text': record}
+        if not isinstance(record, dict):
+            record = ValueError(f"Expected a JSON object, got {type(record).__name__}")
+        yield record
+
+def _unique_id(item_id: str, seen: Set[str]) -> str:
+    # Results are keyed by id, so a repeated id gets a "#n" suffix instead of overwriting the first
+    unique, copy = item_id, 1
+    while unique in seen:
+        copy += 1
+        unique = f"{item_id}#{copy}"
+    seen.add(unique)
+    return unique
+
+def iter_feedback_items(stream: IO[bytes], filename: str) -> Iterator[Dict[str, str]]:
+    """
+    Stream feedback comments out of a CSV or JSONL survey export
+
+    The comment column is the first of feedback_text/feedback/comment/
+    comments/text/response that is present (or the only column). Ids come
+    from an id column when there is one, otherwise from the row number, and
+    repeated ids are suffixed with "#2", "#3"... A team/department column,
+    when present, is carried along for the trend rollups. JSONL lines that
+    are not valid JSON objects are yielded with an "error" instead of text.
+
+    Args:
+        stream (IO[bytes]): Uploaded file stream
+        filename (str): Original file name, used to pick the format
+
+    Yields:
+        Dict[str, str]: {"id": ..., "text": ...} per non-empty comment, plus "team" when exported
+            and "error" for records that could not be read
+    """
+    text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+    if filename.lower().endswith(('.jsonl', '.ndjson')):
+        records = _jsonl_records(text_stream)
+    elif filename.lower().endswith('.csv'):
+        records = csv.DictReader(text_stream)
+    else:
+        raise ValueError("Unsupported file format, please upload a .csv or .jsonl export")
+
+    seen: Set[str] = set()
+    for row_number, record in enumerate(records, start=1):
+        if isinstance(record, ValueError):
+            yield {'id': _unique_id(str(row_number), seen), 'text': '', 'error': str(record)}
+            continue
+        text = _pick(record, TEXT_FIELDS)
+        if text is None and len(record) == 1:
+            text = next(iter(record.values()))
+        if not text or not str(text).strip():
+            continue
+        item_id = _pick(record, ID_FIELDS)
+        item_id = _unique_id(str(item_id if item_id is not None else row_number), seen)
+        item = {'id': item_id, 'text': str(text).strip()[:MAX_COMMENT_CHARS]}
+        team = _pick(record, TEAM_FIELDS)
+        if team is not None:
+            item['team'] = str(team).strip()
+        yield item
+
+def pack_items(items: Iterable[Dict[str, str]], batch_size: int = BULK_BATCH_SIZE,
+               max_chars: int = BULK_BATCH_MAX_CHARS) -> Iterator[List[Dict[str, str]]]:
+    """
+    Group comments into prompt-sized batches
+
+    Args:
+        items (Iterable[Dict[str, str]]): Comments
+        batch_size (int): Maximum comments per request
+        max_chars (int): Maximum total comment characters per request
+
+    Yields:
+        List[Dict[str, str]]: Batches of comments
+    """
+    batch: List[Dict[str, str]] = []
+    chars = 0
+    for item in items:
+        if batch and (len(batch) >= batch_size or chars + len(item['text']) > max_chars):
+            yield batch
+            batch, chars = [], 0
+        batch.append(item)
+        chars += len(item['text'])
+    if batch:
+        yield batch
+
+class SentimentRollup:
+    """
+    Running aggregates over bulk sentiment results
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.degraded = 0
+        self.score_sum = 0.0
+        self.scored = 0
+        self.themes: Counter = Counter()
+        self.risk_levels: Counter = Counter()
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.count += 1
+        self.degraded += bool(result.get('degraded'))
+        try:
+            self.score_sum += float(result.get('sentiment_score'))
+            self.scored += 1
+        except (TypeError, ValueError):
+            pass
+        for theme in result.get('key_themes') or []:
+            if isinstance(theme, str) and theme.strip():
+                self.themes[theme.strip().title()] += 1
+        risk = result.get('attrition_risk')
+        level = str(risk.get('level', '')).lower() if isinstance(risk, dict) else ''
+        self.risk_levels[level if level in RISK_LEVELS else 'unknown'] += 1
+
+    def to_dict(self, top_themes: int = 10) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'failed': self.failed,
+            'degraded': self.degraded,
+            'mean_sentiment_score': round(self.score_sum / self.scored, 4) if self.scored else None,
+            'attrition_risk_levels': {level: self.risk_levels.get(level, 0) for level in (*RISK_LEVELS, 'unknown')},
+            'top_themes': [{'theme': theme, 'count': count} for theme, count in self.themes.most_common(top_themes)],
+        }
+
+def _local_fallback(items: List[Dict[str, str]], reason: str) -> Dict[str, Dict[str, Any]]:
+    # Score comments Gemini did not answer with the local lexicon scorer, flagged "degraded"
+    results = local_bulk_results(items)
+    for result in results.values():
+        result.pop('provisional', None)
+        result.update(degraded=True, degraded_reason=reason)
+    return results
+
+def _analyze_batch(batch: List[Dict[str, str]], api_key: str) -> List[Dict[str, Any]]:
+    readable = [item for item in batch if 'error' not in item]
+    answers: Dict[str, Dict[str, Any]] = {}
+    if readable:
+        try:
+            answers = analyze_sentiment_batch_with_gemini(readable, api_key)
+        except Exception as e:
+            logger.warning(f"Bulk sentiment batch failed, falling back to local scoring: {str(e)}")
+            answers = _local_fallback(readable, str(e))
+        missing = [item for item in readable if item['id'] not in answers]
+        if missing:
+            answers = {**answers, **_local_fallback(missing, 'No result returned for this comment')}
+    return [
+        {'id': item['id'], 'text': item['text'], 'team': item.get('team'), 'status': 'error', 'error': item['error']}
+        if 'error' in item else
+        {'id': item['id'], 'text': item['text'], 'team': item.get('team'), 'status': 'ok', 'result': answers[item['id']]}
+        for item in batch
+    ]
+
+def iter_bulk_results(items: Iterable[Dict[str, str]], api_key: str, concurrency: int = BULK_CONCURRENCY,
+                      batch_size: int = BULK_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Analyze a stream of comments in packed batches under a concurrency limit
+
+    Input is consumed lazily: at most ``concurrency`` batches are in flight
+    and only a few more are read ahead, so very large exports never sit in
+    memory all at once.
+
+    Args:
+        items (Iterable[Dict[str, str]]): Comments
+        api_key (str): Gemini API key
+        concurrency (int): Maximum concurrent Gemini requests
+        batch_size (int): Comments per request
+
+    Yields:
+        List[Dict[str, Any]]: Per-comment records of each finished batch
+    """
+    concurrency = max(1, min(concurrency, BULK_CONCURRENCY))
+    batches = pack_items(items, max(1, min(batch_size, BULK_BATCH_SIZE)))
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        in_flight = set()
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < concurrency:
+                batch = next(batches, None)
+                if batch is None:
+                    exhausted = True
+                else:
+                    in_flight.add(pool.submit(_analyze_batch, batch, api_key))
+            if not in_flight:
+                return
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,365 @@
+import os
+import re
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Optional, Tuple, TypeVar
+
+from utils.prompts import estimate_tokens, trim_resume, clean_text, is_resume_section, CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+CHUNKING_ENABLED = os.environ.get("CHUNKING_ENABLED", "1").lower() not in ("0", "false", "no")
+# Target chunk size; inputs over their prompt budget are split into chunks of at most this many tokens
+CHUNK_TOKENS = int(os.environ.get("CHUNK_TOKENS", "3000"))
+# Chunks analyzed concurrently per document. With CHUNK_MAX_CHUNKS <= CHUNK_PARALLELISM
+# every chunk runs in the first wave, so latency is that of the slowest chunk.
+CHUNK_PARALLELISM = int(os.environ.get("CHUNK_PARALLELISM", "8"))
+CHUNK_MAX_CHUNKS = int(os.environ.get("CHUNK_MAX_CHUNKS", "8"))
+# One small Gemini call over the chunk results reconciles scores and writes the
+# summary; with this off the merge is purely local and adds no latency
+CHUNK_MODEL_MERGE = os.environ.get("CHUNK_MODEL_MERGE", "1").lower() not in ("0", "false", "no")
+
+MAX_MERGED_ITEMS = 8
+RISK_ORDER = {'low': 0, 'medium': 1, 'high': 2}
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_NORMALIZE = re.compile(r'[^a-z0-9]+')
+
+def needs_chunking(text: str, budget: int) -> bool:
+    """
+    Tell whether an input is too long for a single prompt
+
+    Args:
+        text (str): Resume or feedback text
+        budget (int): Token budget of the single-prompt path
+
+    Returns:
+        bool: True if chunking is enabled and the text is over budget
+    """
+    return CHUNKING_ENABLED and estimate_tokens(text or '') > budget
+
+def _is_heading(line: str) -> bool:
+    # Known resume sections, or a short title-like line such as "Q3 RETRO" or "Interview notes:"
+    if is_resume_section(line):
+        return True
+    return len(line) <= 40 and (line.endswith(':') or (line.isupper() and any(c.isalpha() for c in line)))
+
+def _blocks(lines: List[str]) -> List[Tuple[str, bool]]:
+    # Paragraphs separated by blank lines; a heading starts a new block and stays
+    # attached to the paragraph under it. Returns (text, starts_section) pairs.
+    blocks: List[Tuple[str, bool]] = []
+    current: List[str] = []
+    heading = False
+    for line in lines:
+        if line and _is_heading(line):
+            if current:
+                blocks.append(('\n'.join(current), heading))
+            current, heading = [line], True
+        elif not line:
+            if current and not (heading and len(current) == 1):
+                blocks.append(('\n'.join(current), heading))
+                current, heading = [], False
+        else:
+            current.append(line)
+    if current:
+        blocks.append(('\n'.join(current), heading))
+    return blocks
+
+def _split_oversized(block: str, max_tokens: int) -> List[str]:
+    # Break a block larger than a chunk at lines, then sentences, then hard cuts,
+    # and pack the fragments back into pieces of up to max_tokens
+    limit = max_tokens * CHARS_PER_TOKEN
+    fragments = []
+    for line in block.split('\n'):
+        if len(line) <= limit:
+            fragments.append(line)
+            continue
+        for sentence in _SENTENCE_END.split(line):
+            fragments.extend(sentence[start:start + limit] for start in range(0, len(sentence), limit))
+
+    pieces, current = [], ''
+    for fragment in fragments:
+        if current and len(current) + 1 + len(fragment) > limit:
+            pieces.append(current)
+            current = ''
+        current = f"{current}\n{fragment}" if current else fragment
+    if current:
+        pieces.append(current)
+    return pieces
+
+def _pack(units: List[Tuple[str, bool]], max_tokens: int, target: int, sections: bool) -> List[str]:
+    # Greedy packing; with sections=True a heading starts a new chunk once the current one is half full
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for unit, heading in units:
+        tokens = estimate_tokens(unit) + 1
+        if current and (size + tokens > max_tokens or size >= target or (sections and heading and size >= target // 2)):
+            chunks.append('\n'.join(current))
+            current, size = [], 0
+        current.append(unit)
+        size += tokens
+    if current:
+        chunks.append('\n'.join(current))
+    return chunks
+
+def split_text(text: str, max_tokens: int = CHUNK_TOKENS, max_chunks: int = CHUNK_MAX_CHUNKS,
+               ceiling: Optional[int] = None) -> Tuple[List[str], int]:
+    """
+    Split cleaned text into chunks on section and paragraph boundaries
+
+    Chunks are balanced, so a 7,000 token document becomes three chunks of
+    about 2,300 tokens rather than 3,000 + 3,000 + 1,000: with every chunk
+    analyzed in parallel the slowest one sets the latency. A new section
+    starts a new chunk once the current one is half full, unless that
+    would need more than max_chunks chunks. Chunks then grow up to ceiling
+    tokens and only text that still does not fit is dropped; the caller is
+    told how many chunks were, so a partial analysis is never passed off as
+    complete.
+
+    Args:
+        text (str): Text with one logical line per line
+        max_tokens (int): Preferred maximum tokens per chunk
+        max_chunks (int): Maximum number of chunks
+        ceiling (Optional[int]): Hard maximum tokens per chunk, defaults to max_tokens
+
+    Returns:
+        Tuple[List[str], int]: Chunks in document order, and the number of chunks dropped
+    """
+    total = estimate_tokens(text)
+    ceiling = max(ceiling or max_tokens, max_tokens)
+    max_tokens = min(ceiling, max(max_tokens, -(-total // max_chunks)))
+    target = -(-total // max(1, -(-total // max_tokens)))
+
+    units: List[Tuple[str, bool]] = []
+    for block, heading in _blocks(text.split('\n')):
+        if estimate_tokens(block) < max_tokens:
+            units.append((block, heading))
+        else:
+            units.extend((piece, heading and index == 0) for index, piece in enumerate(_split_oversized(block, max_tokens - 1)))
+
+    chunks = _pack(units, max_tokens, target, sections=True)
+    if len(chunks) > max_chunks:
+        chunks = _pack(units, max_tokens, max_tokens, sections=False)
+    if len(chunks) > max_chunks and ceiling > max_tokens:
+        chunks = _pack(units, ceiling, ceiling, sections=False)
+    dropped = max(0, len(chunks) - max_chunks)
+    if dropped:
+        logger.warning(f"Text needs {len(chunks)} chunks, analyzing the first {max_chunks}")
+    return chunks[:max_chunks], dropped
+
+def split_resume(resume_text: str, budget: int) -> Tuple[List[str], int]:
+    """
+    Clean a resume like the single-prompt path does, then split it into chunks
+
+    Args:
+        resume_text (str): Extracted resume text
+        budget (int): Token budget of one resume prompt, the hard chunk size limit
+
+    Returns:
+        Tuple[List[str], int]: Chunks in document order, and the number of chunks dropped
+    """
+    return split_text(trim_resume(resume_text, budget, truncate=False), min(CHUNK_TOKENS, budget), ceiling=budget)
+
+def split_feedback(feedback_text: str, budget: int) -> Tuple[List[str], int]:
+    """
+    Collapse whitespace in feedback text, then split it into chunks
+
+    Args:
+        feedback_text (str): Employee feedback text
+        budget (int): Token budget of one feedback prompt, the hard chunk size limit
+
+    Returns:
+        Tuple[List[str], int]: Chunks in document order, and the number of chunks dropped
+    """
+    return split_text(clean_text(feedback_text), min(CHUNK_TOKENS, budget), ceiling=budget)
+
+def map_chunks(fn: Callable[[T], R], items: List[T],
+               parallelism: int = CHUNK_PARALLELISM) -> List[Tuple[Optional[R], Optional[Exception]]]:
+    """
+    Run fn over items concurrently, keeping the caller's context
+
+    Each task runs in a copy of the calling context, so the active deadline
+    (see utils.deadline) applies to every chunk.
+
+    Args:
+        fn (Callable[[T], R]): Work per item
+        items (List[T]): Items, e.g. chunk prompts
+        parallelism (int): Maximum concurrent calls
+
+    Returns:
+        List[Tuple[Optional[R], Optional[Exception]]]: (result, error) per item, in input order
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(parallelism, len(items))), thread_name_prefix='chunk') as pool:
+        futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+    outcomes = []
+    for future in futures:
+        error = future.exception()
+        outcomes.append((None, error) if error is not None else (future.result(), None))
+    return outcomes
+
+def _key(value: Any) -> str:
+    return _NORMALIZE.sub(' ', str(value).lower()).strip()
+
+def merge_lists(lists: List[Any], limit: Optional[int] = MAX_MERGED_ITEMS) -> List[str]:
+    """
+    Merge per-chunk lists round-robin, dropping case and punctuation duplicates
+
+    Round-robin order keeps every chunk represented when the result is capped.
+
+    Args:
+        lists (List[Any]): One list per chunk; non-lists are ignored
+        limit (Optional[int]): Maximum number of items, None for no cap
+
+    Returns:
+        List[str]: Merged items
+    """
+    lists = [[item for item in values if isinstance(item, str) and item.strip()]
+             for values in lists if isinstance(values, list)]
+    merged, seen = [], set()
+    for position in range(max((len(values) for values in lists), default=0)):
+        for values in lists:
+            if position < len(values) and _key(values[position]) not in seen:
+                seen.add(_key(values[position]))
+                merged.append(values[position].strip())
+    return merged if limit is None else merged[:limit]
+
+def merge_themes(lists: List[Any], limit: int = MAX_MERGED_ITEMS) -> List[str]:
+    """
+    Merge per-chunk theme lists, most widely mentioned first
+
+    Args:
+        lists (List[Any]): Theme list per chunk
+        limit (int): Maximum number of themes
+
+    Returns:
+        List[str]: Deduplicated themes
+    """
+    counts: Dict[str, int] = {}
+    names: Dict[str, str] = {}
+    for values in lists:
+        for theme in merge_lists([values], None):
+            counts[_key(theme)] = counts.get(_key(theme), 0) + 1
+            names.setdefault(_key(theme), theme)
+    # sorted() is stable, so ties keep first-mention order
+    return [names[key] for key in sorted(counts, key=lambda key: -counts[key])][:limit]
+
+def _number(value: Any, low: float, high: float) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and low <= value <= high:
+        return float(value)
+    return None
+
+def _text_list(value: Any) -> Optional[List[str]]:
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return value
+    return None
+
+def _text(value: Any) -> Optional[str]:
+    return value if isinstance(value, str) and value.strip() else None
+
+def _weighted_mean(values: List[Any], weights: List[int]) -> Optional[float]:
+    pairs = [(float(value), weight) for value, weight in zip(values, weights)
+             if isinstance(value, (int, float)) and not isinstance(value, bool)]
+    total = sum(weight for _, weight in pairs)
+    return sum(value * weight for value, weight in pairs) / total if total else None
+
+def merge_sentiment_partials(partials: List[Dict[str, Any]], weights: List[int],
+                             reconciled: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Combine per-chunk sentiment analyses into one result
+
+    The score is the length-weighted mean of the chunk scores; chunks that
+    lean clearly positive and clearly negative make the whole "mixed";
+    attrition risk is the highest any chunk found. Valid fields from the
+    model's merge answer replace the score, themes and summary.
+
+    Args:
+        partials (List[Dict[str, Any]]): Sentiment analysis per chunk
+        weights (List[int]): Token count per chunk
+        reconciled (Optional[Dict[str, Any]]): Merge prompt answer, if any
+
+    Returns:
+        Dict[str, Any]: Merged result
+    """
+    reconciled = reconciled or {}
+    score = _number(reconciled.get('sentiment_score'), -1.0, 1.0)
+    if score is None:
+        score = _weighted_mean([partial.get('sentiment_score') for partial in partials], weights)
+    score = round(score, 2) if score is not None else 0.0
+    labels = {str(partial.get('primary_sentiment', '')).lower() for partial in partials}
+    if {'positive', 'negative'} <= labels or 'mixed' in labels:
+        primary = 'mixed'
+    elif score >= 0.25:
+        primary = 'positive'
+    elif score <= -0.25:
+        primary = 'negative'
+    else:
+        primary = 'neutral'
+
+    risks = [partial.get('attrition_risk') for partial in partials]
+    risks = [risk for risk in risks if isinstance(risk, dict) and str(risk.get('level', '')).lower() in RISK_ORDER]
+    risk = max(risks, key=lambda risk: RISK_ORDER[str(risk['level']).lower()], default=None)
+
+    return {
+        'sentiment_score': score,
+        'primary_sentiment': primary,
+        'key_themes': (_text_list(reconciled.get('key_themes'))
+                       or merge_themes([partial.get('key_themes') for partial in partials])),
+        'positive_aspects': merge_lists([partial.get('positive_aspects') for partial in partials]),
+        'concerns': merge_lists([partial.get('concerns') for partial in partials]),
+        'attrition_risk': ({'level': str(risk['level']).lower(), 'reasoning': risk.get('reasoning', '')}
+                           if risk else {'level': 'unknown', 'reasoning': 'Not assessed'}),
+        'engagement_recommendations': merge_lists([partial.get('engagement_recommendations') for partial in partials], 6),
+        'summary': (_text(reconciled.get('summary'))
+                    or ' '.join(str(partial['summary']) for partial in partials if partial.get('summary'))),
+    }
+
+def merge_resume_partials(partials: List[Dict[str, Any]], reconciled: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Combine per-chunk resume analyses into one result
+
+    Skills are unioned, and a required skill is missing only if no chunk
+    matched it. Without a model merge answer the match score is the best
+    chunk score, since the chunk holding the relevant experience sees the
+    strongest fit, and the summaries join the chunk summaries.
+
+    Args:
+        partials (List[Dict[str, Any]]): Resume analysis per chunk
+        reconciled (Optional[Dict[str, Any]]): Merge prompt answer, if any
+
+    Returns:
+        Dict[str, Any]: Merged result
+    """
+    reconciled = reconciled or {}
+    matching = merge_lists([partial.get('matching_skills') for partial in partials], None)
+    matched = {_key(skill) for skill in matching}
+    missing = [skill for skill in merge_lists([partial.get('missing_skills') for partial in partials], None)
+               if _key(skill) not in matched]
+    scores = [partial.get('match_score') for partial in partials]
+    scores = [float(score) for score in scores if isinstance(score, (int, float)) and not isinstance(score, bool)]
+
+    match_score = _number(reconciled.get('match_score'), 0, 100)
+    if match_score is None:
+        match_score = max(scores, default=0)
+
+    def joined(field: str) -> str:
+        return _text(reconciled.get(field)) or ' '.join(merge_lists([[partial.get(field)] for partial in partials], None))
+
+    def listed(field: str) -> List[str]:
+        return _text_list(reconciled.get(field)) or merge_lists([partial.get(field) for partial in partials], 6)
+
+    return {
+        'extracted_skills': merge_lists([partial.get('extracted_skills') for partial in partials], None),
+        'matching_skills': matching,
+        'missing_skills': missing,
+        'experience_summary': joined('experience_summary'),
+        'education_summary': joined('education_summary'),
+        'match_score': round(match_score),
+        'strengths': listed('strengths'),
+        'weaknesses': listed('weaknesses'),
+        'overall_assessment': joined('overall_assessment'),
+    }
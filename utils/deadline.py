@@ -0,0 +1,49 @@
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('deadline', default=None)
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when a request's latency budget runs out before the work finished
+    """
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Give the enclosed work a latency budget
+
+    Nested budgets never extend an outer one. A budget of None or <= 0
+    leaves the current deadline unchanged.
+
+        with deadline(20):
+            result = analyze_resume_with_gemini(...)
+
+    Args:
+        seconds (Optional[float]): Budget in seconds
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    current = _deadline.get()
+    target = time.monotonic() + seconds
+    token = _deadline.set(target if current is None else min(current, target))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def current_deadline() -> Optional[float]:
+    """
+    Return the active deadline as a time.monotonic() timestamp, or None
+    """
+    return _deadline.get()
+
+def remaining() -> Optional[float]:
+    """
+    Return the seconds left before the active deadline, or None without one
+    """
+    target = _deadline.get()
+    return None if target is None else target - time.monotonic()
@@ -0,0 +1,65 @@
+import logging
+from typing import Dict, Any
+
+from utils.skills import find_skills
+from utils.local_sentiment import local_sentiment_result
+
+logger = logging.getLogger(__name__)
+
+def degraded_resume_result(resume_text: str, job_description: str, reason: str) -> Dict[str, Any]:
+    """
+    Build a provisional resume analysis locally, without calling Gemini
+
+    The match score is the share of taxonomy skills from the job description
+    that the resume mentions. The result is flagged with "degraded" so the
+    UI can label it and it is never cached.
+
+    Args:
+        resume_text (str): Extracted text from resume
+        job_description (str): Job description text
+        reason (str): Why the full analysis is unavailable
+
+    Returns:
+        Dict[str, Any]: Result with the same keys as the Gemini analysis
+    """
+    resume_skills = find_skills(resume_text)
+    required_skills = find_skills(job_description)
+    resume_set = set(resume_skills)
+    matching = [skill for skill in required_skills if skill in resume_set]
+    missing = [skill for skill in required_skills if skill not in resume_set]
+    match_score = round(100 * len(matching) / len(required_skills)) if required_skills else 0
+
+    return {
+        'extracted_skills': resume_skills,
+        'matching_skills': matching,
+        'missing_skills': missing,
+        'experience_summary': 'Not available in the provisional analysis',
+        'education_summary': 'Not available in the provisional analysis',
+        'match_score': match_score,
+        'strengths': [f"Covers {len(matching)} of {len(required_skills)} skills named in the job description"] if required_skills else [],
+        'weaknesses': [f"Missing {', '.join(missing)}"] if missing else [],
+        'overall_assessment': ('The AI analysis did not finish in time. This provisional score only reflects '
+                               'skill keyword overlap with the job description; please re-run the analysis.'),
+        'degraded': True,
+        'degraded_reason': reason,
+    }
+
+def degraded_sentiment_result(feedback_text: str, reason: str) -> Dict[str, Any]:
+    """
+    Build a provisional sentiment result with the local lexicon scorer, without calling Gemini
+
+    Args:
+        feedback_text (str): Employee feedback text
+        reason (str): Why the full analysis is unavailable
+
+    Returns:
+        Dict[str, Any]: Result with the same keys as the Gemini analysis
+    """
+    result = local_sentiment_result(feedback_text)
+    result.pop('provisional', None)
+    return {
+        **result,
+        'summary': f"The AI analysis is unavailable; please re-run the analysis. {result['summary']}",
+        'degraded': True,
+        'degraded_reason': reason,
+    }
@@ -1,96 +1,531 @@
+import os
 import json
+import math
+import time
+import random
+import asyncio
 import logging
-import requests
-from typing import Dict, Any, List
-from google import genai
+import weakref
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import TYPE_CHECKING, Dict, Any, List, Iterator, Optional, Tuple
+# google.genai takes ~0.7s to import, so it is loaded on first use (or preloaded
+# in the gunicorn master, see gunicorn_config.py) instead of at app import
+if TYPE_CHECKING:
+    from google import genai
+    from google.genai import types
+from utils.result_cache import get_result_cache, make_cache_key, key_from_digests, content_digest
+from utils.near_duplicates import get_near_duplicate_index, NEAR_DUP_REUSE_THRESHOLD
+from utils.skills import reconcile_skill_lists
+from utils.json_stream import JSONFieldStream, parse_json_response
+from utils.metrics import registry, stage, record_stage, record_token_usage
+from utils.deadline import DeadlineExceeded, current_deadline, remaining
+from utils.fallback import degraded_resume_result, degraded_sentiment_result
+from utils.chunking import (
+    CHUNK_MODEL_MERGE, needs_chunking, split_resume, split_feedback, map_chunks,
+    merge_resume_partials, merge_sentiment_partials
+)
+from utils.prompts import (
+    RESUME_PROMPT_VERSION, SENTIMENT_PROMPT_VERSION, BULK_SENTIMENT_PROMPT_VERSION, CHUNK_PROMPT_VERSION,
+    RESUME_TOKEN_BUDGET, FEEDBACK_TOKEN_BUDGET, estimate_tokens,
+    build_resume_prompt, build_sentiment_prompt, build_bulk_sentiment_prompt,
+    build_resume_chunk_prompt, build_sentiment_chunk_prompt, build_resume_merge_prompt, build_sentiment_merge_prompt
+)
 
 logger = logging.getLogger(__name__)
 
-def call_gemini_api(prompt: str, api_key: str) -> Dict[str, Any]:
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")
+
+# Optional override so the client can be pointed at a local stub server
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL")
+GEMINI_TIMEOUT_MS = int(os.environ.get("GEMINI_TIMEOUT_MS", "60000"))
+GEMINI_MAX_RETRIES = int(os.environ.get("GEMINI_MAX_RETRIES", "3"))
+GEMINI_BACKOFF_BASE = float(os.environ.get("GEMINI_BACKOFF_BASE", "0.5"))
+GEMINI_BACKOFF_MAX = float(os.environ.get("GEMINI_BACKOFF_MAX", "8"))
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Hedging: once a call outlives this percentile of recent latencies, a
+# duplicate request is sent and the first answer wins
+GEMINI_HEDGING = os.environ.get("GEMINI_HEDGING", "1") != "0"
+GEMINI_HEDGE_PERCENTILE = float(os.environ.get("GEMINI_HEDGE_PERCENTILE", "0.95"))
+GEMINI_HEDGE_DEFAULT_DELAY = float(os.environ.get("GEMINI_HEDGE_DEFAULT_DELAY", "8"))
+GEMINI_HEDGE_MIN_DELAY = float(os.environ.get("GEMINI_HEDGE_MIN_DELAY", "1"))
+GEMINI_HEDGE_MIN_SAMPLES = 20
+GEMINI_HEDGE_WORKERS = int(os.environ.get("GEMINI_HEDGE_WORKERS", "32"))
+
+_clients: Dict[str, 'genai.Client'] = {}
+_clients_lock = threading.Lock()
+# The SDK's async transport is bound to the event loop that first used it, so clients are kept per loop
+_async_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, genai.Client]]' = weakref.WeakKeyDictionary()
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+# Free hedge pool workers; attempts only go to the pool when one is free
+_pool_slots = threading.BoundedSemaphore(GEMINI_HEDGE_WORKERS)
+_latencies: deque = deque(maxlen=500)
+_latencies_lock = threading.Lock()
+
+def get_gemini_client(api_key: str) -> 'genai.Client':
+    """
+    Return the process-wide Gemini client for an API key, creating it on first use
+
+    Clients own their HTTP connection pools, so sharing one per key keeps
+    connections and TLS sessions alive across requests.
+
+    Args:
+        api_key (str): Gemini API key
+
+    Returns:
+        genai.Client: Shared client instance
+    """
+    client = _clients.get(api_key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(api_key)
+            if client is None:
+                client = _new_client(api_key)
+                _clients[api_key] = client
+    return client
+
+def _new_client(api_key: str) -> 'genai.Client':
+    from google import genai
+    from google.genai import types
+    http_options = types.HttpOptions(timeout=GEMINI_TIMEOUT_MS)
+    if GEMINI_BASE_URL:
+        http_options.base_url = GEMINI_BASE_URL
+    return genai.Client(api_key=api_key, http_options=http_options)
+
+def _get_async_client(api_key: str) -> 'genai.Client':
+    # One client per running event loop, so consecutive asyncio.run() calls never reuse a closed loop's transport
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(api_key)
+        if client is None:
+            client = clients[api_key] = _new_client(api_key)
+    return client
+
+def _is_retryable(error: Exception) -> bool:
+    import httpx
+    from google.genai import errors
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+def _backoff_delay(attempt: int) -> float:
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(GEMINI_BACKOFF_MAX, GEMINI_BACKOFF_BASE * (2 ** attempt)))
+
+def _attempt_config(deadline_at: Optional[float]) -> Optional['types.GenerateContentConfig']:
+    # Bound the HTTP timeout by the deadline, so an attempt nobody waits for any more ends with it
+    if deadline_at is None:
+        return None
+    from google.genai import types
+    timeout_ms = max(1, math.ceil((deadline_at - time.monotonic()) * 1000))
+    return types.GenerateContentConfig(http_options=types.HttpOptions(timeout=min(timeout_ms, GEMINI_TIMEOUT_MS)))
+
+def _generate_with_retries(client: 'genai.Client', prompt: str, deadline_at: Optional[float],
+                           settled: Optional[threading.Event] = None) -> 'types.GenerateContentResponse':
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        try:
+            started = time.perf_counter()
+            response = client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt,
+                config=_attempt_config(deadline_at)
+            )
+            elapsed = time.perf_counter() - started
+            registry.histogram('tatviq_gemini_attempt_seconds').observe(elapsed)
+            with _latencies_lock:
+                _latencies.append(elapsed)
+            record_token_usage(response, 'generate')
+            return response
+        except Exception as e:
+            if attempt < GEMINI_MAX_RETRIES and _is_retryable(e):
+                delay = _backoff_delay(attempt)
+                # Backing off past the deadline would only delay the fallback
+                if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+                    raise
+                logger.warning(f"Gemini API call failed ({str(e)}), retrying in {delay:.2f}s")
+                if settled is None:
+                    time.sleep(delay)
+                elif settled.wait(delay):
+                    # The other attempt of a hedged pair already answered, nobody is waiting for this one
+                    raise
+                continue
+            raise
+
+def _submit(pool: ThreadPoolExecutor, *args) -> Optional[Future]:
+    # Never queue behind other calls: when every worker is busy the caller runs the attempt itself
+    if not _pool_slots.acquire(blocking=False):
+        return None
+    try:
+        future = pool.submit(_generate_with_retries, *args)
+    except BaseException:
+        _pool_slots.release()
+        raise
+    future.add_done_callback(lambda _: _pool_slots.release())
+    return future
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _clients_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=GEMINI_HEDGE_WORKERS, thread_name_prefix='gemini')
+    return _hedge_pool
+
+def hedge_delay() -> float:
+    """
+    Return how long to wait on a call before sending a hedged duplicate
+
+    The delay tracks the GEMINI_HEDGE_PERCENTILE of recent attempt
+    latencies, so only the slowest few percent of calls are duplicated.
+
+    Returns:
+        float: Delay in seconds
+    """
+    with _latencies_lock:
+        samples = sorted(_latencies)
+    if len(samples) < GEMINI_HEDGE_MIN_SAMPLES:
+        return GEMINI_HEDGE_DEFAULT_DELAY
+    return max(GEMINI_HEDGE_MIN_DELAY, samples[min(len(samples) - 1, int(GEMINI_HEDGE_PERCENTILE * len(samples)))])
+
+def _deadline_exceeded() -> DeadlineExceeded:
+    registry.inc('tatviq_gemini_deadline_exceeded_total')
+    logger.warning("Gemini API call abandoned, deadline exceeded")
+    return DeadlineExceeded("Gemini did not respond within the latency budget")
+
+def call_gemini_api(prompt: str, api_key: str) -> 'types.GenerateContentResponse':
+    """
+    Make a request to the Google Gemini API, retrying on 429/5xx and transport errors
+    
+    When the call outlives the hedge delay a duplicate request is sent and
+    whichever answers first wins; the loser stops retrying and its HTTP
+    timeout ends at the deadline. Calls only use the hedge pool while it has
+    free workers, otherwise they run on the calling thread without a hedge.
+    The active deadline (see utils.deadline) bounds the whole call,
+    including retries.
+    
+    Args:
+        prompt (str): The prompt text to send to the API
+        api_key (str): Gemini API key
+        
+    Returns:
+        types.GenerateContentResponse: Response from the API
+        
+    Raises:
+        DeadlineExceeded: If the deadline passes before any attempt succeeds
     """
-    Make a request to the Google Gemini API
+    logger.info(f"Processing prompt: {prompt[:50]}...")
+    client = get_gemini_client(api_key)
+    deadline_at = current_deadline()
+    registry.inc('tatviq_gemini_calls_total')
+    
+    with stage('gemini_call'):
+        pool = _get_hedge_pool() if GEMINI_HEDGING else None
+        settled = threading.Event()
+        primary = _submit(pool, client, prompt, deadline_at, settled) if pool is not None else None
+        if primary is None:
+            try:
+                return _generate_with_retries(client, prompt, deadline_at)
+            except Exception as e:
+                if deadline_at is not None and time.monotonic() >= deadline_at:
+                    raise _deadline_exceeded()
+                logger.error(f"API request error: {str(e)}")
+                raise Exception(f"Failed to call Gemini API: {str(e)}")
+        
+        futures = {primary: 'primary'}
+        hedge_at = time.monotonic() + hedge_delay()
+        failures = []
+        try:
+            while futures:
+                now = time.monotonic()
+                timeouts = [t - now for t in (deadline_at, hedge_at) if t is not None]
+                done, _ = wait(futures, timeout=max(0, min(timeouts)) if timeouts else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    role = futures.pop(future)
+                    try:
+                        response = future.result()
+                    except Exception as e:
+                        failures.append(e)
+                        continue
+                    if role == 'hedge':
+                        registry.inc('tatviq_gemini_hedge_wins_total')
+                    return response
+                
+                now = time.monotonic()
+                if futures and deadline_at is not None and now >= deadline_at:
+                    raise _deadline_exceeded()
+                if futures and hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    hedge = _submit(pool, client, prompt, deadline_at, settled)
+                    if hedge is None:
+                        registry.inc('tatviq_gemini_hedges_skipped_total')
+                        logger.info("Gemini API call is slow, but the hedge pool is saturated")
+                        continue
+                    registry.inc('tatviq_gemini_hedges_total')
+                    logger.info("Gemini API call is slow, sending a hedged request")
+                    futures[hedge] = 'hedge'
+        finally:
+            settled.set()
+        
+        logger.error(f"API request error: {str(failures[0])}")
+        raise Exception(f"Failed to call Gemini API: {str(failures[0])}")
+
+async def call_gemini_api_async(prompt: str, api_key: str) -> 'types.GenerateContentResponse':
+    """
+    Asyncio variant of call_gemini_api built on the SDK's aio client
     
     Args:
         prompt (str): The prompt text to send to the API
         api_key (str): Gemini API key
         
     Returns:
-        Dict[str, Any]: JSON response from the API
+        types.GenerateContentResponse: Response from the API
     """
+    logger.info(f"Processing prompt: {prompt[:50]}...")
+    client = _get_async_client(api_key)
+    
+    budget = remaining()
+    
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        try:
+            with stage('gemini_call'):
+                response = await asyncio.wait_for(client.aio.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=prompt
+                ), timeout=remaining() if budget is not None else None)
+            record_token_usage(response, 'generate')
+            return response
+        except asyncio.TimeoutError:
+            registry.inc('tatviq_gemini_deadline_exceeded_total')
+            raise DeadlineExceeded("Gemini did not respond within the latency budget")
+        except Exception as e:
+            if attempt < GEMINI_MAX_RETRIES and _is_retryable(e):
+                delay = _backoff_delay(attempt)
+                logger.warning(f"Gemini API call failed ({str(e)}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            logger.error(f"API request error: {str(e)}")
+            raise Exception(f"Failed to call Gemini API: {str(e)}")
+
+def call_gemini_api_stream(prompt: str, api_key: str) -> Iterator[str]:
+    """
+    Stream a Gemini response as text chunks
+    
+    Retries like call_gemini_api, but only until the first chunk has been
+    received; a stream that breaks halfway is reported as an error.
+    
+    Args:
+        prompt (str): The prompt text to send to the API
+        api_key (str): Gemini API key
+        
+    Yields:
+        str: Response text chunks
+    """
+    logger.info(f"Processing prompt (streaming): {prompt[:50]}...")
+    client = get_gemini_client(api_key)
+    
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        received = False
+        started = time.perf_counter()
+        try:
+            last_chunk = None
+            for chunk in client.models.generate_content_stream(
+                model=GEMINI_MODEL,
+                contents=prompt
+            ):
+                last_chunk = chunk
+                if chunk.text:
+                    if not received:
+                        record_stage('gemini_first_chunk', time.perf_counter() - started)
+                    received = True
+                    yield chunk.text
+            record_stage('gemini_stream', time.perf_counter() - started)
+            # Usage metadata arrives with the final chunk
+            record_token_usage(last_chunk, 'stream')
+            return
+        except Exception as e:
+            if not received and attempt < GEMINI_MAX_RETRIES and _is_retryable(e):
+                delay = _backoff_delay(attempt)
+                logger.warning(f"Gemini API stream failed ({str(e)}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            logger.error(f"API stream error: {str(e)}")
+            raise Exception(f"Failed to call Gemini API: {str(e)}")
+
+def _prompt_version(version: str, chunked: bool) -> str:
+    # Chunked analyses come from different prompts, so they are cached apart
+    return f"{version}+{CHUNK_PROMPT_VERSION}" if chunked else version
+
+def _analyze_prompt(prompt: str, api_key: str) -> Dict[str, Any]:
+    response = call_gemini_api(prompt, api_key)
+    return parse_json_response(response.text)
+
+def _map_prompts(prompts: List[str], api_key: str) -> List[Optional[Dict[str, Any]]]:
+    # Analyze chunk prompts in parallel; failed chunks are None unless every chunk failed
+    with stage('chunk_map'):
+        outcomes = map_chunks(lambda prompt: _analyze_prompt(prompt, api_key), prompts)
+    errors = [error for _, error in outcomes if error is not None]
+    if len(errors) == len(outcomes):
+        raise errors[0]
+    if errors:
+        logger.warning(f"{len(errors)} of {len(outcomes)} chunks failed, merging the rest: {str(errors[0])}")
+    return [result for result, _ in outcomes]
+
+def _reconcile(prompt: str, api_key: str) -> Optional[Dict[str, Any]]:
+    # The model merge is an improvement, not a requirement: on any failure the local merge stands
+    if not CHUNK_MODEL_MERGE:
+        return None
     try:
-        # Due to API limitations, we're providing mock responses for demonstration
-        logger.info(f"Processing prompt: {prompt[:50]}...")
+        with stage('chunk_merge'):
+            return _analyze_prompt(prompt, api_key)
+    except Exception as e:
+        logger.warning(f"Chunk merge call failed, using the local merge: {str(e)}")
+        return None
+
+SKILL_FIELDS = ('extracted_skills', 'matching_skills', 'missing_skills')
+# Top-level keys every complete analysis has; a result missing one was cut off
+RESUME_FIELDS = (*SKILL_FIELDS, 'experience_summary', 'education_summary', 'match_score',
+                 'strengths', 'weaknesses', 'overall_assessment')
+# Free-text fields written about one resume, never carried over to a near-duplicate
+REUSED_WITHHELD_FIELDS = ('experience_summary', 'education_summary', 'strengths', 'weaknesses', 'overall_assessment')
+SENTIMENT_FIELDS = ('sentiment_score', 'primary_sentiment', 'key_themes', 'positive_aspects', 'concerns',
+                    'attrition_risk', 'engagement_recommendations', 'summary')
+
+def _cacheable(result: Dict[str, Any], fields: Tuple[str, ...]) -> bool:
+    # A merge missing failed or dropped chunks, or an answer cut off mid-object, is served once, not for the cache TTL
+    if result.get('truncated') or (result.get('chunks') or {}).get('failed'):
+        return False
+    return all(field in result for field in fields)
+
+def _analyze_resume_chunks(resume_text: str, job_description: str, api_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Analyze a long resume as parallel per-part analyses plus one small merge call
+    
+    Args:
+        resume_text (str): Extracted text from resume
+        job_description (str): Job description text
+        api_key (str): Gemini API key
         
-        client = genai.Client(api_key=api_key)
-        response = client.models.generate_content (
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
-
-        return response
-        # Create a structured mock response based on the prompt context
-        if "resume" in prompt.lower():
-            return {
-                "candidates": [
-                    {
-                        "output": """
-                        {
-                          "extracted_skills": ["Python", "JavaScript", "React", "Flask", "SQL", "AWS", "Git"],
-                          "matching_skills": ["Python", "JavaScript", "React", "SQL"],
-                          "missing_skills": ["Docker", "CI/CD", "Agile"],
-                          "experience_summary": "3 years of software development experience with focus on web applications",
-                          "education_summary": "Bachelor's degree in Computer Science",
-                          "match_score": 78,
-                          "strengths": ["Strong frontend skills", "Good database knowledge", "Problem-solving abilities"],
-                          "weaknesses": ["Limited DevOps experience", "No cloud certification", "Needs more team leadership experience"],
-                          "overall_assessment": "Good candidate with solid technical skills matching most requirements. Some gaps in DevOps and cloud experience that may require training."
-                        }
-                        """
-                    }
-                ]
-            }
-        elif "feedback" in prompt.lower() or "sentiment" in prompt.lower():
-            return {
-                "candidates": [
-                    {
-                        "output": """
-                        {
-                          "sentiment_score": 0.25,
-                          "primary_sentiment": "Mixed",
-                          "key_themes": ["Work-life balance", "Team collaboration", "Career growth", "Compensation"],
-                          "positive_aspects": ["Supportive team environment", "Interesting projects", "Learning opportunities"],
-                          "concerns": ["High workload", "Limited advancement opportunities", "Communication issues with management"],
-                          "attrition_risk": {
-                            "level": "medium",
-                            "reasoning": "Employee shows signs of dissatisfaction with growth opportunities and workload, but appreciates team and projects"
-                          },
-                          "engagement_recommendations": ["Address work-life balance concerns", "Provide clearer career path", "Improve management communication", "Consider compensation review"],
-                          "summary": "Employee shows mixed satisfaction levels with positive feelings toward team and work content but concerns about workload and advancement."
-                        }
-                        """
-                    }
-                ]
-            }
-        else:
+    Returns:
+        Optional[Dict[str, Any]]: Merged analysis, or None if the resume fits in one prompt after cleaning
+    """
+    with stage('prompt_build'):
+        chunks, dropped = split_resume(resume_text, RESUME_TOKEN_BUDGET)
+        if len(chunks) < 2:
+            return None
+        prompts = [build_resume_chunk_prompt(chunk, job_description, part, len(chunks))
+                   for part, chunk in enumerate(chunks, start=1)]
+    
+    logger.info(f"Resume analysis split into {len(chunks)} chunks")
+    answers = _map_prompts(prompts, api_key)
+    partials = [answer for answer in answers if answer is not None]
+    reconciled = _reconcile(build_resume_merge_prompt(job_description, [
+        {key: value for key, value in partial.items() if key not in SKILL_FIELDS} for partial in partials
+    ]), api_key)
+    result = merge_resume_partials(partials, reconciled)
+    result['chunks'] = {'count': len(chunks), 'failed': len(answers) - len(partials), 'dropped': dropped}
+    if dropped:
+        result['truncated'] = True
+    return result
+
+def _analyze_sentiment_chunks(feedback_text: str, api_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Analyze long feedback as parallel per-part analyses plus one small merge call
+    
+    Args:
+        feedback_text (str): Employee feedback text
+        api_key (str): Gemini API key
+        
+    Returns:
+        Optional[Dict[str, Any]]: Merged analysis, or None if the feedback fits in one prompt after cleaning
+    """
+    with stage('prompt_build'):
+        chunks, dropped = split_feedback(feedback_text, FEEDBACK_TOKEN_BUDGET)
+        if len(chunks) < 2:
+            return None
+        prompts = [build_sentiment_chunk_prompt(chunk, part, len(chunks)) for part, chunk in enumerate(chunks, start=1)]
+    
+    logger.info(f"Sentiment analysis split into {len(chunks)} chunks")
+    answers = _map_prompts(prompts, api_key)
+    partials, weights = [], []
+    for chunk, answer in zip(chunks, answers):
+        if answer is not None:
+            partials.append(answer)
+            weights.append(estimate_tokens(chunk))
+    reconciled = _reconcile(build_sentiment_merge_prompt([
+        {'tokens': weight, **{key: partial.get(key) for key in
+                              ('sentiment_score', 'primary_sentiment', 'key_themes', 'attrition_risk', 'summary')}}
+        for partial, weight in zip(partials, weights)
+    ]), api_key)
+    result = merge_sentiment_partials(partials, weights, reconciled)
+    result['chunks'] = {'count': len(chunks), 'failed': len(answers) - len(partials), 'dropped': dropped}
+    if dropped:
+        result['truncated'] = True
+    return result
+
+def _reuse_near_duplicate(resume_text: str, job_description: str, cache,
+                          version: str = RESUME_PROMPT_VERSION) -> Optional[Dict[str, Any]]:
+    """
+    Return an earlier analysis of a near-identical resume against the same job description
+    
+    Earlier analyses are addressed by the near-duplicate's content digest, so
+    nothing but the index and the result cache is consulted. Only the score
+    and skill lists are reused; the written fields are withheld, and the
+    result is not cached so it is never reused in turn.
+    
+    Args:
+        resume_text (str): Extracted text from resume
+        job_description (str): Job description text
+        cache: Result cache holding the earlier analyses
+        version (str): Prompt version the earlier analyses were cached under
+        
+    Returns:
+        Optional[Dict[str, Any]]: The reused analysis, or None
+    """
+    index = get_near_duplicate_index()
+    if index is None or cache is None:
+        return None
+    try:
+        with stage('near_duplicate_lookup'):
+            matches = index.find(resume_text, NEAR_DUP_REUSE_THRESHOLD)
+    except Exception as e:
+        logger.warning(f"Near-duplicate lookup failed: {str(e)}")
+        return None
+    
+    jd_digest = content_digest(job_description)
+    for match in matches:
+        cached = cache.get(key_from_digests("resume", GEMINI_MODEL, version, [match['digest'], jd_digest]))
+        if cached is not None:
+            registry.inc('tatviq_near_duplicate_reuses_total')
+            logger.info(f"Resume analysis reused from a near-duplicate ({match['similarity']})")
+            # The written fields describe the other upload and may name its candidate, so only the score and
+            # skill lists carry over, and the other upload's filename is not disclosed
             return {
-                "candidates": [
-                    {
-                        "output": "Could not parse the request type. Please specify either resume analysis or sentiment analysis."
-                    }
-                ]
+                **{key: value for key, value in cached.items() if key not in REUSED_WITHHELD_FIELDS},
+                'experience_summary': 'Not available in an analysis reused from a near-identical resume',
+                'education_summary': 'Not available in an analysis reused from a near-identical resume',
+                'strengths': [],
+                'weaknesses': [],
+                'overall_assessment': ('This score was reused from an earlier analysis of a near-identical resume '
+                                       'against the same job description, so no written assessment was generated.'),
+                'reused_from': {'similarity': match['similarity']},
             }
-        
-    except requests.exceptions.RequestException as e:
-        logger.error(f"API request error: {str(e)}")
-        raise Exception(f"Failed to call Gemini API: {str(e)}")
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON decode error: {str(e)}")
-        raise Exception(f"Failed to parse API response: {str(e)}")
+    return None
 
 def analyze_resume_with_gemini(resume_text: str, job_description: str, api_key: str) -> Dict[str, Any]:
     """
     Analyze resume text against job description using Gemini API
     
+    The extracted/matching/missing skill lists are reconciled against the
+    skill taxonomy, see utils.skills.reconcile_skill_lists. A near-identical
+    resume already analyzed against the same job description is reused
+    instead of calling Gemini. Resumes over the prompt token budget are
+    analyzed in parallel chunks and merged, see utils.chunking. If the
+    active deadline runs out, a provisional local result flagged "degraded"
+    is returned instead of an error.
+    
     Args:
         resume_text (str): Extracted text from resume
         job_description (str): Job description text
@@ -100,102 +535,40 @@ def analyze_resume_with_gemini(resume_text: str, job_description: str, api_key:
         Dict[str, Any]: Structured analysis result
     """
     try:
-        prompt = f"""
-        You are an expert HR recruiter specializing in tech roles with 15+ years of experience in technical hiring. Analyze the resume below for a Software Engineer position with precision and depth.
-
-        JOB DESCRIPTION:
-        {job_description}
-
-        RESUME:
-        {resume_text}
-
-        Few-shot examples to guide your analysis:
-
-        Example 1:
-        For a resume with extensive Java experience but missing cloud skills:
-        ```json
-        {{
-        "extracted_skills": ["Java", "Spring Boot", "SQL", "Git", "Agile"],
-        "matching_skills": ["Java", "SQL", "Git"],
-        "missing_skills": ["AWS", "Docker", "Kubernetes", "Microservices"],
-        "experience_summary": "5 years of Java development with focus on backend services and monolithic applications",
-        "education_summary": "BS in Computer Science from State University, graduated 2018",
-        "match_score": 65,
-        "strengths": ["Strong Java fundamentals", "Database expertise", "Solid software engineering practices"],
-        "weaknesses": ["No cloud experience", "Limited exposure to microservices architecture", "No CI/CD pipeline experience"],
-        "overall_assessment": "Solid Java developer with good fundamentals but lacking modern cloud-native development experience required for this role. Would need significant upskilling in containerization and cloud services."
-        }}
-        ```
-
-        Example 2:
-        For a resume with strong cloud skills but limited experience:
-        ```json
-        {{
-        "extracted_skills": ["Python", "AWS Lambda", "DynamoDB", "Docker", "Kubernetes", "CI/CD", "React"],
-        "matching_skills": ["AWS", "Python", "Docker", "CI/CD"],
-        "missing_skills": ["Java", "5+ years experience"],
-        "experience_summary": "2 years of experience building serverless applications on AWS",
-        "education_summary": "MS in Computer Engineering from Tech Institute, graduated 2022",
-        "match_score": 75,
-        "strengths": ["Strong cloud-native development skills", "Full-stack capabilities", "Modern tech stack"],
-        "weaknesses": ["Less experience than required", "Missing primary language (Java) for the role"],
-        "overall_assessment": "Promising candidate with excellent cloud skills but less experience than required. Strong technical foundation makes them a good investment despite the experience gap."
-        }}
-        ```
-
-        Provide a JSON response with the following structure:
-        1. extracted_skills (array): List of all technical skills found in the resume (languages, frameworks, tools, platforms)
-        2. matching_skills (array): Skills from the resume that directly match requirements in the job description
-        3. missing_skills (array): Important skills mentioned in the job description but missing from the resume
-        4. experience_summary (string): Brief summary of the candidate's relevant experience (years, roles, achievements)
-        5. education_summary (string): Brief summary of the candidate's education (degrees, institutions, relevant certifications)
-        6. match_score (number): A score from 0-100 indicating how well the resume matches the job description (consider skills, experience level, and role alignment)
-        7. strengths (array): Key strengths of the candidate relevant to this specific role
-        8. weaknesses (array): Areas where the candidate may need improvement or doesn't meet requirements
-        9. overall_assessment (string): A concise overall assessment of the candidate's fit for the role (2-3 sentences)
-
-        IMPORTANT ANALYSIS GUIDELINES:
-        1. Be thorough in skill extraction, including both explicitly stated and implied skills
-        2. Consider both technical and soft skills in your evaluation
-        3. When calculating match score, weight critical requirements higher than nice-to-have skills
-        4. For experience with technologies, consider both years of experience and depth of usage
-        5. Identify transferable skills that might compensate for missing requirements
-        6. Consider career progression and growth trajectory in your assessment
-        7. Be objective and avoid bias based on company names or educational institutions
-        8. Dont use "The candidate" use his/her name.
-
-        Format your response as a valid JSON object with these keys.
-        """
+        cache = get_result_cache()
+        chunked = needs_chunking(resume_text, RESUME_TOKEN_BUDGET)
+        version = _prompt_version(RESUME_PROMPT_VERSION, chunked)
+        cache_key = make_cache_key("resume", GEMINI_MODEL, version, resume_text, job_description)
+        if cache is not None:
+            with stage('cache_lookup'):
+                cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info("Resume analysis served from cache")
+                with stage('skill_reconcile'):
+                    return reconcile_skill_lists(cached, resume_text, job_description)
         
-        response = call_gemini_api(prompt, api_key)
-        print(response.text)
-        result = json.loads(response.text.strip('`').lstrip('json\n'))
-        return result   
-            # Extract the JSON from the response
-            # text_response = response['candidates'][0]['output']
-            
-            # Find JSON content (between curly braces)
-            # json_start = text_response.find('{')
-            # json_end = text_response.rfind('}') + 1
-            
-            # if json_start >= 0 and json_end > json_start:
-            #     json_str = text_response[json_start:json_end]
-            #     return json.loads(json_str)
-            # else:
-            #     # If JSON parsing fails, create a structured response from the text
-            #     logger.warning("Could not extract JSON from API response, creating structured response")
-            #     return {
-            #         "extracted_skills": [],
-            #         "matching_skills": [],
-            #         "missing_skills": [],
-            #         "experience_summary": "Could not extract experience summary",
-            #         "education_summary": "Could not extract education summary",
-            #         "match_score": 0,
-            #         "strengths": [],
-            #         "weaknesses": [],
-            #         "overall_assessment": text_response
-            #     }
+        reused = _reuse_near_duplicate(resume_text, job_description, cache, version)
+        if reused is not None:
+            with stage('skill_reconcile'):
+                return reconcile_skill_lists(reused, resume_text, job_description)
+
+        result = _analyze_resume_chunks(resume_text, job_description, api_key) if chunked else None
+        if result is None:
+            with stage('prompt_build'):
+                prompt = build_resume_prompt(resume_text, job_description)
             
+            response = call_gemini_api(prompt, api_key)
+            with stage('json_parse'):
+                result = parse_json_response(response.text)
+        if cache is not None and _cacheable(result, RESUME_FIELDS):
+            cache.set(cache_key, result)
+        # Skill lists come from the taxonomy matcher so they are stable across runs
+        with stage('skill_reconcile'):
+            return reconcile_skill_lists(result, resume_text, job_description)
+    
+    except DeadlineExceeded as e:
+        logger.warning(f"Resume analysis degraded: {str(e)}")
+        return degraded_resume_result(resume_text, job_description, str(e))
     except Exception as e:
         logger.error(f"Resume analysis error: {str(e)}")
         raise Exception(f"Failed to analyze resume: {str(e)}")
@@ -204,6 +577,11 @@ def analyze_sentiment_with_gemini(feedback_text: str, api_key: str) -> Dict[str,
     """
     Analyze employee feedback for sentiment using Gemini API
     
+    Feedback over the prompt token budget is analyzed in parallel chunks
+    and merged, see utils.chunking. If the deadline runs out or the Gemini
+    call fails, the local lexicon scorer's result is returned instead,
+    flagged "degraded".
+    
     Args:
         feedback_text (str): Employee feedback text
         api_key (str): Gemini API key
@@ -212,139 +590,196 @@ def analyze_sentiment_with_gemini(feedback_text: str, api_key: str) -> Dict[str,
         Dict[str, Any]: Structured sentiment analysis result
     """
     try:
-        prompt = f"""
-        You are an expert HR analyst specializing in employee engagement and retention with 12+ years of experience in workplace analytics. Analyze the following employee feedback text with nuance and psychological insight:
-        
-        EMPLOYEE FEEDBACK:
-        {feedback_text}
+        cache = get_result_cache()
+        chunked = needs_chunking(feedback_text, FEEDBACK_TOKEN_BUDGET)
+        cache_key = make_cache_key("sentiment", GEMINI_MODEL, _prompt_version(SENTIMENT_PROMPT_VERSION, chunked), feedback_text)
+        if cache is not None:
+            with stage('cache_lookup'):
+                cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info("Sentiment analysis served from cache")
+                return cached
+
+        result = _analyze_sentiment_chunks(feedback_text, api_key) if chunked else None
+        if result is None:
+            with stage('prompt_build'):
+                prompt = build_sentiment_prompt(feedback_text)
+            
+            response = call_gemini_api(prompt, api_key)
+
+            with stage('json_parse'):
+                result = parse_json_response(response.text)
+        if cache is not None and _cacheable(result, SENTIMENT_FIELDS):
+            cache.set(cache_key, result)
+        return result
         
-        Few-shot examples to guide your analysis:
-
-        Example 1:
-        For feedback showing mixed sentiment with concerns about workload:
-        ```json
-        {{
-          "sentiment_score": -0.2,
-          "primary_sentiment": "mixed",
-          "key_themes": ["Work-life balance", "Team collaboration", "Career development", "Workload management"],
-          "positive_aspects": ["Supportive team environment", "Learning opportunities", "Interesting projects"],
-          "concerns": ["Excessive overtime expectations", "Understaffing", "Burnout risk", "Unclear promotion criteria"],
-          "attrition_risk": {{
-            "level": "medium",
-            "reasoning": "Despite enjoying team dynamics and learning opportunities, the employee shows signs of burnout and frustration with workload distribution that could lead to departure if not addressed"
-          }},
-          "engagement_recommendations": [
-            "Conduct workload assessment across the team",
-            "Implement clearer boundaries for after-hours work expectations",
-            "Create more transparent promotion pathways",
-            "Consider additional headcount for overloaded functions"
-          ],
-          "summary": "This employee shows appreciation for their colleagues and growth opportunities but is struggling with unsustainable workload demands. Attention to resource allocation and work-life boundaries would likely improve retention prospects significantly."
-        }}
-        ```
-
-        Example 2:
-        For predominantly positive feedback with minor concerns:
-        ```json
-        {{
-          "sentiment_score": 0.7,
-          "primary_sentiment": "positive",
-          "key_themes": ["Leadership", "Company culture", "Recognition", "Innovation"],
-          "positive_aspects": ["Supportive management", "Recognition of contributions", "Collaborative atmosphere", "Meaningful work"],
-          "concerns": ["Limited remote work flexibility", "Communication gaps between departments"],
-          "attrition_risk": {{
-            "level": "low",
-            "reasoning": "Employee expresses strong alignment with company values and appreciation for leadership style, with only minor operational concerns that don't appear to outweigh positive aspects"
-          }},
-          "engagement_recommendations": [
-            "Consider expanding remote work options",
-            "Implement cross-department communication channels",
-            "Continue recognition practices that are working well"
-          ],
-          "summary": "This employee shows high engagement and satisfaction with the company culture and leadership approach. Addressing minor concerns about work flexibility and interdepartmental communication would further strengthen an already positive employment relationship."
-        }}
-        ```
-
-        Example 3:
-        For predominantly negative feedback indicating high attrition risk:
-        ```json
-        {{
-          "sentiment_score": -0.8,
-          "primary_sentiment": "negative",
-          "key_themes": ["Compensation", "Management style", "Respect", "Career stagnation"],
-          "positive_aspects": ["Technical skills developed", "Some helpful colleagues"],
-          "concerns": ["Feeling undervalued", "Below-market compensation", "Micromanagement", "Toxic leadership behaviors", "Lack of growth opportunities"],
-          "attrition_risk": {{
-            "level": "high",
-            "reasoning": "Employee expresses multiple serious concerns affecting daily work experience, uses language suggesting active job searching, and identifies few redeeming factors about current role"
-          }},
-          "engagement_recommendations": [
-            "Urgent compensation review and adjustment if warranted",
-            "Leadership coaching for direct managers",
-            "Create immediate growth plan with clear milestones",
-            "Establish psychological safety in team environment"
-          ],
-          "summary": "This employee is highly disengaged and likely actively seeking other employment. Multiple core issues around respect, compensation, and management approach require immediate intervention for any chance of retention. Even with changes, rebuilding trust may be challenging."
-        }}
-        ```
+    except DeadlineExceeded as e:
+        logger.warning(f"Sentiment analysis degraded: {str(e)}")
+        return degraded_sentiment_result(feedback_text, str(e))
+    except Exception as e:
+        logger.error(f"Sentiment analysis error, falling back to local scoring: {str(e)}")
+        registry.inc('tatviq_sentiment_local_fallbacks_total')
+        return degraded_sentiment_result(feedback_text, f"Failed to analyze sentiment: {str(e)}")
+
+def analyze_sentiment_batch_with_gemini(items: List[Dict[str, str]], api_key: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Analyze several feedback comments in one Gemini request
+    
+    The comments are packed into a single prompt with a compact instruction
+    block and the model answers with a JSON array keyed by item id, so the
+    instructions are paid for once per batch instead of once per comment.
+    Per-item results are cached individually.
+    
+    Args:
+        items (List[Dict[str, str]]): Comments as {"id": ..., "text": ...}
+        api_key (str): Gemini API key
         
-        Provide a JSON response with the following structure:
-        1. sentiment_score (number): Overall sentiment score from -1.0 (very negative) to 1.0 (very positive)
-        2. primary_sentiment (string): The primary sentiment detected (e.g., "positive", "negative", "neutral", "mixed")
-        3. key_themes (array): List of key themes/topics identified in the feedback
-        4. positive_aspects (array): Positive aspects mentioned in the feedback
-        5. concerns (array): Concerns or issues mentioned in the feedback
-        6. attrition_risk (object): 
-           - level (string): Risk level ("low", "medium", "high")
-           - reasoning (string): Brief explanation for the risk assessment
-        7. engagement_recommendations (array): Specific recommendations to improve engagement based on the feedback
-        8. summary (string): Brief summary of the feedback analysis
+    Returns:
+        Dict[str, Dict[str, Any]]: Compact sentiment result per item id; ids the
+            model did not answer are missing from the mapping
+    """
+    try:
+        cache = get_result_cache()
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for item in items:
+            cache_key = make_cache_key("sentiment-bulk", GEMINI_MODEL, BULK_SENTIMENT_PROMPT_VERSION, item['text'])
+            cached = cache.get(cache_key) if cache is not None else None
+            if cached is not None:
+                results[item['id']] = {**cached, 'id': item['id']}
+            else:
+                pending.append((item, cache_key))
+        if not pending:
+            return results
         
-        IMPORTANT ANALYSIS GUIDELINES:
-        1. Look beyond surface sentiment to identify underlying emotional patterns and concerns
-        2. Pay special attention to language indicating intention to leave (e.g., "not worth it anymore," "looking for other options")
-        3. Consider the intensity and repetition of concerns as indicators of their importance
-        4. Balance positive and negative elements when determining overall sentiment score
-        5. Make recommendations that are specific and actionable rather than generic
-        6. Identify subtle indicators of disengagement that might not be explicitly stated
-        7. Consider how long-standing issues versus recent changes might impact retention differently
-        8. Look for mentions of competitors or industry standards as benchmarking references
-        9. Note any conditional language ("if this doesn't change...") as potential retention leverage points
-
-        Format your response as a valid JSON object with these keys.
-        """
+        with stage('prompt_build'):
+            prompt = build_bulk_sentiment_prompt([item for item, _ in pending])
         
         response = call_gemini_api(prompt, api_key)
+        text = response.text
+        start, end = text.find('['), text.rfind(']') + 1
+        if start < 0 or end <= start:
+            raise ValueError("Response did not contain a JSON array")
+        
+        with stage('json_parse'):
+            answers = {str(answer.get('id')): answer for answer in json.loads(text[start:end]) if isinstance(answer, dict)}
+        for item, cache_key in pending:
+            answer = answers.get(str(item['id']))
+            if answer is None:
+                logger.warning(f"Bulk sentiment response is missing item {item['id']}")
+                continue
+            answer['id'] = item['id']
+            results[item['id']] = answer
+            if cache is not None:
+                cache.set(cache_key, answer)
+        return results
+    
+    except Exception as e:
+        logger.error(f"Bulk sentiment analysis error: {str(e)}")
+        raise Exception(f"Failed to analyze feedback batch: {str(e)}")
+
+
+def _stream_fields(prompt: str, api_key: str) -> Iterator[tuple]:
+    # Yields (name, value) per completed top-level field, then (None, full result)
+    parser = JSONFieldStream()
+    for chunk in call_gemini_api_stream(prompt, api_key):
+        for name, value in parser.feed(chunk):
+            yield name, value
+    yield None, parser.fields if parser.complete else parse_json_response(parser.text)
+
+def stream_resume_analysis(resume_text: str, job_description: str, api_key: str) -> Iterator[Dict[str, Any]]:
+    """
+    Analyze a resume with a streamed Gemini response, reporting fields as they complete
+    
+    Args:
+        resume_text (str): Extracted text from resume
+        job_description (str): Job description text
+        api_key (str): Gemini API key
+        
+    Yields:
+        Dict[str, Any]: {"event": "field", "name", "value"} per top-level field,
+            then {"event": "result", "result"} with the full analysis
+    """
+    try:
+        cache = get_result_cache()
+        chunked = needs_chunking(resume_text, RESUME_TOKEN_BUDGET)
+        version = _prompt_version(RESUME_PROMPT_VERSION, chunked)
+        cache_key = make_cache_key("resume", GEMINI_MODEL, version, resume_text, job_description)
+        cached = cache.get(cache_key) if cache is not None else None
+        if cached is not None:
+            logger.info("Resume analysis served from cache")
+            yield {'event': 'result', 'result': reconcile_skill_lists(cached, resume_text, job_description)}
+            return
+        
+        reused = _reuse_near_duplicate(resume_text, job_description, cache, version)
+        if reused is not None:
+            yield {'event': 'result', 'result': reconcile_skill_lists(reused, resume_text, job_description)}
+            return
+        
+        # Chunked analyses finish all at once, so there are no fields to stream
+        result = _analyze_resume_chunks(resume_text, job_description, api_key) if chunked else None
+        if result is not None:
+            if cache is not None and _cacheable(result, RESUME_FIELDS):
+                cache.set(cache_key, result)
+            yield {'event': 'result', 'result': reconcile_skill_lists(result, resume_text, job_description)}
+            return
+        
+        for name, value in _stream_fields(build_resume_prompt(resume_text, job_description), api_key):
+            if name is None:
+                if cache is not None and _cacheable(value, RESUME_FIELDS):
+                    cache.set(cache_key, value)
+                yield {'event': 'result', 'result': reconcile_skill_lists(value, resume_text, job_description)}
+            elif name in SKILL_FIELDS:
+                # Reconcile each skill list on arrival so it matches the final result
+                reconciled = reconcile_skill_lists({name: value}, resume_text, job_description)
+                yield {'event': 'field', 'name': name, 'value': reconciled[name]}
+            else:
+                yield {'event': 'field', 'name': name, 'value': value}
+    
+    except Exception as e:
+        logger.error(f"Resume analysis error: {str(e)}")
+        raise Exception(f"Failed to analyze resume: {str(e)}")
 
-        return json.loads(response.text.strip('`').lstrip('json\n'))
+def stream_sentiment_analysis(feedback_text: str, api_key: str) -> Iterator[Dict[str, Any]]:
+    """
+    Analyze employee feedback with a streamed Gemini response, reporting fields as they complete
+    
+    Args:
+        feedback_text (str): Employee feedback text
+        api_key (str): Gemini API key
         
-        # # Extract the JSON from the response
-        # text_response = response['candidates'][0]['output']
+    Yields:
+        Dict[str, Any]: {"event": "field", "name", "value"} per top-level field,
+            then {"event": "result", "result"} with the full analysis, or with
+            the local scorer's degraded result if the Gemini call fails
+    """
+    try:
+        cache = get_result_cache()
+        chunked = needs_chunking(feedback_text, FEEDBACK_TOKEN_BUDGET)
+        cache_key = make_cache_key("sentiment", GEMINI_MODEL, _prompt_version(SENTIMENT_PROMPT_VERSION, chunked), feedback_text)
+        cached = cache.get(cache_key) if cache is not None else None
+        if cached is not None:
+            logger.info("Sentiment analysis served from cache")
+            yield {'event': 'result', 'result': cached}
+            return
         
-        # # Find JSON content (between curly braces)
-        # json_start = text_response.find('{')
-        # json_end = text_response.rfind('}') + 1
+        # Chunked analyses finish all at once, so there are no fields to stream
+        result = _analyze_sentiment_chunks(feedback_text, api_key) if chunked else None
+        if result is not None:
+            if cache is not None and _cacheable(result, SENTIMENT_FIELDS):
+                cache.set(cache_key, result)
+            yield {'event': 'result', 'result': result}
+            return
         
-        # if json_start >= 0 and json_end > json_start:
-        #     json_str = text_response[json_start:json_end]
-        #     return json.loads(json_str)
-        # else:
-        #     # If JSON parsing fails, create a structured response from the text
-        #     logger.warning("Could not extract JSON from API response, creating structured response")
-        #     return {
-        #         "sentiment_score": 0,
-        #         "primary_sentiment": "unknown",
-        #         "key_themes": [],
-        #         "positive_aspects": [],
-        #         "concerns": [],
-        #         "attrition_risk": {
-        #             "level": "unknown",
-        #             "reasoning": "Could not determine risk level"
-        #         },
-        #         "engagement_recommendations": [],
-        #         "summary": text_response
-        #     }
-            
+        for name, value in _stream_fields(build_sentiment_prompt(feedback_text), api_key):
+            if name is None:
+                if cache is not None and _cacheable(value, SENTIMENT_FIELDS):
+                    cache.set(cache_key, value)
+                yield {'event': 'result', 'result': value}
+            else:
+                yield {'event': 'field', 'name': name, 'value': value}
+    
     except Exception as e:
-        logger.error(f"Sentiment analysis error: {str(e)}")
-        raise Exception(f"Failed to analyze sentiment: {str(e)}")
+        logger.error(f"Sentiment analysis error, falling back to local scoring: {str(e)}")
+        registry.inc('tatviq_sentiment_local_fallbacks_total')
+        yield {'event': 'result', 'result': degraded_sentiment_result(feedback_text, f"Failed to analyze sentiment: {str(e)}")}
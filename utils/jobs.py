@@ -0,0 +1,286 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, List
+
+logger = logging.getLogger(__name__)
+
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", os.path.join(tempfile.gettempdir(), "tatviq_jobs.sqlite3"))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+JOB_TIMEOUT_SECONDS = float(os.environ.get("JOB_TIMEOUT", "600"))
+JOB_RETENTION_SECONDS = float(os.environ.get("JOB_RETENTION", str(24 * 3600)))
+# Workers refresh the heartbeat of every job they hold this often; a job whose heartbeat
+# stops for JOB_ORPHAN_SECONDS belonged to a worker that is gone
+JOB_HEARTBEAT_SECONDS = float(os.environ.get("JOB_HEARTBEAT", "10"))
+JOB_ORPHAN_SECONDS = 3 * JOB_HEARTBEAT_SECONDS
+
+# Window of finished jobs used for the latency summaries
+LATENCY_WINDOW_SECONDS = 3600
+# How often waiters re-read the store for changes a local job completion does not signal
+WAIT_POLL_SECONDS = 2.0
+
+class JobQueue:
+    """
+    Background analysis jobs run on a thread pool in the web process
+
+    Job state lives in SQLite so that any gunicorn worker can answer status
+    polls, no matter which worker accepted the job.
+    """
+
+    def __init__(self, db_path: str = JOBS_DB_PATH, max_workers: int = JOB_WORKERS):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._initialized = False
+        # Wakes waiters in this process as soon as a local job finishes
+        self._finished = threading.Condition()
+        # Jobs queued or running in this process, kept alive by the heartbeat thread
+        self._held = set()
+        self._heartbeat_pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS jobs ("
+                        "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+                        "result TEXT, error TEXT, created_at REAL NOT NULL, "
+                        "started_at REAL, finished_at REAL, heartbeat_at REAL)"
+                    )
+                    columns = [row['name'] for row in conn.execute("PRAGMA table_info(jobs)")]
+                    if 'heartbeat_at' not in columns:
+                        conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+                    conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+                    conn.execute("CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)")
+                    self._fail_orphans(conn)
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    def _fail_orphans(self, conn: sqlite3.Connection) -> None:
+        # Jobs whose worker stopped sending heartbeats, or that hung, will never finish
+        now = time.time()
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'error', error = 'Worker exited before the job finished', finished_at = ? "
+            "WHERE status IN ('queued', 'running') AND (COALESCE(heartbeat_at, created_at) < ? OR created_at < ?)",
+            (now, now - JOB_ORPHAN_SECONDS, now - JOB_TIMEOUT_SECONDS)
+        )
+        if cursor.rowcount:
+            logger.warning(f"Marked {cursor.rowcount} orphaned jobs as failed")
+
+    def _hold(self, job_id: str) -> None:
+        with self._lock:
+            self._held.add(job_id)
+            # Threads do not survive a fork, so every worker starts its own heartbeat
+            if self._heartbeat_pid != os.getpid():
+                self._heartbeat_pid = os.getpid()
+                threading.Thread(target=self._beat, name='job-heartbeat', daemon=True).start()
+
+    def _beat(self) -> None:
+        while True:
+            time.sleep(JOB_HEARTBEAT_SECONDS)
+            with self._lock:
+                held = list(self._held)
+            if not held:
+                continue
+            try:
+                now = time.time()
+                self._connect().executemany(
+                    "UPDATE jobs SET heartbeat_at = ? WHERE id = ?", [(now, job_id) for job_id in held]
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Job heartbeat failed: {str(e)}")
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created lazily so that a preloading master never forks a live pool
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        return self._executor
+
+    def submit(self, kind: str, func: Callable[..., Any], *args: Any) -> str:
+        """
+        Enqueue a job and return immediately
+
+        Args:
+            kind (str): Job type, e.g. "resume" or "sentiment"
+            func (Callable): Function that produces the JSON-serializable result
+            *args: Arguments passed to func
+
+        Returns:
+            str: Job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO jobs (id, kind, status, created_at, heartbeat_at) VALUES (?, ?, 'queued', ?, ?)",
+            (job_id, kind, now, now)
+        )
+        self._hold(job_id)
+        self.submitted += 1
+        if self.submitted % 100 == 0:
+            self.purge_expired()
+        self._get_executor().submit(self._run, job_id, func, args)
+        return job_id
+
+    def _run(self, job_id: str, func: Callable[..., Any], args: tuple) -> None:
+        conn = self._connect()
+        conn.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), job_id))
+        try:
+            result = func(*args)
+            conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, finished_at = ? WHERE id = ?",
+                (json.dumps(result), time.time(), job_id)
+            )
+            self.completed += 1
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            conn.execute(
+                "UPDATE jobs SET status = 'error', error = ?, finished_at = ? WHERE id = ?",
+                (str(e), time.time(), job_id)
+            )
+            self.failed += 1
+        finally:
+            with self._lock:
+                self._held.discard(job_id)
+            with self._finished:
+                self._finished.notify_all()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job
+
+        Args:
+            job_id (str): Job id returned by submit
+
+        Returns:
+            Optional[Dict[str, Any]]: Job status, plus result or error once finished
+        """
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = {'job_id': row['id'], 'kind': row['kind'], 'status': row['status']}
+        if row['status'] == 'done':
+            job['result'] = json.loads(row['result'])
+        elif row['status'] == 'error':
+            job['error'] = row['error']
+        elif time.time() - row['created_at'] > JOB_TIMEOUT_SECONDS:
+            job['status'] = 'error'
+            job['error'] = 'Job timed out'
+        elif time.time() - (row['heartbeat_at'] or row['created_at']) > JOB_ORPHAN_SECONDS:
+            job['status'] = 'error'
+            job['error'] = 'Worker exited before the job finished'
+        return job
+
+    def wait(self, job_id: str, status: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Wait until a job has left the given status or the timeout passes
+
+        Jobs run by this process wake the waiter as soon as they finish; other
+        changes are picked up by re-reading the store.
+
+        Args:
+            job_id (str): Job id returned by submit
+            status (str): Status the caller last saw
+            timeout (float): Longest time to wait, in seconds
+
+        Returns:
+            Optional[Dict[str, Any]]: Job status as returned by get
+        """
+        until = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = until - time.monotonic()
+            if job is None or job['status'] != status or remaining <= 0:
+                return job
+            with self._finished:
+                self._finished.wait(min(WAIT_POLL_SECONDS, remaining))
+
+    def purge_expired(self) -> int:
+        cursor = self._connect().execute(
+            "DELETE FROM jobs WHERE created_at < ?", (time.time() - JOB_RETENTION_SECONDS,)
+        )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return queue depth and latency metrics
+
+        Queue depth and latencies are read from the shared store, so they cover
+        every worker; jobs whose worker stopped sending heartbeats are failed
+        first. The submitted/completed/failed counters are per process.
+
+        Returns:
+            Dict[str, Any]: Job metrics
+        """
+        conn = self._connect()
+        self._fail_orphans(conn)
+        counts = dict(conn.execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE status IN ('queued', 'running') GROUP BY status"
+        ).fetchall())
+        rows = conn.execute(
+            "SELECT started_at - created_at, finished_at - started_at FROM jobs "
+            "WHERE finished_at > ? AND started_at IS NOT NULL",
+            (time.time() - LATENCY_WINDOW_SECONDS,)
+        ).fetchall()
+        return {
+            'queue_depth': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'queue_wait_seconds': _summarize([row[0] for row in rows]),
+            'run_seconds': _summarize([row[1] for row in rows]),
+        }
+
+def _summarize(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {'count': 0}
+    values = sorted(values)
+
+    def percentile(p: float) -> float:
+        return round(values[min(len(values) - 1, int(p * len(values)))], 4)
+
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 4),
+        'p50': percentile(0.50),
+        'p95': percentile(0.95),
+        'max': round(values[-1], 4),
+    }
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """
+    Return the process-wide job queue, creating it on first use
+
+    Returns:
+        JobQueue: Shared job queue
+    """
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue()
+    return _job_queue
@@ -0,0 +1,145 @@
+import re
+import json
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+class JSONFieldStream:
+    """
+    Incremental parser for a JSON object arriving in chunks
+
+    Everything before the first "{" (markdown fences, a "json" language tag,
+    stray prose) and everything after the matching "}" is ignored. Each
+    top-level field is decoded as soon as its value is complete, so callers
+    can act on "match_score" long before the rest of the object arrives.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+        self._buffer = ''
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume the next chunk of model output
+
+        Args:
+            chunk (str): Text chunk
+
+        Returns:
+            List[Tuple[str, Any]]: Top-level (name, value) pairs completed by this chunk
+        """
+        if self.complete or not chunk:
+            return []
+        self._buffer += chunk
+        completed: List[Tuple[str, Any]] = []
+        buffer = self._buffer
+
+        for index in range(self._pos, len(buffer)):
+            char = buffer[index]
+            if not self._started:
+                if char == '{':
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = self._decode(buffer[self._key_start:index + 1])
+                        self._key_start = None
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._value_start is None:
+                    self._key_start = index
+            elif char == ':' and self._depth == 1 and self._key is not None and self._value_start is None:
+                self._value_start = index + 1
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_field(buffer[self._value_start:index] if self._value_start is not None else None, completed)
+                    self.complete = True
+                    self._pos = index + 1
+                    return completed
+            elif char == ',' and self._depth == 1:
+                self._finish_field(buffer[self._value_start:index] if self._value_start is not None else None, completed)
+
+        self._pos = len(buffer)
+        return completed
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def _finish_field(self, raw: Optional[str], completed: List[Tuple[str, Any]]) -> None:
+        key, self._key, self._value_start = self._key, None, None
+        if key is None or raw is None or not raw.strip():
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            logger.warning(f"Skipping malformed value for field {key}")
+            return
+        self.fields[key] = value
+        completed.append((key, value))
+
+    @staticmethod
+    def _decode(raw: str) -> Optional[str]:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+def parse_json_response(text: str) -> Dict[str, Any]:
+    """
+    Parse a JSON object out of model output, tolerating fences and small defects
+
+    Handles markdown fences, prose around the object and trailing commas.
+    If the object is cut off, the fields that were completed are returned.
+
+    Args:
+        text (str): Raw model output
+
+    Returns:
+        Dict[str, Any]: Parsed object
+
+    Raises:
+        ValueError: If no JSON object can be recovered
+    """
+    start, end = text.find('{'), text.rfind('}') + 1
+    if start >= 0 and end > start:
+        candidate = text[start:end]
+        for attempt in (candidate, _TRAILING_COMMA.sub(r'\1', candidate)):
+            try:
+                result = json.loads(attempt)
+                if isinstance(result, dict):
+                    return result
+            except ValueError:
+                pass
+
+    stream = JSONFieldStream()
+    stream.feed(_TRAILING_COMMA.sub(r'\1', text))
+    if stream.fields:
+        logger.warning(f"Recovered {len(stream.fields)} fields from an incomplete JSON response")
+        return stream.fields
+    raise ValueError("Response did not contain a JSON object")
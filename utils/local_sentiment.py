@@ -0,0 +1,400 @@
+import os
+import re
+import json
+import logging
+import threading
+from itertools import repeat
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LEXICON_PATH = os.environ.get(
+    "SENTIMENT_LEXICON_PATH", os.path.join(os.path.dirname(__file__), "data", "sentiment_lexicon.json")
+)
+
+# Scoring rules, following the VADER conventions: a negator up to three tokens
+# back flips and dampens a word, text after "but" outweighs the text before it,
+# and the summed valence is squashed into [-1, 1] with x / sqrt(x^2 + alpha)
+NEGATION_WINDOW = 3
+NEGATION_SCALAR = -0.74
+CONTRAST_BEFORE = 0.5
+CONTRAST_AFTER = 1.5
+NORMALIZATION_ALPHA = 15.0
+
+# Score bands shared with the Gemini prompt's primary_sentiment labels
+POSITIVE_THRESHOLD = 0.25
+NEGATIVE_THRESHOLD = -0.25
+# Negative enough to count as medium attrition risk without any phrase match
+RISK_SCORE_THRESHOLD = -0.35
+
+MAX_EXCERPTS = 3
+MAX_EXCERPT_CHARS = 160
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+# Tokenizing is bytes.translate + split: every byte outside a-z becomes a space.
+# \x01 survives as the comment separator in bulk scoring.
+_SEPARATOR = "\x01"
+_WORD_BYTES = bytes(c if 97 <= c <= 122 else 32 for c in range(256))
+_BULK_WORD_BYTES = bytes(c if 97 <= c <= 122 or c == 1 else 32 for c in range(256))
+_SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]*")
+
+class SentimentLexicon:
+    """
+    Lexicon and rule tables compiled into NumPy lookup arrays
+
+    Every known word gets an integer id; valence, negator, intensifier and
+    contrast flags are arrays indexed by that id, so scoring is a handful of
+    vectorized operations over the token ids of one or many comments.
+    Unknown words map to id 0, which is neutral on every table.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        words = sorted(set(data['lexicon']) | set(data['negators']) | set(data['intensifiers']) | set(data['contrast']))
+        self.vocabulary = {word: index for index, word in enumerate(words, start=1)}
+        self._byte_ids = {word.encode('ascii'): index for word, index in self.vocabulary.items()}
+        self._bulk_byte_ids = {**self._byte_ids, _SEPARATOR.encode('ascii'): -1}
+        size = len(words) + 1
+        self.valence = np.zeros(size)
+        self.negator = np.zeros(size, dtype=bool)
+        self.boost = np.ones(size)
+        self.contrast = np.zeros(size, dtype=np.int32)
+        for word, value in data['lexicon'].items():
+            self.valence[self.vocabulary[word]] = value
+        for word in data['negators']:
+            self.negator[self.vocabulary[word]] = True
+        for word, value in data['intensifiers'].items():
+            self.boost[self.vocabulary[word]] = value
+        for word in data['contrast']:
+            self.contrast[self.vocabulary[word]] = 1
+        # Plain-list copies for the scalar path: indexing a list beats NumPy call overhead on one comment
+        self.valence_list = self.valence.tolist()
+        self.negator_list = self.negator.tolist()
+        self.boost_list = self.boost.tolist()
+        self.contrast_list = self.contrast.tolist()
+
+        # One alternation per signal type, so a comment is scanned once per type
+        self.intent_pattern = re.compile('|'.join(f"(?:{pattern})" for pattern in data['attrition']['intent']))
+        self.disengagement_pattern = re.compile('|'.join(f"(?:{pattern})" for pattern in data['attrition']['disengagement']))
+        self.themes = {theme: frozenset(keywords) for theme, keywords in data['themes'].items()}
+
+    def token_ids(self, text: str) -> List[int]:
+        tokens = _ascii_lower(text or '').translate(_WORD_BYTES).split()
+        return list(map(self._byte_ids.get, tokens, repeat(0)))
+
+    def bulk_token_ids(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tokenize many comments as one buffer
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Concatenated token ids and the token count of each comment
+        """
+        texts = [text or '' for text in texts]
+        if any(_SEPARATOR in text for text in texts):
+            texts = [text.replace(_SEPARATOR, ' ') for text in texts]
+        tokens = _ascii_lower(f" {_SEPARATOR} ".join(texts)).translate(_BULK_WORD_BYTES).split()
+        ids = np.fromiter(map(self._bulk_byte_ids.get, tokens, repeat(0)), dtype=np.int64, count=len(tokens))
+        separators = ids < 0
+        doc = np.cumsum(separators)[~separators]
+        return ids[~separators], np.bincount(doc, minlength=len(texts))
+
+def _ascii_lower(text: str) -> bytes:
+    # Lowercased ASCII bytes with "n't" expanded, so "don't" negates like "do not"
+    return text.lower().replace("\u2019", "'").encode('ascii', 'replace').replace(b"n't", b" not")
+
+_lexicon: Optional[SentimentLexicon] = None
+_lexicon_lock = threading.Lock()
+
+def get_lexicon() -> SentimentLexicon:
+    """
+    Return the shared sentiment lexicon, loading it on first use
+
+    Returns:
+        SentimentLexicon: Shared lexicon instance
+    """
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                with open(LEXICON_PATH, 'r', encoding='utf-8') as file:
+                    _lexicon = SentimentLexicon(json.load(file))
+    return _lexicon
+
+def _score_token_ids(lexicon: SentimentLexicon, ids: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Token ids of every comment are concatenated; doc maps each token to its comment
+    n_docs = len(lengths)
+    doc = np.repeat(np.arange(n_docs), lengths)
+    valence = lexicon.valence[ids]
+
+    negators = lexicon.negator[ids]
+    negated = np.zeros(len(ids), dtype=bool)
+    for shift in range(1, NEGATION_WINDOW + 1):
+        negated[shift:] |= negators[:-shift] & (doc[shift:] == doc[:-shift])
+    valence = np.where(negated, valence * NEGATION_SCALAR, valence)
+
+    # Intensifiers and diminishers scale the word right after them
+    if len(ids) > 1:
+        same_doc = doc[1:] == doc[:-1]
+        valence[1:] *= np.where(same_doc, lexicon.boost[ids[:-1]], 1.0)
+
+    contrast = lexicon.contrast[ids]
+    if contrast.any():
+        running = np.cumsum(contrast)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        before_doc = np.where(starts > 0, running[np.maximum(starts - 1, 0)], 0)
+        seen = running - before_doc[doc]
+        has_contrast = np.bincount(doc, weights=contrast, minlength=n_docs) > 0
+        weight = np.where(has_contrast[doc], np.where(seen > 0, CONTRAST_AFTER, CONTRAST_BEFORE), 1.0)
+        valence = valence * weight
+
+    positive = np.bincount(doc, weights=np.maximum(valence, 0), minlength=n_docs)
+    negative = np.bincount(doc, weights=np.minimum(valence, 0), minlength=n_docs)
+    total = positive + negative
+    return total / np.sqrt(total * total + NORMALIZATION_ALPHA), positive, negative
+
+def _score_single(lexicon: SentimentLexicon, ids: List[int]) -> Tuple[float, float, float]:
+    # Same rules as _score_token_ids for one comment, without per-call NumPy overhead
+    valence, negator, boost, contrast = lexicon.valence_list, lexicon.negator_list, lexicon.boost_list, lexicon.contrast_list
+    has_contrast = any(contrast[i] for i in ids)
+    seen_contrast = False
+    positive = negative = 0.0
+    for position, word in enumerate(ids):
+        if contrast[word]:
+            seen_contrast = True
+        value = valence[word]
+        if not value:
+            continue
+        if any(negator[ids[position - shift]] for shift in range(1, min(NEGATION_WINDOW, position) + 1)):
+            value *= NEGATION_SCALAR
+        if position > 0:
+            value *= boost[ids[position - 1]]
+        if has_contrast:
+            value *= CONTRAST_AFTER if seen_contrast else CONTRAST_BEFORE
+        if value > 0:
+            positive += value
+        else:
+            negative += value
+    total = positive + negative
+    return total / (total * total + NORMALIZATION_ALPHA) ** 0.5, positive, negative
+
+def score_comments(texts: List[str]) -> np.ndarray:
+    """
+    Score many comments in one vectorized pass
+
+    Args:
+        texts (List[str]): Feedback comments
+
+    Returns:
+        np.ndarray: Sentiment score in [-1, 1] per comment, in input order
+    """
+    return _score_many(texts)[0]
+
+def _score_many(texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    lexicon = get_lexicon()
+    ids, lengths = lexicon.bulk_token_ids(texts)
+    return _score_token_ids(lexicon, ids, lengths)
+
+def score_comment(text: str) -> float:
+    """
+    Score one comment
+
+    Args:
+        text (str): Feedback comment
+
+    Returns:
+        float: Sentiment score in [-1, 1]
+    """
+    lexicon = get_lexicon()
+    return _score_single(lexicon, lexicon.token_ids(text))[0]
+
+def _primary_sentiment(score: float, positive: float, negative: float) -> str:
+    # Strong praise and strong criticism in one comment reads as mixed
+    if positive >= 1.5 and -negative >= 1.5 and min(positive, -negative) >= 0.5 * max(positive, -negative):
+        return 'mixed'
+    if score >= POSITIVE_THRESHOLD:
+        return 'positive'
+    if score <= NEGATIVE_THRESHOLD:
+        return 'negative'
+    return 'neutral'
+
+def attrition_signals(text: str) -> Dict[str, List[str]]:
+    """
+    Find intent-to-leave and disengagement phrases in a comment
+
+    Args:
+        text (str): Feedback comment
+
+    Returns:
+        Dict[str, List[str]]: Matched phrases under "intent" and "disengagement"
+    """
+    lexicon = get_lexicon()
+    lowered = (text or '').lower().replace("\u2019", "'")
+    return {
+        'intent': [match.group(0) for match in lexicon.intent_pattern.finditer(lowered)],
+        'disengagement': [match.group(0) for match in lexicon.disengagement_pattern.finditer(lowered)],
+    }
+
+def attrition_risk(score: float, signals: Dict[str, List[str]]) -> Dict[str, str]:
+    """
+    Grade attrition risk from the sentiment score and matched phrases
+
+    Args:
+        score (float): Sentiment score in [-1, 1]
+        signals (Dict[str, List[str]]): Output of attrition_signals
+
+    Returns:
+        Dict[str, str]: level ("low", "medium" or "high") and reasoning
+    """
+    if signals['intent']:
+        return {'level': 'high', 'reasoning': f"Intent-to-leave language: \"{signals['intent'][0]}\""}
+    if signals['disengagement'] and score <= NEGATIVE_THRESHOLD:
+        return {'level': 'high', 'reasoning': f"Disengagement (\"{signals['disengagement'][0]}\") in clearly negative feedback"}
+    if signals['disengagement']:
+        return {'level': 'medium', 'reasoning': f"Disengagement language: \"{signals['disengagement'][0]}\""}
+    if score <= RISK_SCORE_THRESHOLD:
+        return {'level': 'medium', 'reasoning': 'Predominantly negative feedback'}
+    return {'level': 'low', 'reasoning': 'No intent-to-leave or disengagement language'}
+
+def find_themes(text: str) -> List[str]:
+    """
+    Find the workplace themes a comment mentions
+
+    Args:
+        text (str): Feedback comment
+
+    Returns:
+        List[str]: Theme names in lexicon order
+    """
+    tokens = set(_TOKEN_RE.findall((text or '').lower()))
+    return [theme for theme, keywords in get_lexicon().themes.items() if tokens & keywords]
+
+def _excerpts(text: str) -> Tuple[List[str], List[str]]:
+    sentences = [sentence.strip() for sentence in _SENTENCE_RE.findall(text or '') if sentence.strip()]
+    if not sentences:
+        return [], []
+    lexicon = get_lexicon()
+    scores = [_score_single(lexicon, lexicon.token_ids(sentence))[0] for sentence in sentences]
+    positive = [sentence[:MAX_EXCERPT_CHARS] for sentence, score in zip(sentences, scores) if score >= POSITIVE_THRESHOLD]
+    negative = [sentence[:MAX_EXCERPT_CHARS] for sentence, score in zip(sentences, scores) if score <= NEGATIVE_THRESHOLD]
+    return positive[:MAX_EXCERPTS], negative[:MAX_EXCERPTS]
+
+def local_sentiment_result(feedback_text: str) -> Dict[str, Any]:
+    """
+    Analyze a comment locally with the lexicon and phrase rules
+
+    Deterministic and fast enough to return while the Gemini analysis is
+    still running. The result has the same keys as the Gemini analysis and
+    is flagged "provisional".
+
+    Args:
+        feedback_text (str): Employee feedback text
+
+    Returns:
+        Dict[str, Any]: Provisional sentiment result
+    """
+    lexicon = get_lexicon()
+    score, positive, negative = _score_single(lexicon, lexicon.token_ids(feedback_text))
+    score = round(score, 2)
+    signals = attrition_signals(feedback_text)
+    positive_aspects, concerns = _excerpts(feedback_text)
+    primary = _primary_sentiment(score, positive, negative)
+    return {
+        'sentiment_score': score,
+        'primary_sentiment': primary,
+        'key_themes': find_themes(feedback_text),
+        'positive_aspects': positive_aspects,
+        'concerns': concerns,
+        'attrition_risk': attrition_risk(score, signals),
+        'engagement_recommendations': [],
+        'summary': f"Provisional {primary} reading from sentiment keywords and phrases.",
+        'provisional': True,
+    }
+
+def local_bulk_results(items: List[Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Analyze many comments locally, in the compact shape of the bulk Gemini analysis
+
+    Args:
+        items (List[Dict[str, str]]): Comments as {"id": ..., "text": ...}
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Provisional result per item id
+    """
+    scores, positive, negative = _score_many([item['text'] for item in items])
+    results = {}
+    for item, score, pos, neg in zip(items, scores.tolist(), positive.tolist(), negative.tolist()):
+        score = round(score, 2)
+        results[item['id']] = {
+            'id': item['id'],
+            'sentiment_score': score,
+            'primary_sentiment': _primary_sentiment(score, pos, neg),
+            'key_themes': find_themes(item['text']),
+            'concerns': [],
+            'attrition_risk': {'level': attrition_risk(score, attrition_signals(item['text']))['level']},
+            'provisional': True,
+        }
+    return results
+
+def _polarity(score: float) -> str:
+    if score >= POSITIVE_THRESHOLD:
+        return 'positive'
+    if score <= NEGATIVE_THRESHOLD:
+        return 'negative'
+    return 'neutral'
+
+def _confusion(pairs: List[Tuple[str, str]], labels: Tuple[str, ...]) -> Dict[str, Dict[str, int]]:
+    matrix = {expected: {actual: 0 for actual in labels} for expected in labels}
+    for expected, actual in pairs:
+        if expected in matrix and actual in matrix[expected]:
+            matrix[expected][actual] += 1
+    return matrix
+
+def agreement_report(texts: List[str], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compare the local scorer with stored Gemini analyses of the same comments
+
+    Degraded and provisional results are skipped since they came from the
+    local scorer in the first place.
+
+    Args:
+        texts (List[str]): Feedback comments
+        results (List[Dict[str, Any]]): Stored Gemini analysis per comment
+
+    Returns:
+        Dict[str, Any]: Sample size, score correlation and mean absolute error,
+            polarity and attrition-level agreement with confusion matrices
+            (rows are Gemini labels, columns local labels)
+    """
+    pairs = [
+        (text, result) for text, result in zip(texts, results)
+        if isinstance(result, dict) and not result.get('degraded') and not result.get('provisional')
+        and isinstance(result.get('sentiment_score'), (int, float))
+    ]
+    if not pairs:
+        return {'count': 0}
+
+    local_scores = score_comments([text for text, _ in pairs])
+    gemini_scores = np.array([float(result['sentiment_score']) for _, result in pairs])
+    correlation = None
+    if len(pairs) > 1 and local_scores.std() > 0 and gemini_scores.std() > 0:
+        correlation = round(float(np.corrcoef(local_scores, gemini_scores)[0, 1]), 3)
+
+    polarity_pairs = [(_polarity(g), _polarity(l)) for g, l in zip(gemini_scores.tolist(), local_scores.tolist())]
+    risk_pairs = []
+    for (text, result), score in zip(pairs, local_scores.tolist()):
+        expected = result.get('attrition_risk')
+        expected = expected.get('level') if isinstance(expected, dict) else expected
+        if expected in ('low', 'medium', 'high'):
+            risk_pairs.append((expected, attrition_risk(score, attrition_signals(text))['level']))
+
+    return {
+        'count': len(pairs),
+        'score_correlation': correlation,
+        'score_mae': round(float(np.mean(np.abs(local_scores - gemini_scores))), 3),
+        'polarity_agreement': round(sum(g == l for g, l in polarity_pairs) / len(polarity_pairs), 3),
+        'polarity_confusion': _confusion(polarity_pairs, ('positive', 'neutral', 'negative')),
+        'attrition_agreement': (round(sum(g == l for g, l in risk_pairs) / len(risk_pairs), 3)
+                                if risk_pairs else None),
+        'attrition_confusion': _confusion(risk_pairs, ('low', 'medium', 'high')),
+    }
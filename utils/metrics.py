@@ -0,0 +1,224 @@
+import time
+import bisect
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; wide enough to cover a cached hit and a slow Gemini call
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+class Histogram:
+    """
+    Fixed-bucket histogram in the Prometheus sense
+
+    Observations only bump one bucket counter, sum and count under a lock, so
+    recording costs well under a microsecond.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+class MetricsRegistry:
+    """
+    Process-wide histograms and counters, keyed by metric name and label values
+    """
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self.help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, labels: Tuple[Tuple[str, str], ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, Histogram(buckets))
+        return histogram
+
+    def inc(self, name: str, value: float = 1, labels: Tuple[Tuple[str, str], ...] = ()) -> None:
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def describe(self, name: str, text: str) -> None:
+        self.help[name] = text
+
+registry = MetricsRegistry()
+registry.describe('tatviq_stage_seconds', 'Time spent in each analysis pipeline stage')
+registry.describe('tatviq_http_request_seconds', 'HTTP request latency by endpoint')
+registry.describe('tatviq_gemini_tokens', 'Gemini token usage per call')
+registry.describe('tatviq_gemini_tokens_total', 'Gemini tokens consumed')
+registry.describe('tatviq_prompt_tokens_estimated', 'Estimated prompt size per request, before the call')
+registry.describe('tatviq_prompt_tokens_trimmed_total', 'Estimated input tokens removed by prompt trimming')
+
+_trace = threading.local()
+
+class stage:
+    """
+    Time a pipeline stage
+
+    Records into the tatviq_stage_seconds histogram and, when the current
+    thread is tracing a request, into that request's stage breakdown.
+
+        with stage('extract_pdf'):
+            text = ...
+    """
+
+    __slots__ = ('name', 'histogram', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.histogram = registry.histogram('tatviq_stage_seconds', (('stage', name),))
+
+    def __enter__(self) -> "stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.start
+        self.histogram.observe(elapsed)
+        stages = getattr(_trace, 'stages', None)
+        if stages is not None:
+            stages.append((self.name, elapsed))
+
+def record_stage(name: str, seconds: float) -> None:
+    """
+    Record a stage timed by hand, for code paths that cannot use a with block
+
+    Args:
+        name (str): Stage name
+        seconds (float): Elapsed time
+    """
+    registry.histogram('tatviq_stage_seconds', (('stage', name),)).observe(seconds)
+    stages = getattr(_trace, 'stages', None)
+    if stages is not None:
+        stages.append((name, seconds))
+
+def start_trace() -> None:
+    """
+    Start collecting a stage breakdown for the current thread
+    """
+    _trace.stages = []
+
+def end_trace() -> Optional[List[Tuple[str, float]]]:
+    """
+    Stop collecting and return the stages recorded since start_trace
+
+    Returns:
+        Optional[List[Tuple[str, float]]]: (stage, seconds) pairs, or None if no trace was active
+    """
+    stages = getattr(_trace, 'stages', None)
+    _trace.stages = None
+    return stages
+
+def observe_request(endpoint: str, seconds: float) -> None:
+    registry.histogram('tatviq_http_request_seconds', (('endpoint', endpoint),)).observe(seconds)
+
+def record_token_usage(response: Any, operation: str) -> None:
+    """
+    Record token counts from a Gemini response's usage metadata
+
+    Args:
+        response: GenerateContentResponse (or the last chunk of a stream)
+        operation (str): Label for the call, e.g. "generate" or "stream"
+    """
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return
+    for kind, attribute in (('prompt', 'prompt_token_count'), ('output', 'candidates_token_count'),
+                            ('total', 'total_token_count')):
+        count = getattr(usage, attribute, None)
+        if count:
+            labels = (('kind', kind), ('operation', operation))
+            registry.histogram('tatviq_gemini_tokens', labels, TOKEN_BUCKETS).observe(count)
+            registry.inc('tatviq_gemini_tokens_total', count, labels)
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    # Label values are internal identifiers (stage and endpoint names), so no escaping is needed
+    pairs = labels + extra
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound)) if bound != int(bound) else f"{int(bound)}.0"
+
+def render_prometheus(gauges: Optional[Dict[str, float]] = None) -> str:
+    """
+    Render every metric in the Prometheus text exposition format
+
+    Args:
+        gauges (Optional[Dict[str, float]]): Extra point-in-time values, e.g. cache and job stats
+
+    Returns:
+        str: Exposition text
+    """
+    lines: List[str] = []
+    with registry._lock:
+        histograms = dict(registry.histograms)
+        counters = dict(registry.counters)
+    by_name: Dict[str, List[Tuple[Tuple[Tuple[str, str], ...], Histogram]]] = {}
+    for (name, labels), histogram in sorted(histograms.items()):
+        by_name.setdefault(name, []).append((labels, histogram))
+    for name, series in by_name.items():
+        if name in registry.help:
+            lines.append(f"# HELP {name} {registry.help[name]}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in series:
+            counts, total, count = histogram.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', _format_bound(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+    counter_names = sorted({name for name, _ in counters})
+    for name in counter_names:
+        if name in registry.help:
+            lines.append(f"# HELP {name} {registry.help[name]}")
+        lines.append(f"# TYPE {name} counter")
+        for (counter_name, labels), value in sorted(counters.items()):
+            if counter_name == name:
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for name, value in sorted((gauges or {}).items()):
+        if value is None:
+            continue
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    return '\n'.join(lines) + '\n'
+
+def format_server_timing(stages: List[Tuple[str, float]]) -> str:
+    """
+    Format a stage breakdown as a Server-Timing header value (durations in ms)
+
+    Args:
+        stages (List[Tuple[str, float]]): (stage, seconds) pairs
+
+    Returns:
+        str: Header value
+    """
+    return ', '.join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in stages)
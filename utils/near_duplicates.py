@@ -0,0 +1,273 @@
+import os
+import re
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from utils.result_cache import content_digest, normalize_text
+from utils.metrics import registry, stage
+
+logger = logging.getLogger(__name__)
+
+NEAR_DUP_ENABLED = os.environ.get("NEAR_DUP_ENABLED", "1").lower() not in ("0", "false", "no")
+NEAR_DUP_DB_PATH = os.environ.get(
+    "NEAR_DUP_DB_PATH", os.path.join(tempfile.gettempdir(), "tatviq_near_duplicates.sqlite3")
+)
+# Estimated Jaccard similarity above which an upload is flagged, and the stricter
+# bar above which an earlier analysis is reused instead of calling Gemini
+NEAR_DUP_THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", "0.8"))
+NEAR_DUP_REUSE_THRESHOLD = float(os.environ.get("NEAR_DUP_REUSE_THRESHOLD", "0.9"))
+SHINGLE_SIZE = int(os.environ.get("NEAR_DUP_SHINGLE_SIZE", "5"))
+
+# 16 bands of 8 rows: pairs at similarity 0.8 collide in some band ~95% of the
+# time, pairs at 0.5 only ~6%, so few dissimilar candidates reach the exact check
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MAX_MATCHES = 5
+
+# Universal hash family h(x) = (a*x + b) mod p; a, b < 2**31 keep a*x + b inside
+# uint64 for 32-bit shingle hashes. Fixed seed: stored signatures must stay comparable.
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_rng = np.random.RandomState(20240501)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+
+_WORD_RE = re.compile(r"\w+")
+
+registry.describe('tatviq_near_duplicates_flagged_total', 'Resume uploads flagged as near-duplicates of earlier ones')
+registry.describe('tatviq_near_duplicate_reuses_total', 'Resume analyses reused from a near-duplicate instead of calling Gemini')
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    tokens = _WORD_RE.findall(normalize_text(text).lower())
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    if len(tokens) <= SHINGLE_SIZE:
+        shingles = {' '.join(tokens)}
+    else:
+        shingles = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """
+    Compute the MinHash signature of a text over its word shingles
+
+    Args:
+        text (str): Raw text, e.g. an extracted resume
+
+    Returns:
+        Optional[np.ndarray]: NUM_PERM uint32 minimums, or None for text without words
+    """
+    hashes = _shingle_hashes(text)
+    if hashes.size == 0:
+        return None
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+def _band_keys(signature: np.ndarray) -> List[int]:
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS:(band + 1) * ROWS].tobytes()
+        digest = hashlib.blake2b(bytes([band]) + chunk, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+class NearDuplicateIndex:
+    """
+    Persistent LSH index over MinHash signatures
+
+    Each document is stored once with its signature, plus one row per band
+    keyed by the band's hash. A lookup is a single indexed IN query over the
+    BANDS keys followed by an exact signature comparison of the candidates,
+    so its cost depends on the number of candidates, not the index size.
+    The tables live in SQLite so every gunicorn worker shares one index and
+    documents are added incrementally as they are uploaded.
+    """
+
+    def __init__(self, db_path: str = NEAR_DUP_DB_PATH):
+        self.db_path = db_path
+        self.lookups = 0
+        self.flagged = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS documents ("
+                        "id INTEGER PRIMARY KEY, digest TEXT NOT NULL UNIQUE, label TEXT, "
+                        "signature BLOB NOT NULL, created_at REAL NOT NULL)"
+                    )
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS bands ("
+                        "key INTEGER NOT NULL, doc_id INTEGER NOT NULL, PRIMARY KEY (key, doc_id)) WITHOUT ROWID"
+                    )
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    def add(self, digest: str, signature: np.ndarray, label: Optional[str] = None) -> bool:
+        """
+        Add a document to the index
+
+        Args:
+            digest (str): Content digest of the document, see utils.result_cache.content_digest
+            signature (np.ndarray): MinHash signature of the document
+            label (Optional[str]): Display name, e.g. the uploaded filename
+
+        Returns:
+            bool: True if the document was new
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO documents (digest, label, signature, created_at) VALUES (?, ?, ?, ?)",
+                (digest, label, signature.astype(np.uint32).tobytes(), time.time())
+            )
+            added = cursor.rowcount == 1
+            if added:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO bands (key, doc_id) VALUES (?, ?)",
+                    [(key, cursor.lastrowid) for key in _band_keys(signature)]
+                )
+            conn.execute("COMMIT")
+            return added
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+
+    def query(self, signature: np.ndarray, threshold: float = NEAR_DUP_THRESHOLD,
+              exclude_digest: Optional[str] = None, limit: int = MAX_MATCHES) -> List[Dict[str, Any]]:
+        """
+        Find indexed documents whose estimated similarity reaches the threshold
+
+        Args:
+            signature (np.ndarray): MinHash signature to look up
+            threshold (float): Minimum estimated Jaccard similarity
+            exclude_digest (Optional[str]): Digest to leave out, usually the query document itself
+            limit (int): Maximum number of matches
+
+        Returns:
+            List[Dict[str, Any]]: Matches with digest, label, similarity and first_seen, most similar first
+        """
+        keys = _band_keys(signature)
+        rows = self._connect().execute(
+            "SELECT digest, label, signature, created_at FROM documents WHERE id IN "
+            f"(SELECT doc_id FROM bands WHERE key IN ({','.join('?' * len(keys))}))",
+            keys
+        ).fetchall()
+        self.lookups += 1
+
+        matches = []
+        for digest, label, blob, created_at in rows:
+            if digest == exclude_digest:
+                continue
+            similarity = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == signature))
+            if similarity >= threshold:
+                matches.append({
+                    'digest': digest,
+                    'label': label,
+                    'similarity': round(similarity, 3),
+                    'first_seen': created_at,
+                })
+        matches.sort(key=lambda match: match['similarity'], reverse=True)
+        return matches[:limit]
+
+    def find(self, text: str, threshold: float = NEAR_DUP_THRESHOLD) -> List[Dict[str, Any]]:
+        """
+        Find near-duplicates of a text, excluding exact copies of it
+
+        Args:
+            text (str): Raw text
+            threshold (float): Minimum estimated Jaccard similarity
+
+        Returns:
+            List[Dict[str, Any]]: Matches, see query
+        """
+        signature = minhash_signature(text)
+        if signature is None:
+            return []
+        return self.query(signature, threshold, exclude_digest=content_digest(text))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return index size and lookup counters for monitoring
+
+        Returns:
+            Dict[str, Any]: Index counters
+        """
+        documents = self._connect().execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return {'documents': documents, 'lookups': self.lookups, 'flagged': self.flagged}
+
+_index: Optional[NearDuplicateIndex] = None
+_index_lock = threading.Lock()
+
+def get_near_duplicate_index() -> Optional[NearDuplicateIndex]:
+    """
+    Return the process-wide near-duplicate index, creating it on first use
+
+    Returns:
+        Optional[NearDuplicateIndex]: The shared index, or None when detection is disabled
+    """
+    global _index
+    if not NEAR_DUP_ENABLED:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = NearDuplicateIndex(NEAR_DUP_DB_PATH)
+    return _index
+
+def check_resume_upload(resume_text: str, filename: str) -> List[Dict[str, Any]]:
+    """
+    Flag earlier uploads that are near-duplicates of a resume, then index it
+
+    Index errors are logged and reported as no matches so that duplicate
+    detection can never fail an upload.
+
+    Args:
+        resume_text (str): Extracted text from resume
+        filename (str): Uploaded file name, shown when later uploads match this one
+
+    Returns:
+        List[Dict[str, Any]]: Earlier uploads with filename, similarity and first_seen
+    """
+    index = get_near_duplicate_index()
+    if index is None:
+        return []
+    try:
+        with stage('near_duplicate_lookup'):
+            signature = minhash_signature(resume_text)
+            if signature is None:
+                return []
+            digest = content_digest(resume_text)
+            matches = index.query(signature, NEAR_DUP_THRESHOLD, exclude_digest=digest)
+            index.add(digest, signature, filename)
+    except sqlite3.Error as e:
+        logger.warning(f"Near-duplicate check failed: {str(e)}")
+        return []
+
+    if matches:
+        index.flagged += 1
+        registry.inc('tatviq_near_duplicates_flagged_total')
+        logger.info(f"{filename} is a near-duplicate of {matches[0]['label']} ({matches[0]['similarity']})")
+    return [
+        {'filename': match['label'], 'similarity': match['similarity'], 'first_seen': match['first_seen']}
+        for match in matches
+    ]
@@ -0,0 +1,126 @@
+import os
+import string
+import logging
+from collections import Counter
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters; the defaults are the usual Okapi values
+BM25_K1 = float(os.environ.get("PRESCREEN_BM25_K1", "1.5"))
+BM25_B = float(os.environ.get("PRESCREEN_BM25_B", "0.75"))
+
+# Punctuation becomes whitespace, except the characters that appear inside
+# tech tokens such as "c++", "c#" and "node.js"
+_PUNCTUATION_TABLE = str.maketrans({c: ' ' for c in string.punctuation if c not in '+#.'})
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can for from has have in into is it its of on or our
+that the their this to was we were will with you your who what which while within
+experience years year strong skills skill ability work working team role candidate
+including etc plus preferred required requirements knowledge understanding using
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase terms, dropping stopwords and trailing dots
+
+    Args:
+        text (str): Raw text
+
+    Returns:
+        List[str]: Terms in document order
+    """
+    tokens = (token.strip('.') for token in (text or '').lower().translate(_PUNCTUATION_TABLE).split())
+    return [token for token in tokens if token and token not in STOPWORDS]
+
+def score_resumes(job_description: str, resume_texts: List[str],
+                  k1: float = BM25_K1, b: float = BM25_B) -> np.ndarray:
+    """
+    Score every resume against a job description with BM25 in one vectorized pass
+
+    The job description is the query. Document frequencies and the average
+    length come from the batch itself, so scores are comparable within a
+    batch but not across batches.
+
+    Args:
+        job_description (str): Job description text
+        resume_texts (List[str]): Extracted resume texts
+        k1 (float): BM25 term-frequency saturation
+        b (float): BM25 length normalization
+
+    Returns:
+        np.ndarray: One BM25 score per resume, in input order
+    """
+    query_counts = Counter(tokenize(job_description))
+    n_docs = len(resume_texts)
+    if not query_counts or n_docs == 0:
+        return np.zeros(n_docs)
+
+    term_index = {term: i for i, term in enumerate(query_counts)}
+    n_terms = len(term_index)
+    # Raw resume tokens keep the leading/trailing dots that tokenize() strips
+    lookup = {}
+    for term, i in term_index.items():
+        for variant in (term, term + '.', '.' + term, '.' + term + '.'):
+            lookup[variant] = i
+
+    # Only query terms are kept, so the term matrix stays n_docs x n_terms.
+    # Resumes are split and counted with C-level str/Counter operations since
+    # per-token Python work dominates the cost on large batches.
+    rows: List[int] = []
+    cols: List[int] = []
+    counts: List[int] = []
+    lengths = np.empty(n_docs, dtype=np.float64)
+    for row, text in enumerate(resume_texts):
+        doc_counts = Counter((text or '').lower().translate(_PUNCTUATION_TABLE).split())
+        lengths[row] = sum(doc_counts.values())
+        for token in doc_counts.keys() & lookup.keys():
+            rows.append(row)
+            cols.append(lookup[token])
+            counts.append(doc_counts[token])
+
+    tf = np.zeros((n_docs, n_terms), dtype=np.float64)
+    np.add.at(tf, (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)), counts)
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    query_weight = np.log1p(np.fromiter(query_counts.values(), dtype=np.float64, count=n_terms))
+
+    avgdl = lengths.mean() or 1.0
+    norm = k1 * (1.0 - b + b * lengths / avgdl)
+    saturated = tf * (k1 + 1.0) / (tf + norm[:, None])
+    return saturated @ (idf * query_weight)
+
+def shortlist_resumes(job_description: str, resume_texts: List[str], top_k: Optional[int] = None,
+                      min_score: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Rank resumes locally and mark which ones deserve a full Gemini analysis
+
+    Args:
+        job_description (str): Job description text
+        resume_texts (List[str]): Extracted resume texts
+        top_k (Optional[int]): Keep at most this many resumes
+        min_score (Optional[float]): Keep resumes whose normalized score (0-1) is at least this
+
+    Returns:
+        List[Dict[str, Any]]: Entries sorted best first, each with the resume index,
+            raw and normalized score and a shortlisted flag
+    """
+    scores = score_resumes(job_description, resume_texts)
+    best = scores.max() if len(scores) else 0.0
+    normalized = scores / best if best > 0 else np.zeros_like(scores)
+    order = np.argsort(-scores, kind='stable')
+
+    ranking = []
+    for rank, index in enumerate(order):
+        keep = (top_k is None or rank < top_k) and (min_score is None or normalized[index] >= min_score)
+        ranking.append({
+            'index': int(index),
+            'score': round(float(scores[index]), 4),
+            'normalized_score': round(float(normalized[index]), 4),
+            'shortlisted': bool(keep),
+        })
+    return ranking
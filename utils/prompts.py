@@ -0,0 +1,446 @@
+import os
+import re
+import json
+import logging
+from collections import Counter
+from typing import Dict, Any, List, Set, Tuple
+
+from utils.metrics import registry, TOKEN_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+# Bump these whenever the corresponding prompt template changes so that
+# cached results produced by the old prompt are no longer served
+RESUME_PROMPT_VERSION = "resume-v2"
+SENTIMENT_PROMPT_VERSION = "sentiment-v2"
+BULK_SENTIMENT_PROMPT_VERSION = "sentiment-bulk-v1"
+CHUNK_PROMPT_VERSION = "chunk-v1"
+
+RESUME_TOKEN_BUDGET = int(os.environ.get("PROMPT_RESUME_TOKEN_BUDGET", "6000"))
+JOB_DESCRIPTION_TOKEN_BUDGET = int(os.environ.get("PROMPT_JOB_DESCRIPTION_TOKEN_BUDGET", "2000"))
+FEEDBACK_TOKEN_BUDGET = int(os.environ.get("PROMPT_FEEDBACK_TOKEN_BUDGET", "4000"))
+
+# Gemini averages roughly four characters of English text per token
+CHARS_PER_TOKEN = 4
+
+def _compact(example: Dict[str, Any]) -> str:
+    return json.dumps(example, separators=(',', ':'), ensure_ascii=False)
+
+# The static part of each prompt comes first and is byte-identical on every
+# call, so provider-side context caching can reuse it; inputs go last.
+RESUME_PROMPT_PREFIX = f"""You are an expert HR recruiter specializing in tech roles with 15+ years of experience in technical hiring. Analyze the resume against the job description with precision and depth.
+
+Return a valid JSON object with these keys:
+1. extracted_skills (array): all technical skills found in the resume (languages, frameworks, tools, platforms)
+2. matching_skills (array): resume skills that directly match requirements in the job description
+3. missing_skills (array): important skills from the job description that are missing from the resume
+4. experience_summary (string): brief summary of relevant experience (years, roles, achievements)
+5. education_summary (string): brief summary of education (degrees, institutions, relevant certifications)
+6. match_score (number): 0-100, how well the resume matches (skills, experience level, role alignment)
+7. strengths (array): key strengths relevant to this role
+8. weaknesses (array): areas where the candidate falls short of the requirements
+9. overall_assessment (string): 2-3 sentence assessment of fit for the role
+
+Guidelines:
+1. Extract both explicitly stated and implied skills
+2. Consider both technical and soft skills
+3. Weight critical requirements higher than nice-to-have skills in the match score
+4. Judge technologies by both years of experience and depth of usage
+5. Note transferable skills that might compensate for missing requirements
+6. Consider career progression and growth trajectory
+7. Be objective and avoid bias based on company names or educational institutions
+8. Refer to the candidate by name instead of "the candidate"
+
+Example, extensive Java experience but no cloud skills:
+{_compact({
+    "extracted_skills": ["Java", "Spring Boot", "SQL", "Git", "Agile"],
+    "matching_skills": ["Java", "SQL", "Git"],
+    "missing_skills": ["AWS", "Docker", "Kubernetes", "Microservices"],
+    "experience_summary": "5 years of Java development with focus on backend services and monolithic applications",
+    "education_summary": "BS in Computer Science from State University, graduated 2018",
+    "match_score": 65,
+    "strengths": ["Strong Java fundamentals", "Database expertise", "Solid software engineering practices"],
+    "weaknesses": ["No cloud experience", "Limited exposure to microservices architecture", "No CI/CD pipeline experience"],
+    "overall_assessment": "Solid Java developer with good fundamentals but lacking modern cloud-native development experience required for this role. Would need significant upskilling in containerization and cloud services."
+})}
+
+Example, strong cloud skills but limited experience:
+{_compact({
+    "extracted_skills": ["Python", "AWS Lambda", "DynamoDB", "Docker", "Kubernetes", "CI/CD", "React"],
+    "matching_skills": ["AWS", "Python", "Docker", "CI/CD"],
+    "missing_skills": ["Java", "5+ years experience"],
+    "experience_summary": "2 years of experience building serverless applications on AWS",
+    "education_summary": "MS in Computer Engineering from Tech Institute, graduated 2022",
+    "match_score": 75,
+    "strengths": ["Strong cloud-native development skills", "Full-stack capabilities", "Modern tech stack"],
+    "weaknesses": ["Less experience than required", "Missing primary language (Java) for the role"],
+    "overall_assessment": "Promising candidate with excellent cloud skills but less experience than required. Strong technical foundation makes them a good investment despite the experience gap."
+})}
+"""
+
+SENTIMENT_PROMPT_PREFIX = f"""You are an expert HR analyst specializing in employee engagement and retention with 12+ years of experience in workplace analytics. Analyze the employee feedback with nuance and psychological insight.
+
+Return a valid JSON object with these keys:
+1. sentiment_score (number): -1.0 (very negative) to 1.0 (very positive)
+2. primary_sentiment (string): "positive", "negative", "neutral" or "mixed"
+3. key_themes (array): key themes/topics in the feedback
+4. positive_aspects (array): positive aspects mentioned
+5. concerns (array): concerns or issues mentioned
+6. attrition_risk (object): level ("low", "medium", "high") and reasoning (brief explanation)
+7. engagement_recommendations (array): specific recommendations to improve engagement
+8. summary (string): brief summary of the analysis
+
+Guidelines:
+1. Look beyond surface sentiment for underlying emotional patterns and concerns
+2. Treat language indicating intention to leave ("not worth it anymore", "looking for other options") as a strong risk signal
+3. Use the intensity and repetition of concerns to judge their importance
+4. Balance positive and negative elements in the overall score
+5. Make recommendations specific and actionable rather than generic
+6. Identify subtle indicators of disengagement that are not explicitly stated
+7. Consider how long-standing issues versus recent changes affect retention differently
+8. Note mentions of competitors or industry standards as benchmarks
+9. Note conditional language ("if this doesn't change...") as potential retention leverage
+
+Example, mixed feedback with workload concerns:
+{_compact({
+    "sentiment_score": -0.2,
+    "primary_sentiment": "mixed",
+    "key_themes": ["Work-life balance", "Team collaboration", "Career development", "Workload management"],
+    "positive_aspects": ["Supportive team environment", "Learning opportunities", "Interesting projects"],
+    "concerns": ["Excessive overtime expectations", "Understaffing", "Burnout risk", "Unclear promotion criteria"],
+    "attrition_risk": {"level": "medium", "reasoning": "Enjoys the team and learning opportunities but shows signs of burnout and frustration with workload distribution"},
+    "engagement_recommendations": ["Conduct a workload assessment across the team", "Set clearer boundaries for after-hours work", "Create more transparent promotion pathways"],
+    "summary": "Appreciates colleagues and growth opportunities but is struggling with unsustainable workload. Better resource allocation and work-life boundaries would improve retention prospects."
+})}
+
+Example, negative feedback with high attrition risk:
+{_compact({
+    "sentiment_score": -0.8,
+    "primary_sentiment": "negative",
+    "key_themes": ["Compensation", "Management style", "Respect", "Career stagnation"],
+    "positive_aspects": ["Technical skills developed", "Some helpful colleagues"],
+    "concerns": ["Feeling undervalued", "Below-market compensation", "Micromanagement", "Lack of growth opportunities"],
+    "attrition_risk": {"level": "high", "reasoning": "Multiple serious concerns affecting daily work, language suggesting an active job search, few redeeming factors"},
+    "engagement_recommendations": ["Urgent compensation review", "Leadership coaching for direct managers", "Create a growth plan with clear milestones"],
+    "summary": "Highly disengaged and likely seeking other employment. Respect, compensation and management issues need immediate intervention for any chance of retention."
+})}
+"""
+
+BULK_SENTIMENT_PROMPT_PREFIX = f"""You are an expert HR analyst. Analyze each employee feedback comment in the JSON array below independently.
+
+Return ONLY a JSON array with exactly one object per input comment, in any order, each with these keys:
+- id (string): the id of the comment, copied unchanged
+- sentiment_score (number): -1.0 (very negative) to 1.0 (very positive)
+- primary_sentiment (string): "positive", "negative", "neutral" or "mixed"
+- key_themes (array): 1-4 short topic labels in Title Case, e.g. "Workload", "Compensation", "Career Growth"
+- concerns (array): up to 3 short concerns, empty if none
+- attrition_risk (object): {{"level": "low" | "medium" | "high"}}; treat intent-to-leave language ("looking for other options", "not worth it anymore") as high
+
+Example output for two comments:
+[{_compact({"id": "a1", "sentiment_score": 0.6, "primary_sentiment": "positive", "key_themes": ["Team Culture"], "concerns": [], "attrition_risk": {"level": "low"}})},{_compact({"id": "a2", "sentiment_score": -0.7, "primary_sentiment": "negative", "key_themes": ["Compensation", "Management"], "concerns": ["Below-market pay"], "attrition_risk": {"level": "high"}})}]
+"""
+
+# Merge prompts see only the per-chunk results, never the document itself,
+# so they stay small no matter how long the input was
+RESUME_MERGE_PROMPT_PREFIX = """You are an expert HR recruiter. A long resume was split into parts and each part was analyzed separately against the job description. Combine the partial analyses below into one assessment of the whole candidate.
+
+Return ONLY a JSON object with these keys:
+- match_score (number): 0-100 for the whole resume; a skill or experience shown in any part counts
+- experience_summary (string): one or two sentences covering all parts
+- education_summary (string): one sentence
+- strengths (array): up to 5, without duplicates
+- weaknesses (array): up to 5; drop weaknesses another part contradicts
+- overall_assessment (string): two or three sentences
+"""
+
+SENTIMENT_MERGE_PROMPT_PREFIX = """You are an expert HR analyst. A long employee feedback document was split into parts and each part was analyzed separately. Combine the partial analyses below.
+
+Return ONLY a JSON object with these keys:
+- sentiment_score (number): -1.0 to 1.0 for the whole document, weighing longer parts more
+- key_themes (array): up to 6 themes, merging ones that mean the same thing
+- summary (string): brief summary of the whole document
+"""
+
+# Resume sections that never affect a screening decision
+_DROPPED_SECTIONS = {
+    'references', 'referees', 'hobbies', 'interests', 'hobbies and interests', 'hobbies & interests',
+    'personal details', 'personal information', 'personal data', 'declaration',
+}
+_KEPT_SECTIONS = {
+    'summary', 'profile', 'professional summary', 'objective', 'career objective', 'experience',
+    'work experience', 'professional experience', 'employment history', 'work history', 'education',
+    'skills', 'technical skills', 'core competencies', 'projects', 'certifications', 'certificates',
+    'publications', 'awards', 'achievements', 'languages', 'volunteer experience', 'training', 'courses',
+}
+_BOILERPLATE_LINE = re.compile(
+    r'^(references (are )?available (up)?on request\.?|page \d+( of \d+)?|curriculum vitae|resume)$', re.IGNORECASE
+)
+# Lines this close to the top or bottom of a page are header/footer candidates
+RUNNING_LINE_DEPTH = 2
+_BULLETS = ('-', '*', '\u2022', '\u00b7', '\u25aa', '\u25cf', '\u25e6', '\u2013')
+_HORIZONTAL_SPACE = re.compile(r'[ \t\u00a0\u200b]+')
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count used for budgeting before a request is sent
+
+    Args:
+        text (str): Prompt text
+
+    Returns:
+        int: Estimated token count
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def _section_name(line: str) -> str:
+    return line.strip().rstrip(':').strip().lower() if len(line) <= 40 else ''
+
+def _clean_lines(text: str) -> List[str]:
+    # Collapse PDF extraction whitespace and drop empty-line runs
+    lines = []
+    for raw in (text or '').splitlines():
+        line = _HORIZONTAL_SPACE.sub(' ', raw).strip()
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+def _truncate(lines: List[str], max_tokens: int) -> Tuple[str, bool]:
+    text = '\n'.join(lines)
+    if estimate_tokens(text) <= max_tokens:
+        return text, False
+    limit = max_tokens * CHARS_PER_TOKEN
+    cut = text.rfind('\n', 0, limit)
+    return text[:cut if cut > limit // 2 else limit], True
+
+def _running_lines(text: str) -> Set[str]:
+    # Running headers/footers: mid-length, non-bullet lines at the top or bottom of most pages (PDF pages are split by \f)
+    pages = [page for page in (_clean_lines(page) for page in (text or '').split('\f')) if page]
+    if len(pages) < 2:
+        return set()
+    edges = Counter()
+    for page in pages:
+        content = [line for line in page if line]
+        edges.update({
+            line for line in content[:RUNNING_LINE_DEPTH] + content[-RUNNING_LINE_DEPTH:]
+            if 15 <= len(line) <= 80 and not line.startswith(_BULLETS)
+        })
+    return {line for line, count in edges.items() if count >= 2 and count * 2 >= len(pages)}
+
+def trim_resume(text: str, max_tokens: int = RESUME_TOKEN_BUDGET, truncate: bool = True) -> str:
+    """
+    Shrink resume text to what matters for screening, within a token budget
+
+    Collapses the whitespace PDF extraction leaves behind and drops
+    boilerplate sections (references, hobbies, personal details). If the
+    text is still over budget, repeats of the running headers and footers
+    found at page boundaries go next, then the text is cut at a line
+    boundary.
+
+    Args:
+        text (str): Extracted resume text
+        max_tokens (int): Token budget for the resume
+        truncate (bool): Cut the text to the budget; chunked analyses split it instead
+
+    Returns:
+        str: Trimmed resume text
+    """
+    kept: List[str] = []
+    dropping = False
+    for line in _clean_lines(text):
+        name = _section_name(line)
+        if name in _DROPPED_SECTIONS:
+            dropping = True
+            continue
+        if name in _KEPT_SECTIONS:
+            dropping = False
+        if dropping or _BOILERPLATE_LINE.match(line):
+            continue
+        if not line and kept and not kept[-1]:
+            continue
+        kept.append(line)
+
+    if estimate_tokens('\n'.join(kept)) > max_tokens:
+        repeated = _running_lines(text)
+        if repeated:
+            seen = set()
+            deduplicated: List[str] = []
+            for line in kept:
+                if line in repeated:
+                    if line in seen:
+                        continue
+                    seen.add(line)
+                if not line and deduplicated and not deduplicated[-1]:
+                    continue
+                deduplicated.append(line)
+            kept = deduplicated
+
+    if not truncate:
+        return '\n'.join(kept)
+    trimmed, truncated = _truncate(kept, max_tokens)
+    if truncated:
+        logger.info(f"Resume truncated to the {max_tokens} token budget")
+    return trimmed
+
+def clean_text(text: str) -> str:
+    """
+    Collapse extraction whitespace and blank-line runs without cutting anything
+
+    Args:
+        text (str): Free text
+
+    Returns:
+        str: Cleaned text, one logical line per line
+    """
+    return '\n'.join(_clean_lines(text))
+
+def is_resume_section(line: str) -> bool:
+    """
+    Tell whether a line is a known resume section heading such as "Experience:"
+
+    Args:
+        line (str): One line of text
+
+    Returns:
+        bool: True for headings of sections kept or dropped by trim_resume
+    """
+    name = _section_name(line)
+    return name in _KEPT_SECTIONS or name in _DROPPED_SECTIONS
+
+def trim_text(text: str, max_tokens: int) -> str:
+    """
+    Collapse whitespace and cut free text to a token budget
+
+    Args:
+        text (str): Job description or feedback text
+        max_tokens (int): Token budget
+
+    Returns:
+        str: Trimmed text
+    """
+    return _truncate(_clean_lines(text), max_tokens)[0]
+
+def _report(kind: str, prefix: str, raw_input: str, prompt: str) -> None:
+    # Estimated prompt size per request, and how many input tokens trimming removed
+    sent = estimate_tokens(prompt)
+    saved = estimate_tokens(raw_input) - (sent - estimate_tokens(prefix))
+    labels = (('prompt', kind),)
+    registry.histogram('tatviq_prompt_tokens_estimated', labels, TOKEN_BUCKETS).observe(sent)
+    if saved > 0:
+        registry.inc('tatviq_prompt_tokens_trimmed_total', saved, labels)
+    logger.info(f"{kind} prompt: ~{sent} tokens, trimming removed ~{max(saved, 0)}")
+
+def build_resume_prompt(resume_text: str, job_description: str) -> str:
+    """
+    Build the resume analysis prompt: static prefix, then the trimmed inputs
+
+    Args:
+        resume_text (str): Extracted text from resume
+        job_description (str): Job description text
+
+    Returns:
+        str: Prompt text
+    """
+    prompt = (f"{RESUME_PROMPT_PREFIX}\nJOB DESCRIPTION:\n{trim_text(job_description, JOB_DESCRIPTION_TOKEN_BUDGET)}"
+              f"\n\nRESUME:\n{trim_resume(resume_text)}\n")
+    _report('resume', RESUME_PROMPT_PREFIX, resume_text + job_description, prompt)
+    return prompt
+
+def build_sentiment_prompt(feedback_text: str) -> str:
+    """
+    Build the sentiment analysis prompt: static prefix, then the trimmed feedback
+
+    Args:
+        feedback_text (str): Employee feedback text
+
+    Returns:
+        str: Prompt text
+    """
+    prompt = f"{SENTIMENT_PROMPT_PREFIX}\nEMPLOYEE FEEDBACK:\n{trim_text(feedback_text, FEEDBACK_TOKEN_BUDGET)}\n"
+    _report('sentiment', SENTIMENT_PROMPT_PREFIX, feedback_text, prompt)
+    return prompt
+
+def build_resume_chunk_prompt(chunk: str, job_description: str, part: int, parts: int) -> str:
+    """
+    Build the resume prompt for one part of a long resume
+
+    The static prefix is the single-resume one, so provider-side caching still applies.
+
+    Args:
+        chunk (str): Cleaned resume part, within RESUME_TOKEN_BUDGET
+        job_description (str): Job description text
+        part (int): 1-based part number
+        parts (int): Number of parts
+
+    Returns:
+        str: Prompt text
+    """
+    prompt = (f"{RESUME_PROMPT_PREFIX}\nJOB DESCRIPTION:\n{trim_text(job_description, JOB_DESCRIPTION_TOKEN_BUDGET)}"
+              f"\n\nRESUME (part {part} of {parts}; other parts are analyzed separately, judge only what this part shows):"
+              f"\n{trim_text(chunk, RESUME_TOKEN_BUDGET)}\n")
+    _report('resume_chunk', RESUME_PROMPT_PREFIX, chunk + job_description, prompt)
+    return prompt
+
+def build_sentiment_chunk_prompt(chunk: str, part: int, parts: int) -> str:
+    """
+    Build the sentiment prompt for one part of a long feedback document
+
+    Args:
+        chunk (str): Feedback part, within FEEDBACK_TOKEN_BUDGET
+        part (int): 1-based part number
+        parts (int): Number of parts
+
+    Returns:
+        str: Prompt text
+    """
+    prompt = (f"{SENTIMENT_PROMPT_PREFIX}\nEMPLOYEE FEEDBACK (part {part} of {parts}; other parts are analyzed separately):"
+              f"\n{trim_text(chunk, FEEDBACK_TOKEN_BUDGET)}\n")
+    _report('sentiment_chunk', SENTIMENT_PROMPT_PREFIX, chunk, prompt)
+    return prompt
+
+def build_resume_merge_prompt(job_description: str, partials: List[Dict[str, Any]]) -> str:
+    """
+    Build the prompt that combines per-part resume analyses
+
+    Args:
+        job_description (str): Job description text
+        partials (List[Dict[str, Any]]): Analysis per resume part, skill lists left out
+
+    Returns:
+        str: Prompt text
+    """
+    prompt = (f"{RESUME_MERGE_PROMPT_PREFIX}\nJOB DESCRIPTION:\n{trim_text(job_description, JOB_DESCRIPTION_TOKEN_BUDGET)}"
+              f"\n\nPARTIAL ANALYSES:\n{json.dumps(partials, ensure_ascii=False)}\n")
+    _report('resume_merge', RESUME_MERGE_PROMPT_PREFIX, '', prompt)
+    return prompt
+
+def build_sentiment_merge_prompt(partials: List[Dict[str, Any]]) -> str:
+    """
+    Build the prompt that combines per-part sentiment analyses
+
+    Args:
+        partials (List[Dict[str, Any]]): Analysis per feedback part, with its token count
+
+    Returns:
+        str: Prompt text
+    """
+    prompt = f"{SENTIMENT_MERGE_PROMPT_PREFIX}\nPARTIAL ANALYSES:\n{json.dumps(partials, ensure_ascii=False)}\n"
+    _report('sentiment_merge', SENTIMENT_MERGE_PROMPT_PREFIX, '', prompt)
+    return prompt
+
+def build_bulk_sentiment_prompt(items: List[Dict[str, str]]) -> str:
+    """
+    Build a packed multi-comment sentiment prompt
+
+    Args:
+        items (List[Dict[str, str]]): Comments as {"id": ..., "text": ...}
+
+    Returns:
+        str: Prompt text
+    """
+    packed = json.dumps([{"id": item['id'], "text": trim_text(item['text'], FEEDBACK_TOKEN_BUDGET)} for item in items],
+                        ensure_ascii=False)
+    prompt = f"{BULK_SENTIMENT_PROMPT_PREFIX}\nCOMMENTS:\n{packed}\n"
+    _report('sentiment_bulk', BULK_SENTIMENT_PROMPT_PREFIX, ''.join(item['text'] for item in items), prompt)
+    return prompt
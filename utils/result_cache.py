@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Default cache settings, overridable through environment variables
+DEFAULT_MEMORY_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "512"))
+DEFAULT_TTL_SECONDS = float(os.environ.get("RESULT_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_DB_PATH = os.environ.get(
+    "RESULT_CACHE_PATH", os.path.join(tempfile.gettempdir(), "tatviq_result_cache.sqlite3")
+)
+CACHE_ENABLED = os.environ.get("RESULT_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+# Expired rows are swept from the shared store once every this many writes
+PURGE_EVERY_WRITES = 100
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text before hashing so that whitespace-only differences
+    (re-extracted PDFs, pasted text) map to the same cache entry
+
+    Args:
+        text (str): Raw text
+
+    Returns:
+        str: Text with collapsed whitespace
+    """
+    return ' '.join((text or '').split())
+
+def content_digest(text: str) -> str:
+    """
+    Compute the SHA-256 digest of normalized text
+
+    Args:
+        text (str): Raw text
+
+    Returns:
+        str: Hex digest of the normalized text
+    """
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+def key_from_digests(namespace: str, model: str, prompt_version: str, digests: Iterable[str]) -> str:
+    """
+    Build a cache key from precomputed content digests
+
+    Args:
+        namespace (str): Analysis type, e.g. "resume" or "sentiment"
+        model (str): Model name used for the analysis
+        prompt_version (str): Version tag of the prompt template
+        digests (Iterable[str]): Content digests of the analysis inputs
+
+    Returns:
+        str: Hex cache key
+    """
+    material = '\x1f'.join([namespace, model, prompt_version, *digests])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+def make_cache_key(namespace: str, model: str, prompt_version: str, *parts: str) -> str:
+    """
+    Build a content-addressed cache key for an analysis request
+
+    Args:
+        namespace (str): Analysis type, e.g. "resume" or "sentiment"
+        model (str): Model name used for the analysis
+        prompt_version (str): Version tag of the prompt template
+        *parts (str): Input texts (resume text, job description, feedback...)
+
+    Returns:
+        str: Hex cache key
+    """
+    return key_from_digests(namespace, model, prompt_version, [content_digest(p) for p in parts])
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with a size bound and per-entry TTL
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MEMORY_SIZE, ttl: float = DEFAULT_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                self.evictions += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class SQLiteStore:
+    """
+    On-disk key/value store shared by every worker process on the host
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, ttl: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self.evictions = 0
+        self.writes = 0
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS results ("
+                        "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                    )
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._connect()
+        row = conn.execute("SELECT value, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at < time.time():
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self.evictions += 1
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._connect().execute(
+            "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), expires_at)
+        )
+        self.writes += 1
+        if self.writes % PURGE_EVERY_WRITES == 0:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        cursor = self._connect().execute("DELETE FROM results WHERE expires_at < ?", (time.time(),))
+        self.evictions += cursor.rowcount
+        return cursor.rowcount
+
+class ResultCache:
+    """
+    Two-tier analysis result cache: an in-process LRU in front of a shared
+    SQLite store. Disk errors are logged and treated as misses so that the
+    cache can never break an analysis request.
+
+    The memory tier holds encoded JSON, so every hit is a fresh copy that
+    callers may annotate without touching the cached entry.
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteStore] = None):
+        self.memory = memory
+        self.disk = disk
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        encoded = self.memory.get(key)
+        if encoded is not None:
+            with self._lock:
+                self.memory_hits += 1
+            return json.loads(encoded)
+
+        if self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"Result cache read failed: {str(e)}")
+                value = None
+            if value is not None:
+                self.memory.set(key, json.dumps(value))
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, json.dumps(value))
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except sqlite3.Error as e:
+                logger.warning(f"Result cache write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss/eviction counters for monitoring
+
+        Returns:
+            Dict[str, Any]: Cache counters
+        """
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_evictions": self.memory.evictions,
+            "disk_evictions": self.disk.evictions if self.disk is not None else 0,
+            "memory_entries": len(self.memory),
+        }
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Return the process-wide result cache, creating it on first use
+
+    Returns:
+        Optional[ResultCache]: The shared cache, or None when caching is disabled
+    """
+    global _result_cache
+    if not CACHE_ENABLED:
+        return None
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(
+                    LRUCache(DEFAULT_MEMORY_SIZE, DEFAULT_TTL_SECONDS),
+                    SQLiteStore(DEFAULT_DB_PATH, DEFAULT_TTL_SECONDS)
+                )
+    return _result_cache
@@ -1,52 +1,253 @@
+import io
 import os
+import re
 import logging
-from PyPDF2 import PdfReader
-import docx
+import zipfile
+import threading
+import multiprocessing
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils.metrics import stage
 
 logger = logging.getLogger(__name__)
 
+# Limits that stop runaway documents from stalling a worker
+MAX_PDF_BYTES = int(os.environ.get("MAX_PDF_BYTES", 16 * 1024 * 1024))
+MAX_PDF_PAGES = int(os.environ.get("MAX_PDF_PAGES", "60"))
+
+# PDFs with at least this many pages are split across a process pool
+PARALLEL_PAGE_THRESHOLD = int(os.environ.get("PDF_PARALLEL_PAGE_THRESHOLD", "8"))
+PDF_PROCESS_WORKERS = int(os.environ.get("PDF_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Pool workers must never be forked from a threaded web worker, which can copy locks held by other threads
+PDF_POOL_START_METHOD = os.environ.get("PDF_POOL_START_METHOD", "forkserver")
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+# WordprocessingML tags used by the streaming DOCX extractor
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_P, _W_R, _W_T = _W + 'p', _W + 'r', _W + 't'
+_W_TAB, _W_BR, _W_CR = _W + 'tab', _W + 'br', _W + 'cr'
+_W_TR, _W_TC = _W + 'tr', _W + 'tc'
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+_DOCX_HEADER_PART = re.compile(r'^word/header\d*\.xml$')
+_DOCX_FOOTER_PART = re.compile(r'^word/footer\d*\.xml$')
+
 def extract_text_from_pdf(pdf_path):
     """
     Extract text content from a PDF file
     
+    Large documents have their pages fanned out to a process pool. Size and
+    page-count caps reject runaway documents before any page is parsed.
+    
     Args:
-        pdf_path (str): Path to the PDF file
+        pdf_path (str | file-like): Path to the PDF file or a binary stream
         
     Returns:
         str: Extracted text from the PDF
     """
     try:
-        text = ""
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PdfReader(file)
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text()
-        return text
+        with stage('upload_read'):
+            if hasattr(pdf_path, 'read'):
+                data = pdf_path.read(MAX_PDF_BYTES + 1)
+            else:
+                with open(pdf_path, 'rb') as file:
+                    data = file.read(MAX_PDF_BYTES + 1)
+        if len(data) > MAX_PDF_BYTES:
+            raise ValueError(f"PDF exceeds the {MAX_PDF_BYTES // (1024 * 1024)}MB size limit")
+        
+        with stage('extract_pdf'):
+            # PyPDF2 is imported on first use to keep app start-up fast
+            from PyPDF2 import PdfReader
+            page_count = len(PdfReader(io.BytesIO(data)).pages)
+            if page_count > MAX_PDF_PAGES:
+                raise ValueError(f"PDF has {page_count} pages, the limit is {MAX_PDF_PAGES}")
+            
+            if page_count >= PARALLEL_PAGE_THRESHOLD and PDF_PROCESS_WORKERS > 1:
+                pages = _extract_pages_parallel(data, page_count)
+            else:
+                pages = _extract_page_range(data, 0, page_count)
+            # Pages are separated by form feeds so running headers and footers can be told apart from body text
+            return '\f'.join(pages)
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         raise Exception(f"Failed to extract text from PDF: {str(e)}")
 
+def _extract_page_range(data, start, stop):
+    # Runs inside pool workers, so it re-opens the document from raw bytes
+    from PyPDF2 import PdfReader
+    pdf_reader = PdfReader(io.BytesIO(data))
+    return [pdf_reader.pages[page_num].extract_text() or '' for page_num in range(start, stop)]
+
+def start_process_pool():
+    """
+    Create the PDF page pool, if parallel extraction is enabled
+
+    Called from the gunicorn post_fork hook, before the worker starts its
+    request threads; otherwise the pool is created on first use.
+
+    Returns:
+        ProcessPoolExecutor | None: The shared pool
+    """
+    if PDF_PROCESS_WORKERS <= 1:
+        return None
+    return _get_process_pool()
+
+def _get_process_pool():
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                if PDF_POOL_START_METHOD in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context(PDF_POOL_START_METHOD)
+                else:
+                    context = multiprocessing.get_context('spawn')
+                if context.get_start_method() == 'forkserver':
+                    # Pool workers fork from a server that has already imported the parser
+                    context.set_forkserver_preload(['PyPDF2', __name__])
+                _process_pool = ProcessPoolExecutor(max_workers=PDF_PROCESS_WORKERS, mp_context=context)
+    return _process_pool
+
+def _extract_pages_parallel(data, page_count):
+    chunk_size = -(-page_count // PDF_PROCESS_WORKERS)
+    ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+    try:
+        pool = _get_process_pool()
+        futures = [pool.submit(_extract_page_range, data, start, stop) for start, stop in ranges]
+        return [text for future in futures for text in future.result()]
+    except BrokenProcessPool:
+        global _process_pool
+        logger.warning("PDF process pool is broken, extracting pages serially")
+        _process_pool = None
+        return _extract_page_range(data, 0, page_count)
+
+def iter_docx_text(docx_path):
+    """
+    Stream text out of a DOCX file without building the python-docx object model
+    
+    Headers, the document body and footers are read from the zip with an
+    incremental XML parser. Paragraphs are yielded in reading order; table
+    rows are yielded as tab-separated cells and text-box content is kept.
+    
+    Args:
+        docx_path (str | file-like): Path to the DOCX file or a binary stream
+        
+    Yields:
+        str: Non-empty paragraphs and table rows
+    """
+    with zipfile.ZipFile(docx_path) as archive:
+        names = archive.namelist()
+        headers = sorted(n for n in names if _DOCX_HEADER_PART.match(n))
+        footers = sorted(n for n in names if _DOCX_FOOTER_PART.match(n))
+        
+        # The same header/footer text usually repeats across first/even/default parts
+        seen = set()
+        for part in headers:
+            for text in _iter_docx_part(archive, part):
+                if text not in seen:
+                    seen.add(text)
+                    yield text
+        yield from _iter_docx_part(archive, 'word/document.xml')
+        for part in footers:
+            for text in _iter_docx_part(archive, part):
+                if text not in seen:
+                    seen.add(text)
+                    yield text
+
+def _iter_docx_part(archive, part):
+    paragraphs = []  # text pieces of every open paragraph (text boxes nest)
+    cells = []  # paragraphs of every open table cell (tables nest)
+    rows = []  # cells of every open table row
+    run_depth = 0
+    fallback_depth = 0
+    
+    with archive.open(part) as stream:
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == _MC_FALLBACK:
+                    fallback_depth += 1
+                elif fallback_depth:
+                    continue
+                elif tag == _W_P:
+                    paragraphs.append([])
+                elif tag == _W_R:
+                    run_depth += 1
+                elif tag == _W_TC:
+                    cells.append([])
+                elif tag == _W_TR:
+                    rows.append([])
+                continue
+            
+            if tag == _MC_FALLBACK:
+                # Legacy VML copy of content already read from mc:Choice
+                fallback_depth -= 1
+                elem.clear()
+                continue
+            if fallback_depth:
+                continue
+            
+            text = None
+            if tag == _W_T:
+                if paragraphs:
+                    paragraphs[-1].append(elem.text or '')
+            elif tag == _W_R:
+                run_depth -= 1
+            elif run_depth and paragraphs and tag == _W_TAB:
+                paragraphs[-1].append('\t')
+            elif run_depth and paragraphs and tag in (_W_BR, _W_CR):
+                paragraphs[-1].append('\n')
+            elif tag == _W_P:
+                text = ''.join(paragraphs.pop()).strip()
+            elif tag == _W_TC:
+                cell = ' '.join(cells.pop())
+                if rows:
+                    rows[-1].append(cell)
+            elif tag == _W_TR:
+                text = '\t'.join(rows.pop()).strip()
+            elem.clear()
+            
+            if text:
+                if cells:
+                    cells[-1].append(text)
+                else:
+                    yield text
+
 def extract_text_from_docx(docx_path):
     """
     Extract text content from a DOCX file
     
+    Uses the streaming extractor and only falls back to python-docx when the
+    package cannot be read directly.
+    
     Args:
-        docx_path (str): Path to the DOCX file
+        docx_path (str | file-like): Path to the DOCX file or a binary stream
         
     Returns:
         str: Extracted text from the DOCX
     """
     try:
-        doc = docx.Document(docx_path)
-        full_text = []
-        for para in doc.paragraphs:
-            full_text.append(para.text)
-        return '\n'.join(full_text)
+        with stage('extract_docx'):
+            try:
+                return '\n'.join(iter_docx_text(docx_path))
+            except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+                logger.warning(f"Streaming DOCX extraction failed ({str(e)}), falling back to python-docx")
+                if hasattr(docx_path, 'seek'):
+                    docx_path.seek(0)
+                return _extract_docx_with_python_docx(docx_path)
     except Exception as e:
         logger.error(f"Error extracting text from DOCX: {str(e)}")
         raise Exception(f"Failed to extract text from DOCX: {str(e)}")
 
+def _extract_docx_with_python_docx(docx_path):
+    import docx
+    doc = docx.Document(docx_path)
+    full_text = []
+    for para in doc.paragraphs:
+        full_text.append(para.text)
+    return '\n'.join(full_text)
+
 def parse_resume(file_path):
     """
     Parse resume file based on file extension
@@ -65,3 +266,23 @@ def parse_resume(file_path):
         return extract_text_from_docx(file_path)
     else:
         raise ValueError(f"Unsupported file format: {file_ext}")
+
+def extract_text_from_bytes(filename, data):
+    """
+    Extract resume text from an in-memory upload based on its file name
+    
+    Args:
+        filename (str): Original file name, used to pick the extractor
+        data (bytes): Raw file content
+        
+    Returns:
+        str: Extracted text from the resume
+    """
+    file_ext = os.path.splitext(filename)[1].lower()
+    
+    if file_ext == '.pdf':
+        return extract_text_from_pdf(io.BytesIO(data))
+    elif file_ext == '.docx':
+        return extract_text_from_docx(io.BytesIO(data))
+    else:
+        raise ValueError(f"Unsupported file format: {file_ext}")
@@ -0,0 +1,413 @@
+import os
+import json
+import math
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Trend settings, overridable through environment variables
+TRENDS_ENABLED = os.environ.get("SENTIMENT_TRENDS_ENABLED", "1").lower() not in ("0", "false", "no")
+TRENDS_DB_PATH = os.environ.get(
+    "SENTIMENT_TRENDS_DB_PATH", os.path.join(tempfile.gettempdir(), "tatviq_sentiment_trends.sqlite3")
+)
+# Themes tracked per period; counts are exact while a period has fewer distinct themes than this
+THEME_CAPACITY = int(os.environ.get("SENTIMENT_TRENDS_THEME_CAPACITY", "32"))
+# Histogram bins over the [-1, 1] score range, quantiles are accurate to half a bin
+SCORE_BINS = 40
+# Most points a series ever has, so every dashboard query reads a bounded number of rows
+MAX_POINTS = 60
+# Longest span a series covers, two years of weekly feedback
+MAX_WEEKS = 104
+MAX_TEAMS = 200
+MAX_TEAM_LENGTH = 64
+
+ALL_TEAMS = '*'
+UNASSIGNED = 'Unassigned'
+GRANULARITIES = ('week', 'month')
+RISK_LEVELS = ('low', 'medium', 'high')
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+def normalize_team(team: Optional[str]) -> str:
+    """
+    Canonical team name, so "platform " and "Platform" land in the same series
+
+    Args:
+        team (Optional[str]): Team as entered or exported
+
+    Returns:
+        str: Team name, or UNASSIGNED when empty
+    """
+    team = ' '.join(str(team or '').split())[:MAX_TEAM_LENGTH]
+    if not team or team == ALL_TEAMS:
+        return UNASSIGNED
+    return team if any(c.isupper() for c in team) else team.title()
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+def next_period(start: date, granularity: str) -> date:
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+class TrendBucket:
+    """
+    Mergeable aggregates of the sentiment results in one team and period
+
+    Keeps counts, a score sum for the mean, a fixed-bin score histogram for
+    quantiles and a Space-Saving heavy-hitters sketch of key themes. The
+    sketch holds at most THEME_CAPACITY themes; each entry is
+    [count, error] where count overestimates the true count by at most
+    error, so the top themes are always found and their counts are exact
+    until the capacity is exceeded.
+    """
+
+    __slots__ = ('count', 'scored', 'score_sum', 'risk', 'histogram', 'themes')
+
+    def __init__(self):
+        self.count = 0
+        self.scored = 0
+        self.score_sum = 0.0
+        self.risk = {level: 0 for level in (*RISK_LEVELS, 'unknown')}
+        self.histogram = [0] * SCORE_BINS
+        self.themes: Dict[str, List[int]] = {}
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.count += 1
+        try:
+            score = float(result.get('sentiment_score'))
+        except (TypeError, ValueError):
+            score = None
+        if score is not None and not math.isnan(score):
+            score = min(1.0, max(-1.0, score))
+            self.scored += 1
+            self.score_sum += score
+            self.histogram[min(SCORE_BINS - 1, int((score + 1) / 2 * SCORE_BINS))] += 1
+        risk = result.get('attrition_risk')
+        level = str(risk.get('level', '')).lower() if isinstance(risk, dict) else ''
+        self.risk[level if level in RISK_LEVELS else 'unknown'] += 1
+        for theme in {theme.strip().title() for theme in result.get('key_themes') or []
+                      if isinstance(theme, str) and theme.strip()}:
+            self._count_theme(theme)
+
+    def _count_theme(self, theme: str) -> None:
+        entry = self.themes.get(theme)
+        if entry is not None:
+            entry[0] += 1
+        elif len(self.themes) < THEME_CAPACITY:
+            self.themes[theme] = [1, 0]
+        else:
+            # Space-Saving: the new theme takes over the smallest counter
+            smallest = min(self.themes, key=lambda name: self.themes[name][0])
+            floor = self.themes.pop(smallest)[0]
+            self.themes[theme] = [floor + 1, floor]
+
+    def merge(self, other: "TrendBucket") -> None:
+        self.count += other.count
+        self.scored += other.scored
+        self.score_sum += other.score_sum
+        for level, count in other.risk.items():
+            self.risk[level] = self.risk.get(level, 0) + count
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+        # A theme missing from a full sketch may still have occurred up to its smallest count
+        own_floor = min((entry[0] for entry in self.themes.values()), default=0) \
+            if len(self.themes) >= THEME_CAPACITY else 0
+        other_floor = min((entry[0] for entry in other.themes.values()), default=0) \
+            if len(other.themes) >= THEME_CAPACITY else 0
+        merged = {}
+        for theme in set(self.themes) | set(other.themes):
+            own = self.themes.get(theme, [own_floor, own_floor])
+            theirs = other.themes.get(theme, [other_floor, other_floor])
+            merged[theme] = [own[0] + theirs[0], own[1] + theirs[1]]
+        self.themes = dict(sorted(merged.items(), key=lambda item: (-item[1][0], item[0]))[:THEME_CAPACITY])
+
+    def quantile(self, q: float) -> Optional[float]:
+        # Interpolate inside the bin that holds the q-th score
+        if not self.scored:
+            return None
+        target = q * self.scored
+        seen = 0
+        width = 2 / SCORE_BINS
+        for number, count in enumerate(self.histogram):
+            if count and seen + count >= target:
+                return round(-1 + width * (number + (target - seen) / count), 4)
+            seen += count
+        return 1.0
+
+    def top_themes(self, limit: int = 10) -> List[Dict[str, Any]]:
+        ranked = sorted(self.themes.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+        return [{'theme': theme, 'count': count, 'error': error} for theme, (count, error) in ranked]
+
+    @property
+    def mean_score(self) -> Optional[float]:
+        return round(self.score_sum / self.scored, 4) if self.scored else None
+
+    def to_row(self) -> Tuple:
+        return (self.count, self.scored, self.score_sum, json.dumps(self.risk),
+                json.dumps(self.histogram), json.dumps(self.themes))
+
+    @classmethod
+    def from_row(cls, row: Iterable) -> "TrendBucket":
+        bucket = cls()
+        count, scored, score_sum, risk, histogram, themes = row
+        bucket.count, bucket.scored, bucket.score_sum = count, scored, score_sum
+        bucket.risk.update(json.loads(risk))
+        bucket.histogram = json.loads(histogram)
+        bucket.themes = json.loads(themes)
+        return bucket
+
+class SentimentTrends:
+    """
+    Week and month rollups of sentiment results per team, kept in SQLite
+
+    Every recorded result is folded into its team's bucket and the all-teams
+    bucket for both granularities inside one write transaction, so reads
+    never touch raw analyses and the store is shared by every worker
+    process. A series query reads at most MAX_POINTS rows through the
+    primary key, however much history has been recorded.
+    """
+
+    def __init__(self, db_path: str = TRENDS_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS rollups ("
+                        "team TEXT NOT NULL, granularity TEXT NOT NULL, period TEXT NOT NULL, "
+                        "count INTEGER NOT NULL, scored INTEGER NOT NULL, score_sum REAL NOT NULL, "
+                        "risk TEXT NOT NULL, histogram TEXT NOT NULL, themes TEXT NOT NULL, "
+                        "PRIMARY KEY (team, granularity, period)) WITHOUT ROWID"
+                    )
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS teams ("
+                        "team TEXT PRIMARY KEY, count INTEGER NOT NULL, last_seen REAL NOT NULL)"
+                    )
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    def record(self, result: Dict[str, Any], team: Optional[str] = None, at: Optional[datetime] = None) -> None:
+        """
+        Fold one sentiment result into the rollups
+
+        Args:
+            result (Dict[str, Any]): Sentiment analysis result
+            team (Optional[str]): Team the feedback came from
+            at (Optional[datetime]): When the feedback was analyzed, defaults to now (UTC)
+        """
+        self.record_many([(result, team, at)])
+
+    def record_many(self, items: Iterable[Tuple[Dict[str, Any], Optional[str], Optional[datetime]]]) -> int:
+        """
+        Fold many sentiment results into the rollups in one transaction
+
+        Results are aggregated in memory first, so a bulk upload costs one
+        read-modify-write per touched bucket rather than per result. Degraded
+        and provisional results come from the local fallback scorer, not
+        Gemini, and are left out so they do not skew the trends.
+
+        Args:
+            items (Iterable[Tuple[Dict[str, Any], Optional[str], Optional[datetime]]]): (result, team, analyzed at)
+
+        Returns:
+            int: Number of results recorded
+        """
+        buckets: Dict[Tuple[str, str, str], TrendBucket] = {}
+        team_counts: Dict[str, int] = {}
+        recorded = 0
+        for result, team, at in items:
+            if result.get('degraded') or result.get('provisional'):
+                continue
+            team = normalize_team(team)
+            day = (at or datetime.utcnow()).date()
+            team_counts[team] = team_counts.get(team, 0) + 1
+            for granularity in GRANULARITIES:
+                period = period_start(day, granularity).isoformat()
+                for key in ((team, granularity, period), (ALL_TEAMS, granularity, period)):
+                    buckets.setdefault(key, TrendBucket()).add(result)
+            recorded += 1
+        if not recorded:
+            return 0
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for key, bucket in buckets.items():
+                row = conn.execute(
+                    "SELECT count, scored, score_sum, risk, histogram, themes FROM rollups "
+                    "WHERE team = ? AND granularity = ? AND period = ?", key
+                ).fetchone()
+                if row is not None:
+                    stored = TrendBucket.from_row(row)
+                    stored.merge(bucket)
+                    bucket = stored
+                conn.execute("INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             (*key, *bucket.to_row()))
+            now = time.time()
+            conn.executemany(
+                "INSERT INTO teams (team, count, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT(team) DO UPDATE SET count = count + excluded.count, last_seen = excluded.last_seen",
+                [(team, count, now) for team, count in team_counts.items()]
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return recorded
+
+    def teams(self) -> List[Dict[str, Any]]:
+        """
+        Return the teams with recorded feedback, busiest first
+
+        Returns:
+            List[Dict[str, Any]]: {"team", "count"} per team, at most MAX_TEAMS
+        """
+        rows = self._connect().execute(
+            "SELECT team, count FROM teams ORDER BY count DESC, team LIMIT ?", (MAX_TEAMS,)
+        ).fetchall()
+        return [{'team': team, 'count': count} for team, count in rows]
+
+    def series(self, team: Optional[str] = None, weeks: int = 26, granularity: str = 'auto',
+               top_themes: int = 5, until: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Build chart-ready series for the periods covering the last ``weeks`` weeks
+
+        Spans longer than MAX_POINTS weeks are served from the monthly
+        rollups, so a series never has more than MAX_POINTS points. Periods
+        without feedback are filled with zero counts and null scores.
+
+        Args:
+            team (Optional[str]): Team, or None for all teams
+            weeks (int): Span to cover, ending with the current period, clamped to 1..MAX_WEEKS
+            granularity (str): "week", "month" or "auto"
+            top_themes (int): Number of themes to return per-period counts for
+            until (Optional[date]): Last day of the span, defaults to today (UTC)
+
+        Returns:
+            Dict[str, Any]: Period labels with counts, mean and quantile scores,
+            attrition risk levels and top theme series
+        """
+        weeks = min(max(1, weeks), MAX_WEEKS)
+        if granularity == 'auto':
+            granularity = 'week' if weeks <= MAX_POINTS else 'month'
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        until = until or datetime.utcnow().date()
+        last = period_start(until, granularity)
+        first = period_start(until - timedelta(weeks=weeks) + timedelta(days=1), granularity)
+        periods = [first]
+        while periods[-1] < last:
+            periods.append(next_period(periods[-1], granularity))
+        periods = periods[-MAX_POINTS:]
+
+        key = ALL_TEAMS if team in (None, '', ALL_TEAMS) else normalize_team(team)
+        rows = self._connect().execute(
+            "SELECT period, count, scored, score_sum, risk, histogram, themes FROM rollups "
+            "WHERE team = ? AND granularity = ? AND period >= ? AND period <= ? ORDER BY period",
+            (key, granularity, periods[0].isoformat(), periods[-1].isoformat())
+        ).fetchall()
+        stored = {row[0]: TrendBucket.from_row(row[1:]) for row in rows}
+        buckets = [stored.get(period.isoformat(), TrendBucket()) for period in periods]
+
+        window = TrendBucket()
+        for bucket in buckets:
+            window.merge(bucket)
+        leaders = window.top_themes(top_themes)
+        return {
+            'team': None if key == ALL_TEAMS else key,
+            'granularity': granularity,
+            'labels': [period.isoformat() for period in periods],
+            'count': [bucket.count for bucket in buckets],
+            'mean_score': [bucket.mean_score for bucket in buckets],
+            'score_quantiles': {
+                f"p{round(q * 100)}": [bucket.quantile(q) for bucket in buckets] for q in QUANTILES
+            },
+            'attrition_risk': {
+                level: [bucket.risk.get(level, 0) for bucket in buckets] for level in (*RISK_LEVELS, 'unknown')
+            },
+            'themes': {
+                leader['theme']: [bucket.themes.get(leader['theme'], [0, 0])[0] for bucket in buckets]
+                for leader in leaders
+            },
+            'summary': {
+                'count': window.count,
+                'mean_score': window.mean_score,
+                'median_score': window.quantile(0.5),
+                'top_themes': window.top_themes(10),
+            },
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return rollup sizes for monitoring
+
+        Returns:
+            Dict[str, Any]: Recorded results, teams and stored buckets
+        """
+        conn = self._connect()
+        total = conn.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM rollups WHERE team = ? AND granularity = 'month'", (ALL_TEAMS,)
+        ).fetchone()[0]
+        return {
+            'results': total,
+            'teams': conn.execute("SELECT COUNT(*) FROM teams").fetchone()[0],
+            'buckets': conn.execute("SELECT COUNT(*) FROM rollups").fetchone()[0],
+        }
+
+_trends: Optional[SentimentTrends] = None
+_trends_lock = threading.Lock()
+
+def get_sentiment_trends() -> Optional[SentimentTrends]:
+    """
+    Return the process-wide trend store, creating it on first use
+
+    Returns:
+        Optional[SentimentTrends]: The shared store, or None when trends are disabled
+    """
+    global _trends
+    if not TRENDS_ENABLED:
+        return None
+    if _trends is None:
+        with _trends_lock:
+            if _trends is None:
+                _trends = SentimentTrends()
+    return _trends
+
+def record_sentiment_results(items: Iterable[Tuple[Dict[str, Any], Optional[str], Optional[datetime]]]) -> int:
+    """
+    Fold results into the shared trend store, never failing the caller
+
+    Args:
+        items (Iterable[Tuple[Dict[str, Any], Optional[str], Optional[datetime]]]): (result, team, analyzed at)
+
+    Returns:
+        int: Number of results recorded
+    """
+    trends = get_sentiment_trends()
+    if trends is None:
+        return 0
+    try:
+        return trends.record_many(items)
+    except sqlite3.Error as e:
+        logger.warning(f"Sentiment trend update failed: {str(e)}")
+        return 0
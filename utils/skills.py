@@ -0,0 +1,255 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+TAXONOMY_PATH = os.environ.get(
+    "SKILL_TAXONOMY_PATH", os.path.join(os.path.dirname(__file__), "data", "skill_taxonomy.json")
+)
+AUTOMATON_CACHE_DIR = os.environ.get("SKILL_AUTOMATON_CACHE_DIR", tempfile.gettempdir())
+
+# Bump when the compiled automaton layout changes so stale cache files are ignored
+AUTOMATON_FORMAT = 2
+
+# Characters that continue a skill token; a match must not touch them on either side
+_WORD_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789+#')
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over lowercase skill names and aliases
+
+    Finds every taxonomy skill in a text in one linear pass and reports the
+    canonical names. Matches must sit on token boundaries, so "java" does
+    not match inside "javascript" and "c" never matches inside "c++".
+
+    Skill names that are also ordinary words are guarded: case-sensitive
+    aliases ("Go", "Excel") only match with that exact capitalization, and
+    alias-only skills ("Spring") are found through their aliases ("spring
+    boot" is its own skill, "spring framework" is not) but never by the bare
+    name. canonicalize() still maps every name and alias, since skill lists
+    are not prose.
+    """
+
+    def __init__(self, goto: List[Dict[str, int]], fail: List[int], output: List[List[List[int]]],
+                 canonical: List[str], aliases: Dict[str, int], exact: Dict[str, str]):
+        self.goto = goto
+        self.fail = fail
+        self.output = output
+        self.canonical = canonical
+        self.aliases = aliases
+        self.exact = exact
+
+    @classmethod
+    def build(cls, taxonomy: Dict[str, List[str]], case_sensitive: Iterable[str] = (),
+              alias_only: Iterable[str] = ()) -> "SkillMatcher":
+        canonical = list(taxonomy)
+        case_sensitive, alias_only = set(case_sensitive), set(alias_only)
+        aliases: Dict[str, int] = {}
+        matched: Dict[str, int] = {}
+        # Lowercase alias -> the only spelling it may match with
+        exact: Dict[str, str] = {}
+        for index, name in enumerate(canonical):
+            for alias in [name, *taxonomy[name]]:
+                key = ' '.join(alias.lower().split())
+                aliases.setdefault(key, index)
+                if alias == name and name in alias_only:
+                    continue
+                if key not in matched:
+                    matched[key] = index
+                    if alias in case_sensitive:
+                        exact[key] = ' '.join(alias.split())
+
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[List[int]]] = [[]]
+        for alias, index in matched.items():
+            state = 0
+            for char in alias:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append([])
+                state = next_state
+            output[state].append([len(alias), index])
+
+        # Breadth-first pass to wire failure links and merge suffix outputs
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                candidate = goto[fallback].get(char, 0)
+                fail[next_state] = candidate if candidate != next_state else 0
+                output[next_state].extend(output[fail[next_state]])
+        return cls(goto, fail, output, canonical, aliases, exact)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'goto': self.goto, 'fail': self.fail, 'output': self.output,
+                'canonical': self.canonical, 'aliases': self.aliases, 'exact': self.exact}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SkillMatcher":
+        return cls(data['goto'], data['fail'], data['output'], data['canonical'], data['aliases'], data['exact'])
+
+    def find(self, text: str) -> List[str]:
+        """
+        Find every skill mentioned in a text
+
+        Args:
+            text (str): Resume or job description text
+
+        Returns:
+            List[str]: Canonical skill names in order of first appearance
+        """
+        original = ' '.join((text or '').split())
+        haystack = original.lower()
+        if len(haystack) != len(original):
+            # A few characters lowercase to several; keep positions aligned with the original
+            haystack = ''.join(char.lower() if len(char.lower()) == 1 else char for char in original)
+        goto, fail, output, exact = self.goto, self.fail, self.output, self.exact
+        found: Dict[int, int] = {}
+        state = 0
+        length = len(haystack)
+        for position, char in enumerate(haystack):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = position + 1
+            if end < length and haystack[end] in _WORD_CHARS:
+                continue
+            for match_length, index in output[state]:
+                start = end - match_length
+                if start > 0 and haystack[start - 1] in _WORD_CHARS:
+                    continue
+                # Dots inside tokens (node.js, asp.net) are not boundaries either
+                if start > 1 and haystack[start - 1] == '.' and haystack[start - 2] in _WORD_CHARS:
+                    continue
+                spelling = exact.get(haystack[start:end])
+                if spelling is not None and original[start:end] != spelling:
+                    continue
+                found.setdefault(index, start)
+        return [self.canonical[index] for index, _ in sorted(found.items(), key=lambda item: item[1])]
+
+    def canonicalize(self, name: str) -> Optional[str]:
+        """
+        Map a skill name or alias to its canonical name
+
+        Args:
+            name (str): Skill name as written, e.g. "k8s"
+
+        Returns:
+            Optional[str]: Canonical name, or None when the skill is not in the taxonomy
+        """
+        index = self.aliases.get(' '.join((name or '').lower().split()))
+        return self.canonical[index] if index is not None else None
+
+_matcher: Optional[SkillMatcher] = None
+_matcher_lock = threading.Lock()
+
+def _load_matcher() -> SkillMatcher:
+    with open(TAXONOMY_PATH, 'rb') as file:
+        raw = file.read()
+    digest = hashlib.sha256(raw + str(AUTOMATON_FORMAT).encode()).hexdigest()[:16]
+    cache_path = os.path.join(AUTOMATON_CACHE_DIR, f"tatviq_skills_{digest}.json")
+
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as file:
+            return SkillMatcher.from_dict(json.load(file))
+    except (OSError, ValueError, KeyError):
+        pass
+
+    taxonomy = json.loads(raw)
+    matcher = SkillMatcher.build(taxonomy['skills'], taxonomy.get('case_sensitive', ()), taxonomy.get('alias_only', ()))
+    try:
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(matcher.to_dict(), file, separators=(',', ':'))
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache compiled skill taxonomy: {str(e)}")
+    return matcher
+
+def get_skill_matcher() -> SkillMatcher:
+    """
+    Return the shared skill matcher, loading the precompiled automaton on first use
+
+    The compiled automaton is cached on disk next to a hash of the taxonomy
+    file, so workers only rebuild it when the taxonomy changes.
+
+    Returns:
+        SkillMatcher: Shared matcher instance
+    """
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = _load_matcher()
+    return _matcher
+
+def find_skills(text: str) -> List[str]:
+    """
+    Find taxonomy skills in a text
+
+    Args:
+        text (str): Resume or job description text
+
+    Returns:
+        List[str]: Canonical skill names in order of first appearance
+    """
+    return get_skill_matcher().find(text)
+
+def _merge_unknown(base: List[str], llm_skills: Any, matcher: SkillMatcher) -> List[str]:
+    # Keep LLM skills the taxonomy does not know about, deduplicated case-insensitively
+    merged = list(base)
+    seen = {skill.lower() for skill in merged}
+    for skill in llm_skills if isinstance(llm_skills, list) else []:
+        if not isinstance(skill, str) or matcher.canonicalize(skill) is not None:
+            continue
+        if skill.lower() not in seen:
+            seen.add(skill.lower())
+            merged.append(skill)
+    return merged
+
+def reconcile_skill_lists(result: Dict[str, Any], resume_text: str, job_description: str) -> Dict[str, Any]:
+    """
+    Fill the extracted/matching/missing skill lists deterministically from the taxonomy
+
+    Skills the taxonomy recognizes are decided by the matcher alone, so they
+    no longer vary between runs. Skills the LLM reported that are outside
+    the taxonomy are appended so nothing is lost.
+
+    Args:
+        result (Dict[str, Any]): Resume analysis result from the LLM
+        resume_text (str): Extracted text from resume
+        job_description (str): Job description text
+
+    Returns:
+        Dict[str, Any]: A copy of the result with reconciled skill lists
+    """
+    matcher = get_skill_matcher()
+    resume_skills = matcher.find(resume_text)
+    required_skills = matcher.find(job_description)
+    resume_set = set(resume_skills)
+
+    reconciled = dict(result)
+    reconciled['extracted_skills'] = _merge_unknown(resume_skills, result.get('extracted_skills'), matcher)
+    reconciled['matching_skills'] = _merge_unknown(
+        [s for s in required_skills if s in resume_set], result.get('matching_skills'), matcher
+    )
+    reconciled['missing_skills'] = _merge_unknown(
+        [s for s in required_skills if s not in resume_set], result.get('missing_skills'), matcher
+    )
+    return reconciled
@@ -0,0 +1,494 @@
+import os
+import math
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from utils.prescreen import tokenize, BM25_K1, BM25_B
+from utils.result_cache import content_digest
+from utils.skills import find_skills
+
+logger = logging.getLogger(__name__)
+
+TALENT_POOL_ENABLED = os.environ.get("TALENT_POOL_ENABLED", "1").lower() not in ("0", "false", "no")
+TALENT_POOL_DIR = os.environ.get("TALENT_POOL_DIR", os.path.join(tempfile.gettempdir(), "tatviq_talent_pool"))
+# Uploads become searchable after the next flush
+TALENT_POOL_FLUSH_INTERVAL = float(os.environ.get("TALENT_POOL_FLUSH_INTERVAL", "2"))
+TALENT_POOL_SEGMENT_DOCS = int(os.environ.get("TALENT_POOL_SEGMENT_DOCS", "1000"))
+# Once this many segments share a level they are merged into one segment a level up
+TALENT_POOL_MERGE_FACTOR = int(os.environ.get("TALENT_POOL_MERGE_FACTOR", "8"))
+SKILL_BOOST = float(os.environ.get("TALENT_POOL_SKILL_BOOST", "2"))
+SKILL_TERM_PREFIX = 'skill:'
+MAX_RESULTS = 100
+
+def index_terms(text: str) -> Counter:
+    """
+    Count the index terms of a text: its tokens plus one term per taxonomy skill
+
+    Skill terms use canonical skill names, so "JS" in a resume and
+    "JavaScript" in a job description meet on the same term.
+
+    Args:
+        text (str): Raw text
+
+    Returns:
+        Counter: Term frequencies
+    """
+    terms = Counter(tokenize(text))
+    for skill in find_skills(text):
+        terms[SKILL_TERM_PREFIX + skill.lower()] = 1
+    return terms
+
+def _pack(values: List[int], dtype) -> bytes:
+    return np.asarray(values, dtype=dtype).tobytes()
+
+def _build_segment(docs: List[Tuple[int, str]]) -> Tuple[Dict[str, Tuple[List[int], List[int]]], List[int], List[int]]:
+    # Postings hold positions into the segment's document list rather than
+    # candidate ids, so scoring indexes the length array directly
+    postings: Dict[str, Tuple[List[int], List[int]]] = {}
+    doc_ids, lengths = [], []
+    for position, (doc_id, text) in enumerate(docs):
+        terms = index_terms(text)
+        doc_ids.append(doc_id)
+        lengths.append(sum(terms.values()))
+        for term, tf in terms.items():
+            positions, tfs = postings.setdefault(term, ([], []))
+            positions.append(position)
+            tfs.append(min(tf, 65535))
+    return postings, doc_ids, lengths
+
+class TalentPool:
+    """
+    Past resumes and an on-disk inverted index over them for BM25 search
+
+    Uploads only append a row to the candidates database. A background
+    thread turns new rows into immutable index segments and merges segments
+    level by level, all in a separate index database, so uploads never wait
+    on index maintenance. Segments are written and merged in single
+    transactions and searches read in one snapshot, so a search never sees
+    a half-merged index. Any gunicorn worker may flush or merge; the
+    watermark and segment checks make concurrent attempts safe.
+    """
+
+    def __init__(self, directory: str = TALENT_POOL_DIR, background: bool = True):
+        os.makedirs(directory, exist_ok=True)
+        self.pool_path = os.path.join(directory, "candidates.sqlite3")
+        self.index_path = os.path.join(directory, "index.sqlite3")
+        self.searches = 0
+        self.flushes = 0
+        self.merges = 0
+        # Segments are immutable, so their document lengths can be cached per segment; the key
+        # includes doc_count and created_at because index files from before AUTOINCREMENT reuse ids
+        self._lengths: Dict[Tuple[int, int, float], Tuple[np.ndarray, np.ndarray]] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._initialized = set()
+        self._wake = threading.Event()
+        self._background = background
+        self._maintainer: Optional[threading.Thread] = None
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(path)
+        if conn is None:
+            conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                if path not in self._initialized:
+                    self._create_tables(conn, path)
+                    self._initialized.add(path)
+            conns[path] = conn
+        return conn
+
+    def _create_tables(self, conn: sqlite3.Connection, path: str) -> None:
+        if path == self.pool_path:
+            # AUTOINCREMENT keeps ids strictly increasing, which the flush watermark relies on
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS candidates ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, digest TEXT NOT NULL UNIQUE, "
+                "filename TEXT NOT NULL, text TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            return
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, level INTEGER NOT NULL, doc_count INTEGER NOT NULL, "
+            "total_length INTEGER NOT NULL, min_doc INTEGER NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS segment_docs ("
+            "segment_id INTEGER PRIMARY KEY, doc_ids BLOB NOT NULL, lengths BLOB NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "term TEXT NOT NULL, segment_id INTEGER NOT NULL, positions BLOB NOT NULL, tfs BLOB NOT NULL, "
+            "PRIMARY KEY (term, segment_id)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _ensure_maintenance(self) -> None:
+        if not self._background:
+            return
+        if self._maintainer is None or not self._maintainer.is_alive():
+            with self._lock:
+                if self._maintainer is None or not self._maintainer.is_alive():
+                    self._maintainer = threading.Thread(target=self._maintain, name='talent-pool-index', daemon=True)
+                    self._maintainer.start()
+
+    def _maintain(self) -> None:
+        while True:
+            self._wake.wait(TALENT_POOL_FLUSH_INTERVAL)
+            self._wake.clear()
+            try:
+                while self.flush():
+                    pass
+                while self.merge():
+                    pass
+            except Exception as e:
+                logger.warning(f"Talent pool index maintenance failed: {str(e)}")
+
+    def add(self, resume_text: str, filename: str) -> Optional[int]:
+        """
+        Append a resume to the pool; it becomes searchable after the next flush
+
+        Args:
+            resume_text (str): Extracted text from resume
+            filename (str): Uploaded file name
+
+        Returns:
+            Optional[int]: Candidate id; re-uploads of the same text keep their first id
+        """
+        if not resume_text or not resume_text.strip():
+            return None
+        digest = content_digest(resume_text)
+        conn = self._connect(self.pool_path)
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO candidates (digest, filename, text, created_at) VALUES (?, ?, ?, ?)",
+            (digest, filename, resume_text, time.time())
+        )
+        if cursor.rowcount == 1:
+            candidate_id = cursor.lastrowid
+            self._ensure_maintenance()
+            self._wake.set()
+        else:
+            candidate_id = conn.execute("SELECT id FROM candidates WHERE digest = ?", (digest,)).fetchone()[0]
+        return candidate_id
+
+    def get_candidate(self, candidate_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a stored candidate with its resume text
+
+        Args:
+            candidate_id (int): Candidate id
+
+        Returns:
+            Optional[Dict[str, Any]]: id, filename, resume_text and added_at, or None
+        """
+        row = self._connect(self.pool_path).execute(
+            "SELECT id, filename, text, created_at FROM candidates WHERE id = ?", (candidate_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'id': row[0], 'filename': row[1], 'resume_text': row[2], 'added_at': row[3]}
+
+    def _watermark(self, conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'indexed_through'").fetchone()
+        return row[0] if row else 0
+
+    def _write_segment(self, conn: sqlite3.Connection, level: int, postings, doc_ids, lengths) -> int:
+        cursor = conn.execute(
+            "INSERT INTO segments (level, doc_count, total_length, min_doc, created_at) VALUES (?, ?, ?, ?, ?)",
+            (level, len(doc_ids), int(sum(lengths)), int(doc_ids[0]), time.time())
+        )
+        segment_id = cursor.lastrowid
+        conn.execute(
+            "INSERT INTO segment_docs (segment_id, doc_ids, lengths) VALUES (?, ?, ?)",
+            (segment_id, _pack(doc_ids, np.int64), _pack(lengths, np.int32))
+        )
+        conn.executemany(
+            "INSERT INTO postings (term, segment_id, positions, tfs) VALUES (?, ?, ?, ?)",
+            [(term, segment_id, _pack(positions, np.int32), _pack(tfs, np.uint16))
+             for term, (positions, tfs) in postings.items()]
+        )
+        return segment_id
+
+    def flush(self) -> int:
+        """
+        Index candidates added since the last flush as a new level-0 segment
+
+        Returns:
+            int: Number of candidates indexed (0 if there was nothing new)
+        """
+        index = self._connect(self.index_path)
+        watermark = self._watermark(index)
+        docs = self._connect(self.pool_path).execute(
+            "SELECT id, text FROM candidates WHERE id > ? ORDER BY id LIMIT ?", (watermark, TALENT_POOL_SEGMENT_DOCS)
+        ).fetchall()
+        if not docs:
+            return 0
+        # Tokenizing happens before the write lock is taken
+        postings, doc_ids, lengths = _build_segment(docs)
+
+        index.execute("BEGIN IMMEDIATE")
+        try:
+            if self._watermark(index) != watermark:
+                # Another worker indexed these candidates first
+                index.execute("ROLLBACK")
+                return 0
+            self._write_segment(index, 0, postings, doc_ids, lengths)
+            index.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('indexed_through', ?)", (doc_ids[-1],))
+            index.execute("COMMIT")
+        except sqlite3.Error:
+            index.execute("ROLLBACK")
+            raise
+        self.flushes += 1
+        return len(docs)
+
+    def merge(self) -> bool:
+        """
+        Merge the oldest TALENT_POOL_MERGE_FACTOR segments of the lowest full level
+
+        Returns:
+            bool: True if segments were merged
+        """
+        index = self._connect(self.index_path)
+        full = index.execute(
+            "SELECT level FROM segments GROUP BY level HAVING COUNT(*) >= ? ORDER BY level LIMIT 1",
+            (TALENT_POOL_MERGE_FACTOR,)
+        ).fetchone()
+        if full is None:
+            return False
+        level = full[0]
+
+        index.execute("BEGIN")
+        try:
+            segment_ids = [row[0] for row in index.execute(
+                "SELECT id FROM segments WHERE level = ? ORDER BY min_doc LIMIT ?", (level, TALENT_POOL_MERGE_FACTOR)
+            )]
+            placeholders = ','.join('?' * len(segment_ids))
+            docs = {row[0]: row[1:] for row in index.execute(
+                f"SELECT segment_id, doc_ids, lengths FROM segment_docs WHERE segment_id IN ({placeholders})", segment_ids
+            )}
+            old_postings = index.execute(
+                f"SELECT term, segment_id, positions, tfs FROM postings WHERE segment_id IN ({placeholders})", segment_ids
+            ).fetchall()
+        finally:
+            index.execute("COMMIT")
+
+        # Segments are concatenated in doc id order; each one's positions shift
+        # by the number of documents ahead of it
+        doc_arrays = [np.frombuffer(docs[s][0], dtype=np.int64) for s in segment_ids]
+        offsets = dict(zip(segment_ids, np.cumsum([0] + [len(ids) for ids in doc_arrays[:-1]])))
+        order = {segment_id: rank for rank, segment_id in enumerate(segment_ids)}
+        doc_ids = np.concatenate(doc_arrays)
+        lengths = np.concatenate([np.frombuffer(docs[s][1], dtype=np.int32) for s in segment_ids])
+        grouped: Dict[str, List[Tuple[int, int, bytes, bytes]]] = {}
+        for term, segment_id, positions, tfs in old_postings:
+            grouped.setdefault(term, []).append((order[segment_id], offsets[segment_id], positions, tfs))
+        postings = {}
+        for term, parts in grouped.items():
+            parts.sort(key=lambda part: part[0])
+            postings[term] = (
+                np.concatenate([np.frombuffer(positions, dtype=np.int32) + offset for _, offset, positions, _ in parts]),
+                np.concatenate([np.frombuffer(tfs, dtype=np.uint16) for _, _, _, tfs in parts]),
+            )
+
+        index.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = index.execute(f"DELETE FROM segments WHERE id IN ({placeholders})", segment_ids)
+            if cursor.rowcount != len(segment_ids):
+                # Another worker merged some of these segments first
+                index.execute("ROLLBACK")
+                return False
+            index.execute(f"DELETE FROM segment_docs WHERE segment_id IN ({placeholders})", segment_ids)
+            index.execute(f"DELETE FROM postings WHERE segment_id IN ({placeholders})", segment_ids)
+            self._write_segment(index, level + 1, postings, doc_ids, lengths)
+            index.execute("COMMIT")
+        except sqlite3.Error:
+            index.execute("ROLLBACK")
+            raise
+        self.merges += 1
+        return True
+
+    def search(self, job_description: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Rank indexed candidates against a job description with BM25
+
+        Skill terms are weighted SKILL_BOOST times their IDF, so shared
+        taxonomy skills outrank incidental word overlap.
+
+        Args:
+            job_description (str): Job description text
+            limit (int): Number of candidates to return, capped at MAX_RESULTS
+
+        Returns:
+            List[Dict[str, Any]]: Candidates with candidate_id, filename, score,
+                matching_skills and added_at, best first
+        """
+        self._ensure_maintenance()
+        limit = max(1, min(limit, MAX_RESULTS))
+        query = index_terms(job_description)
+        if not query:
+            return []
+        terms = list(query)
+        self.searches += 1
+
+        index = self._connect(self.index_path)
+        # One read transaction gives a consistent snapshot while merges run
+        index.execute("BEGIN")
+        try:
+            segments = index.execute("SELECT id, doc_count, total_length, created_at FROM segments").fetchall()
+            rows = index.execute(
+                f"SELECT term, segment_id, positions, tfs FROM postings WHERE term IN ({','.join('?' * len(terms))})",
+                terms
+            ).fetchall()
+            # Snapshot the cached lengths locally; other searches may prune the cache meanwhile
+            keys = {segment_id: (segment_id, count, created_at) for segment_id, count, _, created_at in segments}
+            doc_lengths = {segment_id: self._lengths.get(key) for segment_id, key in keys.items()}
+            missing = [segment_id for segment_id, cached in doc_lengths.items() if cached is None]
+            if missing:
+                for segment_id, ids, lengths in index.execute(
+                    f"SELECT segment_id, doc_ids, lengths FROM segment_docs WHERE segment_id IN ({','.join('?' * len(missing))})",
+                    missing
+                ):
+                    doc_lengths[segment_id] = self._lengths[keys[segment_id]] = (
+                        np.frombuffer(ids, dtype=np.int64), np.frombuffer(lengths, dtype=np.int32).astype(np.float32)
+                    )
+        finally:
+            index.execute("COMMIT")
+
+        live = set(keys.values())
+        for key in list(self._lengths):
+            if key not in live:
+                self._lengths.pop(key, None)
+        n_docs = sum(count for _, count, _, _ in segments)
+        if n_docs == 0 or not rows:
+            return []
+        avgdl = sum(total for _, _, total, _ in segments) / n_docs
+
+        postings = [(term, segment_id, np.frombuffer(positions, dtype=np.int32), np.frombuffer(tfs, dtype=np.uint16))
+                    for term, segment_id, positions, tfs in rows]
+        df = Counter()
+        for term, _, positions, _ in postings:
+            df[term] += len(positions)
+        weights = {}
+        for term, freq in df.items():
+            idf = math.log(1 + (n_docs - freq + 0.5) / (freq + 0.5))
+            weights[term] = idf * query[term] * (SKILL_BOOST if term.startswith(SKILL_TERM_PREFIX) else 1.0)
+
+        by_segment: Dict[int, List[Tuple[str, np.ndarray, np.ndarray]]] = {}
+        for term, segment_id, positions, tfs in postings:
+            by_segment.setdefault(segment_id, []).append((term, positions, tfs))
+
+        # One vectorized pass per segment: all matching postings are concatenated
+        # and their BM25 contributions summed per document with bincount
+        best: List[Tuple[float, int, int, int]] = []
+        for segment_id, segment_postings in by_segment.items():
+            segment_ids, lengths = doc_lengths[segment_id]
+            positions = np.concatenate([positions for _, positions, _ in segment_postings])
+            tfs = np.concatenate([tfs for _, _, tfs in segment_postings]).astype(np.float32)
+            term_weights = np.repeat(np.array([weights[term] * (BM25_K1 + 1) for term, _, _ in segment_postings],
+                                              dtype=np.float32),
+                                     [len(positions) for _, positions, _ in segment_postings])
+            norm = np.float32(BM25_K1 * (1 - BM25_B)) + np.float32(BM25_K1 * BM25_B / avgdl) * lengths[positions]
+            scores = np.bincount(positions, weights=term_weights * tfs / (tfs + norm), minlength=len(segment_ids))
+            top = min(limit, len(scores))
+            for position in np.argpartition(-scores, top - 1)[:top]:
+                if scores[position] > 0:
+                    best.append((float(scores[position]), int(segment_ids[position]), segment_id, int(position)))
+        best = sorted(best, reverse=True)[:limit]
+        if not best:
+            return []
+
+        skills: Dict[int, List[str]] = {doc_id: [] for _, doc_id, _, _ in best}
+        for segment_id, segment_postings in by_segment.items():
+            owners = {position: doc_id for _, doc_id, owner, position in best if owner == segment_id}
+            if not owners:
+                continue
+            selected = np.zeros(len(doc_lengths[segment_id][0]), dtype=bool)
+            selected[list(owners)] = True
+            for term, positions, _ in segment_postings:
+                if term.startswith(SKILL_TERM_PREFIX):
+                    for position in positions[selected[positions]]:
+                        skills[owners[int(position)]].append(term[len(SKILL_TERM_PREFIX):])
+
+        details = {row[0]: row[1:] for row in self._connect(self.pool_path).execute(
+            f"SELECT id, filename, created_at FROM candidates WHERE id IN ({','.join('?' * len(best))})",
+            [doc_id for _, doc_id, _, _ in best]
+        )}
+        return [{
+            'candidate_id': doc_id,
+            'filename': details[doc_id][0],
+            'score': round(score, 3),
+            'matching_skills': sorted(set(skills[doc_id])),
+            'added_at': details[doc_id][1],
+        } for score, doc_id, _, _ in best if doc_id in details]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return pool size, index shape and maintenance counters for monitoring
+
+        Returns:
+            Dict[str, Any]: Talent pool counters
+        """
+        candidates = self._connect(self.pool_path).execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+        segments, indexed = self._connect(self.index_path).execute(
+            "SELECT COUNT(*), COALESCE(SUM(doc_count), 0) FROM segments"
+        ).fetchone()
+        return {
+            'candidates': candidates,
+            'indexed': indexed,
+            'segments': segments,
+            'searches': self.searches,
+            'flushes': self.flushes,
+            'merges': self.merges,
+        }
+
+_talent_pool: Optional[TalentPool] = None
+_talent_pool_lock = threading.Lock()
+
+def get_talent_pool() -> Optional[TalentPool]:
+    """
+    Return the process-wide talent pool, creating it on first use
+
+    Returns:
+        Optional[TalentPool]: The shared pool, or None when the talent pool is disabled
+    """
+    global _talent_pool
+    if not TALENT_POOL_ENABLED:
+        return None
+    if _talent_pool is None:
+        with _talent_pool_lock:
+            if _talent_pool is None:
+                _talent_pool = TalentPool(TALENT_POOL_DIR)
+    return _talent_pool
+
+def add_to_talent_pool(resume_text: str, filename: str) -> Optional[int]:
+    """
+    Keep an extracted resume for later searches
+
+    Storage errors are logged and never fail the upload.
+
+    Args:
+        resume_text (str): Extracted text from resume
+        filename (str): Uploaded file name
+
+    Returns:
+        Optional[int]: Candidate id, or None if the resume was not stored
+    """
+    pool = get_talent_pool()
+    if pool is None:
+        return None
+    try:
+        return pool.add(resume_text, filename)
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to add resume to the talent pool: {str(e)}")
+        return None